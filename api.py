@@ -0,0 +1,147 @@
+"""
+Discourse JSON 接口读取：帖子列表和帖子元数据直接从 /latest.json、/t/{id}.json 获取，不需要渲染页面
+
+复用浏览器 context 的 cookies，连接池保持长连接，多个帖子并发获取
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from linuxdo import HOME_URL
+
+
+class DiscourseApi:
+    def __init__(self, context, user_agent=None, concurrency=4) -> None:
+        """
+        :param context: 已登录的浏览器 context，用来复制 cookies
+        :param user_agent: 与浏览器保持一致的 User-Agent
+        :param concurrency: 并发请求数，同时也是连接池大小
+        """
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "X-Requested-With": "XMLHttpRequest",
+        })
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        self.sync_cookies(context)
+
+        self.categories = None  # category_id -> 名称
+        self.requests = 0  # 请求次数
+        self.failures = 0  # 失败次数
+        self.latency = 0.0  # 累计耗时（秒）
+
+    def reset_stats(self):
+        """守护模式下每轮重新统计"""
+        self.requests = 0
+        self.failures = 0
+        self.latency = 0.0
+
+    def sync_cookies(self, context):
+        """把浏览器 context 的 cookies 复制到 requests.Session"""
+        for cookie in context.cookies():
+            self.session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie.get("path", "/")
+            )
+
+    def get_json(self, path, timeout=10):
+        """
+        GET 一个 JSON 接口
+        :return: dict，失败返回 None
+        """
+        started = time.time()
+        try:
+            response = self.session.get(HOME_URL + path.lstrip("/"), timeout=timeout)
+            if response.status_code != 200:
+                logger.debug(f"接口 {path} 返回 HTTP {response.status_code}")
+                self.failures += 1
+                return None
+            return response.json()
+        except Exception as e:
+            logger.debug(f"请求接口 {path} 失败: {str(e)}")
+            self.failures += 1
+            return None
+        finally:
+            self.requests += 1
+            self.latency += time.time() - started
+
+    def latest_topics(self, feed="latest", page=0):
+        """
+        获取帖子列表
+        :param feed: latest / new / unread / top 等
+        :return: 帖子列表（/latest.json 中的 topic_list.topics），失败返回 None
+        """
+        path = f"{feed}.json" + (f"?page={page}" if page else "")
+        data = self.get_json(path)
+        if not data:
+            return None
+        return data.get("topic_list", {}).get("topics", [])
+
+    def category_name(self, category_id):
+        if self.categories is None:
+            data = self.get_json("categories.json") or {}
+            self.categories = {
+                c["id"]: c["name"] for c in data.get("category_list", {}).get("categories", [])
+            }
+        return self.categories.get(category_id)
+
+    def topic(self, topic_id):
+        """
+        获取单个帖子的元数据
+        :return: dict（title / category / tags / closed / post_ids / likes / liked ...），失败返回 None
+        """
+        data = self.get_json(f"t/{topic_id}.json")
+        if not data:
+            return None
+
+        posts = data.get("post_stream", {}).get("posts", [])
+        first_post = posts[0] if posts else {}
+        # 点赞数：reactions 插件的 reaction_users_count，没有时取原生 like（action id 2）
+        likes = first_post.get("reaction_users_count")
+        if likes is None:
+            likes = sum(a.get("count", 0) for a in first_post.get("actions_summary", []) if a.get("id") == 2)
+        liked = first_post.get("current_user_reaction") is not None or any(
+            a.get("id") == 2 and a.get("acted") for a in first_post.get("actions_summary", [])
+        )
+        # 新版本的 tags 是对象列表
+        tags = [t["name"] if isinstance(t, dict) else t for t in data.get("tags") or []]
+
+        return {
+            "id": data.get("id", topic_id),
+            "slug": data.get("slug"),
+            "title": data.get("title"),
+            "category": self.category_name(data.get("category_id")),
+            "tags": tags,
+            "closed": bool(data.get("closed") or data.get("archived")),
+            "posts_count": data.get("posts_count", 0),
+            "post_ids": data.get("post_stream", {}).get("stream", []),
+            "post_id": first_post.get("id"),
+            "likes": likes or 0,
+            "liked": liked,
+            "last_read_post_number": data.get("last_read_post_number"),
+        }
+
+    def topics(self, topic_ids):
+        """
+        并发获取多个帖子的元数据
+        :return: {topic_id: 元数据}，获取失败的帖子不在结果中
+        """
+        # 分类名称先在主线程取好，避免多个线程同时请求 categories.json
+        self.category_name(None)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = executor.map(self.topic, topic_ids)
+            return {topic_id: meta for topic_id, meta in zip(topic_ids, results) if meta}
+
+    def summary(self):
+        """(请求次数, 失败次数, 平均耗时毫秒)"""
+        average = self.latency / self.requests * 1000 if self.requests else 0
+        return self.requests, self.failures, average
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,214 @@
+"""
+静态资源磁盘缓存：每次运行都是新的 context，浏览器缓存是空的（开启请求拦截后浏览器也不再使用 HTTP 缓存），
+Discourse 的 Ember 脚本、样式、语言包要在每次运行、每个新页面上重新下载。这里用 context.route 接管脚本、样式等
+静态资源：命中时直接用磁盘上的副本应答，未命中时 route.fetch() 下载后按响应的 Cache-Control 保存
+
+- 只保存 GET、200、允许共享缓存且 max-age 不少于 MIN_MAX_AGE 的响应，过期后重新下载
+- 每个账号一个目录，总大小超过上限时按最近使用时间淘汰
+- 同时记录冷 / 热缓存下首页的首次内容绘制时间，报告中对比
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+
+from loguru import logger
+
+CACHEABLE_TYPES = {"script", "stylesheet", "font", "image", "media"}
+MIN_MAX_AGE = 3600  # 有效期短于 1 小时的资源不缓存
+SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie", "date", "age"}
+EVICT_TARGET = 0.9  # 淘汰到上限的 90%，避免每次保存都触发淘汰
+PAINT_HISTORY = 10  # 冷 / 热缓存各保留的首次绘制记录数
+
+# 首次内容绘制时间（毫秒），浏览器不支持时返回 null
+FIRST_PAINT_JS = """
+() => {
+    const [entry] = performance.getEntriesByName('first-contentful-paint');
+    return entry ? entry.startTime : null;
+}
+"""
+
+
+def max_age(cache_control):
+    """:return: 可以缓存的秒数，不允许共享缓存时返回 0"""
+    cache_control = (cache_control or "").lower()
+    if any(token in cache_control for token in ("no-store", "no-cache", "private")):
+        return 0
+    match = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class AssetCache:
+    def __init__(self, directory, limit_mb=200) -> None:
+        """
+        :param directory: 本账号的缓存目录
+        :param limit_mb: 缓存总大小上限
+        """
+        self.directory = directory
+        self.entries_dir = os.path.join(directory, "entries")
+        self.limit = limit_mb * 1024 * 1024
+        self.entries = {}  # key -> [字节数, 最近使用时间]
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0  # 从磁盘应答的字节数
+        self.stored = 0  # 本次新保存的资源数
+        self.evicted = 0  # 本次淘汰的资源数
+        self.warm = False  # 本次运行开始时是否已有缓存
+        self.first_paint = None  # 本次首页的首次内容绘制时间（秒）
+        self.paint_history = {"cold": [], "warm": []}
+        self.load()
+
+    def load(self):
+        """扫描缓存目录，读取首次绘制记录"""
+        try:
+            os.makedirs(self.entries_dir, exist_ok=True)
+            for name in os.listdir(self.entries_dir):
+                if not name.endswith(".body"):
+                    continue
+                stat = os.stat(os.path.join(self.entries_dir, name))
+                self.entries[name[:-5]] = [stat.st_size, stat.st_mtime]
+        except OSError as e:
+            logger.debug(f"读取资源缓存目录失败: {str(e)}")
+        self.warm = bool(self.entries)
+        try:
+            with open(os.path.join(self.directory, "paint.json"), "r", encoding="utf-8") as f:
+                self.paint_history.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"读取首次绘制记录失败: {str(e)}")
+
+    def reset_stats(self):
+        """守护模式下每轮重新统计"""
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0
+        self.stored = 0
+        self.evicted = 0
+        self.warm = bool(self.entries)
+        self.first_paint = None
+
+    def install(self, context):
+        """在 context 上接管静态资源，需要在资源拦截之前注册，被屏蔽的资源不会进入缓存"""
+        context.route("**/*", self.handle)
+
+    def paths(self, key):
+        base = os.path.join(self.entries_dir, key)
+        return base + ".body", base + ".json"
+
+    def handle(self, route, request):
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            route.fallback()
+            return
+        key = hashlib.sha1(request.url.encode("utf-8")).hexdigest()
+        if key in self.entries and self.serve(route, key):
+            return
+        self.misses += 1
+        try:
+            response = route.fetch()
+        except Exception as e:
+            logger.debug(f"下载资源失败: {request.url} | {str(e)}")
+            route.fallback()
+            return
+        body = response.body()
+        route.fulfill(response=response, body=body)
+        seconds = max_age(response.headers.get("cache-control"))
+        if response.status == 200 and seconds >= MIN_MAX_AGE:
+            self.store(key, request.url, response.headers, body, seconds)
+
+    def serve(self, route, key):
+        """用磁盘上的副本应答，过期或读取失败时返回 False"""
+        body_path, meta_path = self.paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["expires"] < time.time():
+                return False
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            self.entries.pop(key, None)
+            return False
+        route.fulfill(status=200, headers=meta["headers"], body=body)
+        self.hits += 1
+        self.hit_bytes += len(body)
+        self.entries[key][1] = time.time()
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return True
+
+    def store(self, key, url, headers, body, seconds):
+        body_path, meta_path = self.paths(key)
+        meta = {
+            "url": url,
+            "expires": time.time() + seconds,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in SKIP_HEADERS},
+        }
+        try:
+            # 先写内容再写元数据，元数据存在时内容一定完整
+            for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+                with tempfile.NamedTemporaryFile(mode, dir=self.entries_dir, suffix=".tmp", delete=False) as f:
+                    f.write(data)
+                os.replace(f.name, path)
+        except OSError as e:
+            logger.debug(f"保存资源缓存失败: {str(e)}")
+            return
+        self.entries[key] = [len(body), time.time()]
+        self.stored += 1
+        if self.size() > self.limit:
+            self.evict()
+
+    def size(self):
+        return sum(size for size, _ in self.entries.values())
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小降到上限的 90%"""
+        target = self.limit * EVICT_TARGET
+        total = self.size()
+        for key, (size, _) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+            if total <= target:
+                break
+            for path in self.paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            del self.entries[key]
+            total -= size
+            self.evicted += 1
+        logger.debug(f"资源缓存超过 {self.limit / 1024 / 1024:.0f} MB，淘汰后 {total / 1024 / 1024:.1f} MB")
+
+    def record_first_paint(self, page):
+        """记录首页的首次内容绘制时间，按本次是冷缓存还是热缓存分别保存"""
+        try:
+            paint_ms = page.evaluate(FIRST_PAINT_JS)
+        except Exception as e:
+            logger.debug(f"读取首次绘制时间失败: {str(e)}")
+            return
+        if paint_ms is None:
+            return
+        self.first_paint = paint_ms / 1000
+        history = self.paint_history["warm" if self.warm else "cold"]
+        history.append(self.first_paint)
+        del history[:-PAINT_HISTORY]
+        try:
+            path = os.path.join(self.directory, "paint.json")
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False) as f:
+                json.dump(self.paint_history, f)
+            os.replace(f.name, path)
+        except OSError as e:
+            logger.debug(f"保存首次绘制记录失败: {str(e)}")
+
+    def summary(self):
+        """(命中数, 未命中数, 命中字节, 缓存总字节, 本次是否热缓存, 本次首次绘制秒数, 冷缓存平均, 热缓存平均)"""
+        def average(values):
+            return sum(values) / len(values) if values else None
+
+        return (
+            self.hits, self.misses, self.hit_bytes, self.size(), self.warm, self.first_paint,
+            average(self.paint_history["cold"]), average(self.paint_history["warm"]),
+        )
@@ -0,0 +1,459 @@
+"""
+基于 playwright.async_api 的异步浏览引擎
+
+与 main.LinuxDoBrowser 的流程一一对应（login / click_topic / click_one_topic / browse_post / click_like），
+区别在于同一个 context 中最多同时打开 CONCURRENCY 个标签页浏览帖子，大部分等待时间可以重叠
+"""
+import asyncio
+import os
+import random
+import time
+
+from loguru import logger
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from session_store import SessionStore
+from retry import RetryEngine, SiteUnhealthy, async_retrying, check_response
+from probe import PageProbe, PROBE_JS, CONNECT_TABLE_JS
+from scroller import ScrollDriver
+from browsers import launch_browser, context_options
+from prefetch import get_yiyan
+from config import (
+    USERNAME, PASSWORD, SESSION_DIR, DATA_DIR, CONCURRENCY, DWELL_MIN, DWELL_MAX, SCROLL_ENGINE,
+    RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, BREAKER_THRESHOLD, FORBIDDEN_THRESHOLD,
+)
+from linuxdo import (
+    HOME_URL, CONNECT_URL, LOGIN_ERROR_SELECTORS, HEADER_READY_SELECTORS, RATE_LIMIT_DIALOGS, ALREADY_LIKED_SELECTORS,
+    DIALOG_CONFIRM_SELECTOR, DAILY_LIMIT_TEXT, DISABLE_SCROLL_JS, RESTORE_SCROLL_JS,
+    parse_limit_wait, topic_like_probability, post_like_probability,
+)
+
+
+async def wait_visible(page, selectors, timeout, state="visible"):
+    """等待 selectors 中任意一个元素达到指定状态，:return: bool 是否在超时前满足"""
+    try:
+        await page.locator(", ".join(selectors)).first.wait_for(state=state, timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def first_visible(page, selectors):
+    """返回 selectors 中第一个可见元素的 (selector, locator)，都不可见时返回 (None, None)"""
+    for selector in selectors:
+        element = page.locator(selector).first
+        if await element.is_visible():
+            return selector, element
+    return None, None
+
+
+class AsyncLinuxDoBrowser:
+    def __init__(self, username=None, password=None, concurrency=CONCURRENCY) -> None:
+        self.username = username or USERNAME
+        self.password = password or PASSWORD
+        self.concurrency = max(1, concurrency)
+        self.connect_info = []  # Connect 数据
+        self.yiyan = None  # 一言，登录后在后台预取
+        self.browse_count = 0  # 浏览帖子计数
+        self.like_count = 0    # 点赞计数
+        self.daily_limit_reached = False  # 标记是否达到每日上限
+        self.like_blocked_until = 0.0  # 频率限制解除的时间，之前不再点赞
+        self.start_time = time.time()  # 记录开始时间
+        self.login_mode = None  # 登录方式：session（复用会话）/ login（账号密码登录）
+        self.login_elapsed = 0  # 登录阶段耗时
+        self.session_store = SessionStore(SESSION_DIR, self.username)
+        self.probe = PageProbe(os.path.join(DATA_DIR, "selector_cache.json"))  # 帖子页面探测
+        self.scroller = ScrollDriver(10, DWELL_MIN, DWELL_MAX)  # 页面内滚动
+        # 与同步版本相同的重试策略和熔断；会话复查是同步接口，连续 403 时直接按 403 熔断
+        self.retry = RetryEngine(RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, BREAKER_THRESHOLD, FORBIDDEN_THRESHOLD)
+
+        self.like_lock = None  # 点赞锁和标签页信号量在 start() 中创建
+        self.tab_semaphore = None
+
+    async def start(self):
+        # Python 3.9 的 Lock / Semaphore 绑定创建时的事件循环，必须在 asyncio.run() 启动的循环中创建
+        # 同一时刻只允许一个标签页执行点赞，保证 like_count / daily_limit_reached 的判断和更新不会交错
+        self.like_lock = asyncio.Lock()
+        self.tab_semaphore = asyncio.Semaphore(self.concurrency)
+        self.pw = await async_playwright().start()
+        self.browser = await launch_browser(self.pw)
+
+        # 优先使用保存的会话创建上下文
+        storage_state = self.session_store.load()
+        self.context = await self.browser.new_context(**context_options(storage_state=storage_state))
+        if SCROLL_ENGINE == "page":
+            await self.scroller.install_async(self.context)
+        self.page = await self.context.new_page()
+        await self.page.goto(HOME_URL)
+
+        probe_start = time.time()
+        self.session_valid = storage_state is not None and await self.check_session()
+        self.login_elapsed = time.time() - probe_start
+
+    async def check_session(self):
+        """检查保存的会话是否仍然有效（只请求一次 /session/current.json）"""
+        try:
+            response = await self.context.request.get(HOME_URL + "session/current.json", timeout=10000)
+            current_user = (await response.json()).get("current_user") if response.ok else None
+            if current_user:
+                logger.success(f"会话有效，跳过登录！用户名: {current_user.get('username', '未知用户')}")
+                return True
+            logger.info(f"会话已过期(HTTP {response.status})，需要重新登录")
+        except Exception as e:
+            logger.warning(f"检查会话失败: {str(e)}")
+        self.session_store.clear()
+        return False
+
+    async def login(self, max_retries=3):
+        """
+        登录函数，支持重试和错误信息提示
+        :param max_retries: 最大重试次数
+        :return: bool 是否登录成功
+        """
+        if not self.username or not self.password:
+            logger.error("环境变量 USERNAME / PASSWORD 未设置")
+            return False
+
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"开始第 {attempt + 1}/{max_retries} 次登录尝试")
+
+                await self.page.locator(".login-button .d-button-label").click()
+                await self.page.locator("#login-account-name").wait_for(timeout=10000)
+                await self.page.fill("#login-account-name", self.username)
+                await self.page.fill("#login-account-password", self.password)
+
+                # 等待 POST /session 返回，再等待页面出现登录结果
+                async with self.page.expect_response(
+                    lambda r: "/session" in r.url and r.request.method == "POST", timeout=15000
+                ):
+                    await self.page.click("#login-button")
+                await wait_visible(self.page, ["#toggle-current-user"] + LOGIN_ERROR_SELECTORS, timeout=10000)
+
+                # 检查错误信息
+                _, error_element = await first_visible(self.page, LOGIN_ERROR_SELECTORS)
+                if error_element:
+                    error_text = (await error_element.inner_text()).strip()
+                    logger.error(f"登录失败: {error_text}")
+                    # 如果是密码错误，直接返回，不需要重试
+                    if "密码" in error_text or "password" in error_text.lower():
+                        return False
+                    await asyncio.sleep(5)
+                    continue
+
+                # 检查是否登录成功
+                user_button = self.page.locator("#toggle-current-user").first
+                if await user_button.is_visible():
+                    aria_label = await user_button.get_attribute("aria-label")
+                    username = None
+                    if aria_label and "的帐户" in aria_label:
+                        username = aria_label.replace(" 的帐户", "")
+                    logger.success(f"登录成功！用户名: {username or '未知用户'}")
+                    return True
+
+                logger.warning("登录状态未知，尝试刷新页面")
+                await self.page.reload(wait_until="domcontentloaded")
+                await wait_visible(self.page, HEADER_READY_SELECTORS, timeout=10000)
+
+            except Exception as e:
+                logger.error(f"登录过程出错: {str(e)}")
+                if attempt < max_retries - 1:  # 如果不是最后一次尝试
+                    logger.info("等待 10 秒后重试...")
+                    await asyncio.sleep(10)
+
+        logger.error(f"登录失败，已尝试 {max_retries} 次")
+        return False
+
+    async def ensure_login(self):
+        """会话有效时直接复用，否则走登录流程并保存新会话"""
+        if self.session_valid:
+            self.login_mode = "session"
+            return True
+        login_start = time.time()
+        if not await self.login():
+            return False
+        self.login_mode = "login"
+        self.login_elapsed += time.time() - login_start
+        self.session_store.save_state(await self.context.storage_state())
+        return True
+
+    async def probe_page(self, page):
+        """一次 evaluate 取出帖子页面的标题、分类、标签和点赞信息"""
+        return self.probe.parse(await page.evaluate(PROBE_JS, self.probe.args()))
+
+    async def click_topic(self):
+        topic_list = await self.page.query_selector_all("#list-area .title")
+        topic_urls = [await topic.get_attribute("href") for topic in topic_list]
+        total_topics = len(topic_urls)
+        logger.info("=" * 50)
+        logger.info(f"共发现 {total_topics} 个主题帖，同时浏览 {self.concurrency} 个")
+        logger.info("=" * 50)
+
+        # 与同步版本一致：每个帖子之后有 10% 概率提前结束，这里提前决定要浏览的数量
+        limit = total_topics
+        for index in range(1, total_topics + 1):
+            if random.random() < 0.1:
+                limit = index
+                logger.info(f"随机退出浏览，本次只浏览前 {limit} 个帖子")
+                break
+
+        async def worker(index, topic_url):
+            async with self.tab_semaphore:
+                if not self.retry.healthy:
+                    return
+                logger.success(f"进度：{index}/{total_topics} ({(index/total_topics*100):.1f}%)")
+                try:
+                    await self.click_one_topic(topic_url, index, total_topics)
+                except SiteUnhealthy:
+                    pass
+
+        await asyncio.gather(*[
+            worker(index, topic_url)
+            for index, topic_url in enumerate(topic_urls[:limit], 1)
+        ])
+        if not self.retry.healthy:
+            logger.error("站点异常，结束浏览")
+        self.probe.cache.save()
+
+    @async_retrying("click_one_topic")
+    async def click_one_topic(self, topic_url, current_index, total_topics):
+        page = await self.context.new_page()
+        full_url = HOME_URL + topic_url
+        try:
+            # 加载超时时也要关闭标签页，否则每次重试都会多留一个；加载错误和 429 / 5xx 交给重试策略
+            check_response(await page.goto(full_url), full_url)
+            await self.read_topic(page, full_url, current_index, total_topics)
+            return True
+        finally:
+            await page.close()
+
+    async def read_topic(self, page, full_url, current_index, total_topics):
+        """读取已经打开的帖子：点赞、滚动；页面本身的错误在这里处理"""
+        try:
+            probe = await self.probe_page(page)
+            title = probe["title"] or "未知标题"
+            logger.info(f"[{current_index}/{total_topics}] 正在浏览: {title} | URL: {full_url}")
+
+            # 如果没有达到每日上限，才考虑点赞
+            if not self.daily_limit_reached:
+                if random.random() < topic_like_probability(self.like_count):
+                    # 最多重试3次
+                    for attempt in range(3):
+                        if await self.click_like(page, probe):
+                            break
+                        logger.info(f"第 {attempt + 1} 次点赞尝试失败，准备重试...")
+                        probe = None  # 重试时重新探测
+
+            await self.browse_post(page, probe)
+            self.browse_count += 1
+        except Exception as e:
+            logger.error(f"浏览帖子时出错: {str(e)}")
+
+    async def browse_post(self, page, probe=None):
+        title = "未知标题"
+        try:
+            probe = probe or await self.probe_page(page)
+            title = probe["title"] or title
+            logger.info(f"已加载页面: {page.url} | 标题: {title}")
+            logger.info(f"分类：{probe['category']}")
+            if probe["tags"]:
+                logger.info(f"标签：{', '.join(probe['tags'])}")
+        except Exception as e:
+            logger.warning(f"获取帖子信息失败: {str(e)}")
+
+        # 整个滚动和停留在页面中完成，等待期间其他标签页继续工作
+        if SCROLL_ENGINE == "page":
+            result = await self.scroller.run_async(page)
+            logger.info(f"滚动 {result['steps']} 次，已加载 {result['posts']} 层 | URL: {result['url']}")
+            return
+
+        prev_url = None
+        # 开始自动滚动，最多滚动10次
+        for _ in range(10):
+            scroll_distance = random.randint(550, 650)  # 随机滚动 550-650 像素
+            await page.evaluate(f"window.scrollBy(0, {scroll_distance})")
+            logger.info("已加载页面: {} | 标题: {}", page.url, title)
+
+            if random.random() < 0.03:
+                logger.success("随机退出浏览")
+                break
+
+            # 检查是否到达页面底部
+            at_bottom = await page.evaluate("window.scrollY + window.innerHeight >= document.body.scrollHeight")
+            current_url = page.url
+            if current_url != prev_url:
+                prev_url = current_url
+            elif at_bottom:
+                logger.success("已到达页面底部，退出浏览")
+                break
+
+            # 等待期间其他标签页继续工作
+            await asyncio.sleep(random.uniform(DWELL_MIN, DWELL_MAX))
+
+    async def click_like(self, page, probe=None):
+        async with self.like_lock:
+            return await self._click_like(page, probe)
+
+    async def _click_like(self, page, probe=None):
+        # 拿到锁之后再检查一次，可能其他标签页刚刚触发了每日上限
+        if self.daily_limit_reached:
+            logger.info("已达到每日点赞上限，跳过点赞")
+            return True
+        if time.time() < self.like_blocked_until:
+            logger.info(f"点赞频率限制中，还需 {self.like_blocked_until - time.time():.0f} 秒，跳过点赞")
+            return True
+
+        try:
+            probe = probe or await self.probe_page(page)
+
+            # 1. 检查是否已经点赞
+            if probe["liked"]:
+                logger.debug(f"检测到已点赞状态: {probe['liked_selector']}")
+                logger.info("已经点过赞了")
+                return True
+
+            # 2. 查找未点赞的按钮
+            if not probe["like_button"]:
+                logger.info("未找到点赞按钮")
+                return True  # 返回 True 因为这不是错误状态
+            logger.debug(f"找到点赞按钮: {probe['like_button']}")
+            like_button = page.locator(probe["like_button"]).first
+
+            # 3. 获取帖子的点赞数
+            likes_count = probe["likes"]
+            logger.info(f"发现帖子，当前点赞数：{likes_count} | URL: {page.url}")
+
+            # 4. 根据点赞数决定点赞概率
+            probability = post_like_probability(likes_count)
+            if random.random() >= probability:
+                logger.info(f"跳过点赞(当前点赞数：{likes_count}，点赞概率：{probability:.0%})")
+                return True
+
+            # 5. 执行点赞
+            logger.info(f"准备点赞(当前点赞数：{likes_count}，点赞概率：{probability:.0%})")
+            await page.evaluate(DISABLE_SCROLL_JS)
+            try:
+                # 点击并等待回应切换接口返回
+                toggle_response = None
+                try:
+                    async with page.expect_response(
+                        lambda r: "/discourse-reactions/posts/" in r.url and r.request.method == "PUT", timeout=5000
+                    ) as response_info:
+                        await like_button.click()
+                    toggle_response = await response_info.value
+                except PlaywrightTimeoutError:
+                    pass
+
+                # 接口成功时不会有限制弹窗；失败或没等到响应时再等待弹窗出现
+                if toggle_response is None or not toggle_response.ok:
+                    await wait_visible(page, [dialog['selector'] for dialog in RATE_LIMIT_DIALOGS], timeout=3000)
+                    for dialog in RATE_LIMIT_DIALOGS:
+                        try:
+                            limit_dialog = page.locator(dialog['selector']).first
+                            if not await limit_dialog.is_visible():
+                                continue
+                            dialog_text = await limit_dialog.inner_text()
+
+                            # 点击确定按钮关闭弹窗
+                            confirm_button = page.locator(DIALOG_CONFIRM_SELECTOR).first
+                            if await confirm_button.count():
+                                await confirm_button.click()
+                                await wait_visible(page, [".dialog-content"], timeout=3000, state="hidden")
+
+                            # 如果是每日上限，设置标记并返回
+                            if DAILY_LIMIT_TEXT in dialog_text:
+                                logger.warning("已达到每日点赞上限，后续帖子将不再尝试点赞")
+                                self.daily_limit_reached = True
+                                return False
+
+                            # 频率限制：记下解除时间后马上释放点赞锁，期间其他标签页照常浏览，只是跳过点赞
+                            wait_seconds = parse_limit_wait(dialog, dialog_text)
+                            logger.warning(f"{dialog['message']}，暂停点赞 {wait_seconds} 秒，继续浏览")
+                            self.like_blocked_until = time.time() + wait_seconds + 2
+                            return False
+                        except Exception as e:
+                            logger.debug(f"检查限制弹窗失败: {str(e)}")
+
+                # 点赞成功后等待点赞状态更新，再重新获取点赞数
+                await wait_visible(page, ALREADY_LIKED_SELECTORS, timeout=3000)
+                after = await self.probe_page(page)
+                current_likes = after["likes"]
+                if current_likes <= likes_count:  # 如果点赞数没有增加
+                    logger.warning(f"点赞可能失败 ❌ | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes}")
+                    return False
+
+                self.like_count += 1
+                floor_text = f" | 楼层: {after['floor']}" if after["floor"] else ""
+                logger.success(f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes}{floor_text}")
+            finally:
+                # 恢复页面滚动
+                await page.evaluate(RESTORE_SCROLL_JS)
+            return True
+
+        except Exception as e:
+            logger.error(f"点赞失败: {str(e)}")
+            try:
+                await page.evaluate(RESTORE_SCROLL_JS)
+            except Exception:
+                pass
+            return False
+
+    async def get_connect_info(self):
+        """读取 connect.linux.do 的信任等级数据"""
+        page = await self.context.new_page()
+        try:
+            await page.goto(CONNECT_URL)
+            return await page.evaluate(CONNECT_TABLE_JS)
+        finally:
+            await page.close()
+
+    def get_stats(self):
+        """汇总运行结果，格式与 LinuxDoBrowser.get_stats 一致"""
+        return {
+            "username": self.username or "未知用户",
+            "status": "成功",
+            "browse_count": self.browse_count,
+            "like_count": self.like_count,
+            "login_mode": self.login_mode,
+            "login_elapsed": self.login_elapsed,
+            "elapsed": time.time() - self.start_time,
+            "connect_info": self.connect_info,
+            "yiyan": self.yiyan,
+            "retry_summary": self.retry.summary(),
+        }
+
+    async def close(self):
+        try:
+            await self.context.close()
+            await self.browser.close()
+            await self.pw.stop()
+        except Exception as e:
+            logger.debug(f"关闭浏览器失败: {str(e)}")
+
+    async def run(self):
+        """
+        完整执行一次：登录 -> 并发浏览 -> 读取 Connect 数据
+        :return: get_stats() 结果，登录失败时返回 None
+        """
+        await self.start()
+        try:
+            if not await self.ensure_login():
+                logger.error("登录失败，程序终止")
+                return None
+            # Connect 数据和一言在浏览期间同时获取
+            connect_task = asyncio.create_task(self.get_connect_info())
+            try:
+                yiyan_task = asyncio.get_running_loop().run_in_executor(None, get_yiyan)
+                await self.click_topic()
+                logger.info("获取连接信息")
+                self.connect_info = await connect_task
+                self.yiyan = await yiyan_task
+            finally:
+                # 浏览出错时不再等待 Connect 数据，关闭 context 前取消
+                if not connect_task.done():
+                    connect_task.cancel()
+            # 服务器会轮换 _t cookie，运行结束时写回最新的会话
+            self.session_store.save_state(await self.context.storage_state())
+            return self.get_stats()
+        finally:
+            await self.close()
@@ -0,0 +1,134 @@
+"""
+整次运行的离线回放：先访问 linux.do 把一次完整运行（登录、浏览帖子、点赞、Connect 数据）的浏览器请求录制成 HAR，
+之后每次回放都只用录制的响应，不访问网络。随机种子和停留时间固定，同一份代码的多次回放走过相同的流程，
+不同提交之间对比墙钟时间和 Playwright 调用次数就能看出端到端的性能变化
+
+    python bench/replay.py record                       # 录制一次，需要 USERNAME / PASSWORD
+    python bench/replay.py replay --repeat 3 --json .data/replay.json
+
+回放时要使用和录制时相同的 USERNAME / PASSWORD（登录请求按请求体匹配）。
+HAR 中包含账号密码和会话 cookies，不要提交到仓库（bench/har/ 已加入 .gitignore）。
+每次运行都在独立的进程和临时的 DATA_DIR / SESSION_DIR 中进行，不会读写平时运行的数据
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from tabulate import tabulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metrics import percentile  # noqa: E402
+from run import CallCounter, git_revision  # noqa: E402
+
+DEFAULT_HAR = os.path.join(ROOT, "bench", "har", "run.zip")
+
+
+def run_child(out_path):
+    """在当前进程中完整运行一次 LinuxDoBrowser.run()，结果写入 out_path"""
+    from main import LinuxDoBrowser
+
+    counter = CallCounter()
+    started = time.perf_counter()
+    browser = LinuxDoBrowser()
+    exit_code = 0
+    try:
+        browser.run()
+    except SystemExit as e:
+        exit_code = e.code or 0
+    wall = time.perf_counter() - started
+    stats = browser.get_stats()
+    browser.close()  # 录制模式下关闭 context 时写入 HAR
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "wall_seconds": wall,
+            "calls": counter.count if counter.available else None,
+            "exit_code": exit_code,
+            "browse_count": stats["browse_count"],
+            "like_count": stats["like_count"],
+            "phases": stats["phase_table"],
+        }, f, ensure_ascii=False)
+
+
+def run_once(mode, har_path, seed):
+    """在独立进程和临时目录中运行一次"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = os.path.join(tmp_dir, "result.json")
+        env = dict(
+            os.environ,
+            HAR_MODE=mode, HAR_PATH=har_path, HAR_SEED=str(seed),
+            DATA_DIR=os.path.join(tmp_dir, "data"),
+            SESSION_DIR=os.path.join(tmp_dir, "session"),
+            METRICS_DIR=os.path.join(tmp_dir, "metrics"),
+        )
+        env.pop("ACCOUNTS_FILE", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", out_path], env=env, cwd=ROOT)
+        if not os.path.exists(out_path):
+            return None
+        with open(out_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="整次运行的 HAR 录制 / 离线回放")
+    parser.add_argument("mode", nargs="?", choices=["record", "replay"], default="replay")
+    parser.add_argument("--har", default=DEFAULT_HAR, help="HAR 文件路径，以 .zip 结尾时响应内容单独存放")
+    parser.add_argument("--repeat", type=int, default=1, help="回放次数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子，录制和回放要相同")
+    parser.add_argument("--json", help="结果另存为 JSON 文件")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return 0
+    if not os.environ.get("USERNAME") or not os.environ.get("PASSWORD"):
+        print("Please set USERNAME and PASSWORD")
+        return 1
+
+    har_path = os.path.abspath(args.har)
+    if args.mode == "replay" and not os.path.exists(har_path):
+        print(f"HAR 文件不存在: {har_path}，先运行 python bench/replay.py record")
+        return 1
+    repeat = 1 if args.mode == "record" else max(1, args.repeat)
+
+    results = []
+    for index in range(repeat):
+        result = run_once(args.mode, har_path, args.seed)
+        if result is None:
+            print(f"第 {index + 1} 次运行没有输出结果")
+            return 1
+        results.append(result)
+
+    table = [
+        [
+            index + 1, f"{r['wall_seconds']:.1f}", "-" if r["calls"] is None else r["calls"],
+            r["browse_count"], r["like_count"], r["exit_code"],
+        ]
+        for index, r in enumerate(results)
+    ]
+    print(tabulate(table, headers=["次数", "墙钟秒数", "调用次数", "浏览", "点赞", "退出码"], tablefmt="github"))
+    walls = [r["wall_seconds"] for r in results]
+    print(f"\n{args.mode}：墙钟 p50 {percentile(walls, 50):.1f} 秒，HAR {har_path}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": git_revision(),
+                "timestamp": time.time(),
+                "mode": args.mode,
+                "seed": args.seed,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+
+    return 0 if all(r["exit_code"] == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
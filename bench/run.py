@@ -0,0 +1,203 @@
+"""
+离线基准测试：用本地无头浏览器（BROWSER_ENGINE）加载 bench/snapshots 下保存的页面快照（page.set_content，不访问网络），
+对每个页面统计提取例程的单次耗时和 Playwright 调用次数，并按 manifest.json 校验提取结果
+
+    python bench/run.py --repeat 20 --json .data/bench.json
+
+不同提交之间对比输出的表格或 JSON，就能看出选择器级联的改动是变快还是变慢
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+
+from playwright.sync_api import sync_playwright
+from tabulate import tabulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from probe import PageProbe, read_limit_dialog, read_connect_table  # noqa: E402
+from linuxdo import parse_limit_wait  # noqa: E402
+from metrics import percentile  # noqa: E402
+from browsers import launch_browser, context_options  # noqa: E402
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+
+class CallCounter:
+    """统计发给浏览器驱动的协议消息数，即 Playwright 调用次数"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.available = False
+        try:
+            from playwright._impl._connection import Connection
+        except ImportError:
+            return
+        original = getattr(Connection, "_send_message_to_server", None)
+        if original is None:
+            return
+        counter = self
+
+        def send(connection, *args, **kwargs):
+            counter.count += 1
+            return original(connection, *args, **kwargs)
+
+        Connection._send_message_to_server = send
+        self.available = True
+
+
+def load_manifest():
+    with open(os.path.join(SNAPSHOT_DIR, "manifest.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_topic(result, expect):
+    return [key for key, value in expect.items() if result.get(key) != value]
+
+
+def check_dialog(result, expect):
+    dialog, text = result
+    if not dialog:
+        return ["dialog"]
+    failed = []
+    if dialog["message"] != expect["message"]:
+        failed.append("message")
+    if parse_limit_wait(dialog, text) != expect["wait"]:
+        failed.append("wait")
+    return failed
+
+
+def check_no_dialog(result, expect):
+    return ["dialog"] if result[0] else []
+
+
+def check_connect(result, expect):
+    failed = []
+    if len(result) != expect["rows"]:
+        failed.append("rows")
+    if not result or result[0] != expect["first"]:
+        failed.append("first")
+    return failed
+
+
+def routines(kind, probe):
+    """
+    每类页面要测的提取例程
+    :return: [(例程名, 函数, 校验函数)]
+    """
+    if kind == "topic":
+        return [
+            ("probe", probe.probe, check_topic),
+            # 点赞请求失败后检查弹窗，正常页面上应该找不到
+            ("limit_dialog", read_limit_dialog, check_no_dialog),
+        ]
+    if kind == "dialog":
+        return [("limit_dialog", read_limit_dialog, check_dialog)]
+    if kind == "connect":
+        return [("connect_table", read_connect_table, check_connect)]
+    return []
+
+
+def bench_page(page, counter, name, item, repeat, cache_path):
+    """加载一个快照并多次执行它的提取例程"""
+    with open(os.path.join(SNAPSHOT_DIR, name), "r", encoding="utf-8") as f:
+        page.set_content(f.read())
+
+    # 每个页面用新的探测器，第一次调用是冷缓存，后续是热缓存，和真实运行一致
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    probe = PageProbe(cache_path)
+
+    rows = []
+    for routine, func, check in routines(item["kind"], probe):
+        durations = []
+        calls_before = counter.count
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(page)
+            durations.append((time.perf_counter() - started) * 1000)
+        calls = (counter.count - calls_before) / repeat if counter.available else None
+        failed = check(result, item["expect"])
+        rows.append({
+            "page": name,
+            "routine": routine,
+            "repeat": repeat,
+            "first_ms": durations[0],
+            "mean_ms": sum(durations) / len(durations),
+            "p95_ms": percentile(durations, 95),
+            "calls": calls,
+            "failed": failed,
+        })
+    return rows
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线提取例程基准测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每个例程在每个页面上执行的次数")
+    parser.add_argument("--json", help="结果另存为 JSON 文件")
+    parser.add_argument("--only", help="只测文件名包含该字符串的快照")
+    args = parser.parse_args()
+    repeat = max(1, args.repeat)
+
+    manifest = load_manifest()
+    counter = CallCounter()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir, sync_playwright() as pw:
+        browser = launch_browser(pw)
+        context = browser.new_context(**context_options())
+        # 快照不应触发任何网络请求，全部拦截
+        context.route("**/*", lambda route: route.abort())
+        page = context.new_page()
+        cache_path = os.path.join(tmp_dir, "selector_cache.json")
+        for name, item in manifest.items():
+            if args.only and args.only not in name:
+                continue
+            rows.extend(bench_page(page, counter, name, item, repeat, cache_path))
+        browser.close()
+
+    table = [
+        [
+            row["page"], row["routine"], f"{row['first_ms']:.2f}", f"{row['mean_ms']:.2f}", f"{row['p95_ms']:.2f}",
+            "-" if row["calls"] is None else f"{row['calls']:.1f}",
+            "ok" if not row["failed"] else "失败: " + ", ".join(row["failed"]),
+        ]
+        for row in rows
+    ]
+    print(tabulate(
+        table, headers=["页面", "例程", "首次 ms", "平均 ms", "p95 ms", "每次调用数", "校验"], tablefmt="github"
+    ))
+    total_ms = sum(row["mean_ms"] for row in rows)
+    print(f"\n合计平均耗时 {total_ms:.2f} ms，重复 {repeat} 次")
+    if not counter.available:
+        print("当前 Playwright 版本无法统计调用次数")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": git_revision(),
+                "timestamp": time.time(),
+                "repeat": repeat,
+                "results": rows,
+            }, f, ensure_ascii=False, indent=2)
+
+    return 1 if any(row["failed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+浏览器引擎启动基准测试：对每个引擎冷启动浏览器若干次，统计启动耗时、第一次打开首页和之后每个帖子页面的加载耗时。
+页面请求全部由 context.route 用 bench/snapshots 下的快照应答（首页为 home.html，帖子为 manifest.json 中的帖子快照），
+不访问网络，结果只反映浏览器本身的差异
+
+    python bench/startup.py --engines firefox,chromium,webkit --repeat 3 --json .data/startup.json
+
+没有安装的引擎会标记为启动失败并跳过，安装方式：playwright install chromium
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+from tabulate import tabulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from browsers import ENGINES, launch_browser, context_options  # noqa: E402
+from linuxdo import HOME_URL  # noqa: E402
+from metrics import percentile  # noqa: E402
+from run import SNAPSHOT_DIR, load_manifest, git_revision  # noqa: E402
+
+
+def load_fixtures():
+    """
+    :return: {路径: 快照 HTML}，首页加上 manifest 中的每个帖子
+    """
+    fixtures = {}
+    with open(os.path.join(SNAPSHOT_DIR, "home.html"), "r", encoding="utf-8") as f:
+        fixtures["/"] = f.read()
+    for name, item in load_manifest().items():
+        if item["kind"] != "topic":
+            continue
+        with open(os.path.join(SNAPSHOT_DIR, name), "r", encoding="utf-8") as f:
+            fixtures[f"/t/topic/{item['expect']['topic_id']}"] = f.read()
+    return fixtures
+
+
+def serve(fixtures):
+    """用快照应答本站页面，其他请求全部拦截"""
+    def handler(route):
+        path = urlparse(route.request.url).path
+        if path in fixtures:
+            route.fulfill(status=200, content_type="text/html; charset=utf-8", body=fixtures[path])
+        else:
+            route.abort()
+
+    return handler
+
+
+def bench_engine(pw, engine, fixtures, topics):
+    """冷启动一次浏览器，依次打开首页和各帖子"""
+    started = time.perf_counter()
+    browser = launch_browser(pw, engine)
+    launch_ms = (time.perf_counter() - started) * 1000
+    try:
+        context = browser.new_context(**context_options())
+        context.route("**/*", serve(fixtures))
+        page = context.new_page()
+
+        started = time.perf_counter()
+        page.goto(HOME_URL)
+        home_ms = (time.perf_counter() - started) * 1000
+
+        topic_ms = []
+        for path in topics:
+            started = time.perf_counter()
+            page.goto(HOME_URL + path.lstrip("/"))
+            topic_ms.append((time.perf_counter() - started) * 1000)
+        return launch_ms, home_ms, topic_ms
+    finally:
+        browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器引擎启动基准测试")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="要测的引擎，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每个引擎冷启动的次数")
+    parser.add_argument("--rounds", type=int, default=3, help="每次启动后把全部帖子打开几轮")
+    parser.add_argument("--json", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+    repeat = max(1, args.repeat)
+
+    fixtures = load_fixtures()
+    topics = [path for path in fixtures if path != "/"] * max(1, args.rounds)
+    results = []
+    with sync_playwright() as pw:
+        for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+            result = {"engine": engine, "launch_ms": [], "home_ms": [], "topic_ms": [], "error": None}
+            for _ in range(repeat):
+                try:
+                    launch_ms, home_ms, topic_ms = bench_engine(pw, engine, fixtures, topics)
+                except Exception as e:
+                    result["error"] = str(e).splitlines()[0]
+                    break
+                result["launch_ms"].append(launch_ms)
+                result["home_ms"].append(home_ms)
+                result["topic_ms"].extend(topic_ms)
+            results.append(result)
+
+    table = []
+    totals = {}
+    for result in results:
+        if result["error"]:
+            table.append([result["engine"], "-", "-", "-", "-", "-", "启动失败: " + result["error"]])
+            continue
+        launch = percentile(result["launch_ms"], 50)
+        home = percentile(result["home_ms"], 50)
+        topic = percentile(result["topic_ms"], 50)
+        # 按一次定时任务估算：启动 + 首页 + 10 个帖子
+        totals[result["engine"]] = launch + home + topic * 10
+        table.append([
+            result["engine"], f"{launch:.0f}", f"{home:.0f}", f"{topic:.1f}",
+            f"{percentile(result['topic_ms'], 95):.1f}", f"{totals[result['engine']]:.0f}", "ok",
+        ])
+    print(tabulate(
+        table,
+        headers=["引擎", "启动 p50 ms", "首页 p50 ms", "帖子 p50 ms", "帖子 p95 ms", "启动+首页+10帖 ms", "状态"],
+        tablefmt="github",
+    ))
+    if totals:
+        fastest = min(totals, key=totals.get)
+        print(f"\n冷启动 {repeat} 次，按启动 + 首页 + 10 个帖子估算最快的是 {fastest}，可设置 BROWSER_ENGINE={fastest}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": git_revision(),
+                "timestamp": time.time(),
+                "repeat": repeat,
+                "context_options": context_options(),
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+
+    return 0 if totals else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
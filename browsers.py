@@ -0,0 +1,53 @@
+"""
+浏览器引擎和启动参数：BROWSER_ENGINE 选择 firefox / chromium / webkit，视口、语言和启动参数从配置读取，
+同步、异步引擎、守护模式和基准测试共用
+"""
+from config import BROWSER_ENGINE, BROWSER_CHANNEL, BROWSER_ARGS, VIEWPORT, LOCALE
+
+ENGINES = ("firefox", "chromium", "webkit")
+
+
+def parse_viewport(text):
+    """
+    :param text: 形如 1280x720
+    :return: {"width": 1280, "height": 720}，留空或格式不对时返回 None（使用 Playwright 默认值）
+    """
+    try:
+        width, height = text.lower().split("x")
+        return {"width": int(width), "height": int(height)}
+    except ValueError:
+        return None
+
+
+def launch_options(engine=BROWSER_ENGINE):
+    options = {"headless": True, "timeout": 30000}
+    if BROWSER_ARGS:
+        options["args"] = BROWSER_ARGS
+    if BROWSER_CHANNEL and engine == "chromium":
+        options["channel"] = BROWSER_CHANNEL
+    return options
+
+
+def context_options(**kwargs):
+    """
+    新建 context 的参数
+    :param kwargs: 其他参数，例如 storage_state
+    """
+    options = {}
+    viewport = parse_viewport(VIEWPORT)
+    if viewport:
+        options["viewport"] = viewport
+    if LOCALE:
+        options["locale"] = LOCALE
+    options.update(kwargs)
+    return options
+
+
+def launch_browser(pw, engine=BROWSER_ENGINE):
+    """
+    启动浏览器，单账号、多账号、守护模式共用
+    :param pw: 同步或异步的 Playwright，异步时返回协程
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"不支持的浏览器引擎: {engine}，可选 {', '.join(ENGINES)}")
+    return getattr(pw, engine).launch(**launch_options(engine))
@@ -0,0 +1,121 @@
+"""
+时间预算：给整次运行一个墙钟时间上限（例如定时任务的 30 分钟超时），按历史测得的单个帖子耗时
+估算还能读几个帖子，运行中根据剩余时间缩短停留时间、提前结束，保证在超时前正常收尾
+
+单个帖子的耗时按 固定开销 + 滚动次数 × 平均停留 估算，两个参数用指数滑动平均跨运行保存
+"""
+import os
+import json
+import time
+import tempfile
+
+from loguru import logger
+
+DEFAULT_OVERHEAD = 8.0  # 没有历史数据时，打开帖子、探测、点赞等固定开销（秒）
+DEFAULT_STEPS = 6.0  # 没有历史数据时，每个帖子的平均滚动次数
+SMOOTHING = 0.3  # 指数滑动平均的权重
+MIN_DWELL_FACTOR = 0.5  # 停留时间最多缩短到配置值的一半
+
+
+class TimeBudget:
+    def __init__(self, budget_seconds, dwell_min, dwell_max, history_path=None, reserve_seconds=120,
+                 start_time=None) -> None:
+        """
+        :param budget_seconds: 整次运行的时间上限，0 表示不限
+        :param dwell_min: 配置的最短停留秒数
+        :param dwell_max: 配置的最长停留秒数
+        :param history_path: 保存单个帖子耗时模型的文件
+        :param reserve_seconds: 留给收尾（剩余点赞、Connect 数据、报告）的时间
+        """
+        self.budget = budget_seconds
+        self.start_time = start_time or time.time()
+        self.reserve = reserve_seconds
+        self.base_min = dwell_min
+        self.base_max = dwell_max
+        self.factor = 1.0  # 当前停留时间相对配置值的比例
+        self.history_path = history_path
+        self.overhead = DEFAULT_OVERHEAD
+        self.steps = DEFAULT_STEPS
+        self.samples = 0  # 本次记录的帖子数
+        if history_path:
+            try:
+                with open(history_path, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+                self.overhead = history.get("overhead", self.overhead)
+                self.steps = history.get("steps", self.steps)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.debug(f"读取帖子耗时记录失败: {str(e)}")
+
+    @property
+    def enabled(self):
+        return self.budget > 0
+
+    def deadline(self):
+        """必须开始收尾的时间"""
+        return self.start_time + self.budget - self.reserve
+
+    def remaining(self):
+        """开始收尾前还剩多少秒，不限时返回无穷大"""
+        if not self.enabled:
+            return float("inf")
+        return self.deadline() - time.time()
+
+    def dwell(self):
+        """:return: 当前的 (最短, 最长) 停留秒数"""
+        return self.base_min * self.factor, self.base_max * self.factor
+
+    def estimate(self, factor=None):
+        """按当前（或指定）的停留比例估算读一个帖子的秒数"""
+        factor = self.factor if factor is None else factor
+        return self.overhead + self.steps * (self.base_min + self.base_max) / 2 * factor
+
+    def reading_seconds(self):
+        """剩余时间内可以用来读帖子的秒数，供调度器规划队列"""
+        return max(0.0, self.remaining()) if self.enabled else 0
+
+    def can_start(self):
+        """剩余时间是否够用最短停留再读一个帖子"""
+        return self.remaining() >= self.estimate(MIN_DWELL_FACTOR)
+
+    def adjust(self, topics_left):
+        """
+        按剩余时间和剩余帖子数重新计算停留比例：时间不够时缩短停留，最多缩到一半，不会延长
+        :return: (最短, 最长) 停留秒数
+        """
+        if not self.enabled or topics_left <= 0:
+            return self.dwell()
+        per_topic = self.remaining() / topics_left
+        base_mean = (self.base_min + self.base_max) / 2
+        needed = (per_topic - self.overhead) / max(self.steps, 1) / base_mean if base_mean else 1.0
+        factor = max(MIN_DWELL_FACTOR, min(1.0, needed))
+        if abs(factor - self.factor) >= 0.05:
+            logger.info(
+                f"剩余 {self.remaining():.0f} 秒、{topics_left} 个帖子，停留时间调整为配置值的 {factor:.0%}"
+            )
+        self.factor = factor
+        return self.dwell()
+
+    def record(self, seconds, steps):
+        """
+        记录一个帖子的实际耗时，更新耗时模型
+        :param steps: 实际滚动次数
+        """
+        dwell_mean = (self.base_min + self.base_max) / 2 * self.factor
+        overhead = max(0.0, seconds - steps * dwell_mean)
+        self.overhead += SMOOTHING * (overhead - self.overhead)
+        self.steps += SMOOTHING * (steps - self.steps)
+        self.samples += 1
+
+    def save(self):
+        if not self.history_path or not self.samples:
+            return
+        try:
+            directory = os.path.dirname(self.history_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump({"overhead": self.overhead, "steps": self.steps}, f, indent=2)
+            os.replace(f.name, self.history_path)
+        except Exception as e:
+            logger.debug(f"保存帖子耗时记录失败: {str(e)}")
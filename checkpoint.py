@@ -0,0 +1,64 @@
+"""
+运行断点：每读完一个帖子把帖子队列、当前位置、计数和用时写入一个小的 JSON 文件，
+运行被定时任务超时杀掉后，下一次运行从断点继续，而不是重新开始
+"""
+import os
+import json
+import time
+import tempfile
+
+from loguru import logger
+
+
+class RunInterrupted(BaseException):
+    """收到 SIGTERM / SIGINT 时抛出，继承 BaseException，不会被各处的 except Exception 吞掉"""
+
+
+def raise_interrupted(signum, frame):
+    raise RunInterrupted(signum)
+
+
+class Checkpoint:
+    def __init__(self, path, max_age_hours=26) -> None:
+        """
+        :param path: 断点文件路径
+        :param max_age_hours: 超过该时间的断点视为过期，不再继续
+        """
+        self.path = path
+        self.max_age = max_age_hours * 3600
+
+    def load(self):
+        """
+        :return: 未过期的断点，没有或已过期时返回 None
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取断点失败: {str(e)}")
+            return None
+        if time.time() - state.get("saved_at", 0) > self.max_age:
+            logger.info("断点已过期，重新开始")
+            self.clear()
+            return None
+        return state
+
+    def save(self, state):
+        """先写临时文件再替换，进程在写入中途被杀也不会留下损坏的文件"""
+        state = dict(state, saved_at=time.time())
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(f.name, self.path)
+        except Exception as e:
+            logger.warning(f"保存断点失败: {str(e)}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,114 @@
+"""
+运行配置，全部从环境变量读取
+"""
+import os
+
+USERNAME = os.environ.get("USERNAME")
+PASSWORD = os.environ.get("PASSWORD")
+
+SESSION_DIR = os.environ.get("SESSION_DIR", ".session")  # 会话保存目录
+DATA_DIR = os.environ.get("DATA_DIR", ".data")  # 跨运行保存的数据（选择器缓存等）
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(DATA_DIR, "metrics"))  # 运行指标导出目录
+ACCOUNTS_FILE = os.environ.get("ACCOUNTS_FILE")  # 多账号文件，每行一个 用户名:密码
+WORKERS = int(os.environ.get("WORKERS", os.cpu_count() or 1))  # 多账号模式的进程数
+
+ENGINE = os.environ.get("ENGINE", "sync")  # 浏览引擎：sync（默认）/ async
+CONCURRENCY = int(os.environ.get("CONCURRENCY", 3))  # async 引擎同时浏览的标签页数
+
+# 模拟阅读的停留时间（秒），每次滚动后随机停留 DWELL_MIN ~ DWELL_MAX
+DWELL_MIN = float(os.environ.get("DWELL_MIN", 2))
+DWELL_MAX = float(os.environ.get("DWELL_MAX", 4))
+
+# 通过 Discourse JSON 接口获取帖子列表和元数据（1 开启 / 0 关闭），失败时自动改为读取页面
+API_READ = os.environ.get("API_READ", "1") == "1"
+API_CONCURRENCY = int(os.environ.get("API_CONCURRENCY", 4))  # 接口并发请求数
+
+# 资源拦截档位：full（不拦截）/ lean（屏蔽图片、音视频、字体）/ minimal（lean + 屏蔽第三方域名）
+BLOCK_PROFILE = os.environ.get("BLOCK_PROFILE", "lean")
+ALLOW_HOSTS = [h.strip() for h in os.environ.get("ALLOW_HOSTS", "").split(",") if h.strip()]  # minimal 档位额外放行的域名
+
+INDEX_TTL_DAYS = int(os.environ.get("INDEX_TTL_DAYS", 30))  # 已读 / 已点赞索引的保存天数
+
+# 帖子调度：从这些列表及其前 FEED_PAGES 页收集候选帖子，按每秒价值排序后阅读
+FEEDS = [f.strip() for f in os.environ.get("FEEDS", "latest,new,unread,top").split(",") if f.strip()]
+FEED_PAGES = int(os.environ.get("FEED_PAGES", 2))
+TARGET_TOPICS = int(os.environ.get("TARGET_TOPICS", 10))  # 每次阅读的帖子数，0 表示不限
+TARGET_READ_MINUTES = float(os.environ.get("TARGET_READ_MINUTES", 0))  # 每次阅读的时间，0 表示不限
+
+# 守护模式（python daemon.py）：常驻进程保持浏览器和各账号的 context，按间隔或收到触发时运行一轮
+DAEMON_INTERVAL_MINUTES = float(os.environ.get("DAEMON_INTERVAL_MINUTES", 360))  # 自动运行间隔，0 表示只在触发时运行
+DAEMON_SOCKET = os.environ.get("DAEMON_SOCKET", os.path.join(DATA_DIR, "daemon.sock"))  # 控制用的 UNIX socket，留空关闭
+DAEMON_HTTP_PORT = int(os.environ.get("DAEMON_HTTP_PORT", 0))  # 控制用的 HTTP 端口（只监听 127.0.0.1），0 表示关闭
+DAEMON_RECYCLE_CYCLES = int(os.environ.get("DAEMON_RECYCLE_CYCLES", 20))  # 运行多少轮后重启浏览器，0 表示不限
+DAEMON_MEMORY_MB = int(os.environ.get("DAEMON_MEMORY_MB", 1500))  # 进程树内存超过该值时重启浏览器，0 表示不限
+
+# 点赞调度：令牌桶控制点赞频率，触发频率限制时暂停点赞但继续浏览
+LIKE_RATE_PER_MINUTE = float(os.environ.get("LIKE_RATE_PER_MINUTE", 4))  # 平均每分钟最多点赞数
+LIKE_BURST = int(os.environ.get("LIKE_BURST", 2))  # 允许连续点赞的次数
+LIKE_DAILY_LIMIT = int(os.environ.get("LIKE_DAILY_LIMIT", 0))  # 24 小时点赞上限，0 表示从每日上限弹窗中学习
+LIKE_DRAIN_SECONDS = float(os.environ.get("LIKE_DRAIN_SECONDS", 60))  # 浏览结束后最多再等多久处理剩余的点赞
+
+# 滚动方式：page（整个滚动和停留在页面脚本中完成，只回报进度）/ python（每一步由 Python 控制）
+SCROLL_ENGINE = os.environ.get("SCROLL_ENGINE", "page")
+
+# 标签页池：帖子之间复用的标签页数量，0 表示每个帖子新建标签页
+PAGE_POOL_SIZE = int(os.environ.get("PAGE_POOL_SIZE", 2))
+# 进程树（Python + 浏览器）内存比第一个帖子读完时增长超过该值时重建 context（保留登录状态），0 表示不重建
+CONTEXT_MEMORY_MB = int(os.environ.get("CONTEXT_MEMORY_MB", 1024))
+CONTEXT_RECYCLE_COOLDOWN = int(os.environ.get("CONTEXT_RECYCLE_COOLDOWN", 5))  # 重建后至少再读多少个帖子才会再次重建
+
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("CHECKPOINT_MAX_AGE_HOURS", 26))  # 断点有效期，超过后重新开始
+
+# 时间预算：整次运行的墙钟时间上限（分钟，0 表示不限），按历史耗时调整帖子数和停留时间，在超时前收尾
+RUN_BUDGET_MINUTES = float(os.environ.get("RUN_BUDGET_MINUTES", 25))
+BUDGET_RESERVE_SECONDS = float(os.environ.get("BUDGET_RESERVE_SECONDS", 120))  # 留给收尾的时间
+
+# 重试策略：指数退避（首次 RETRY_BASE_SECONDS 秒，上限 RETRY_MAX_SECONDS 秒）加随机抖动
+RETRY_BASE_SECONDS = float(os.environ.get("RETRY_BASE_SECONDS", 1))
+RETRY_MAX_SECONDS = float(os.environ.get("RETRY_MAX_SECONDS", 30))
+BREAKER_THRESHOLD = int(os.environ.get("BREAKER_THRESHOLD", 6))  # 连续多少次加载超时 / 429 / 5xx 后停止运行，0 表示不熔断
+FORBIDDEN_THRESHOLD = int(os.environ.get("FORBIDDEN_THRESHOLD", 3))  # 连续多少次 403 后复查会话并停止运行，0 表示不熔断
+
+# 浏览器引擎：firefox（默认）/ chromium / webkit，python bench/startup.py 可以对比各引擎的启动和加载耗时
+BROWSER_ENGINE = os.environ.get("BROWSER_ENGINE", "firefox")
+BROWSER_CHANNEL = os.environ.get("BROWSER_CHANNEL", "")  # chromium 的发行渠道，例如 chrome、msedge，留空使用 Playwright 自带的版本
+BROWSER_ARGS = os.environ.get("BROWSER_ARGS", "").split()  # 额外的启动参数，空格分隔
+VIEWPORT = os.environ.get("VIEWPORT", "")  # 视口大小，例如 1280x720，留空使用 Playwright 默认值
+LOCALE = os.environ.get("LOCALE", "")  # 浏览器语言，例如 zh-CN，留空使用系统默认值
+
+# 点赞方式：api（直接请求回应切换接口，失败时改为点击）/ dom（点击页面上的点赞按钮）
+LIKE_BACKEND = os.environ.get("LIKE_BACKEND", "api")
+LIKE_REACTION = os.environ.get("LIKE_REACTION", "heart")  # 点赞使用的回应
+
+# 停留方式：credit（服务器确认全部楼层的阅读后提前结束，离开前提交阅读时间）/ fixed（按固定步数和时间滚动）
+DWELL_MODE = os.environ.get("DWELL_MODE", "credit")
+CREDIT_FLUSH_SECONDS = float(os.environ.get("CREDIT_FLUSH_SECONDS", 5))  # 停留期间每隔多少秒提交一次阅读时间
+CREDIT_SETTLE_SECONDS = float(os.environ.get("CREDIT_SETTLE_SECONDS", 5))  # 离开帖子前最多等待服务器确认的秒数
+
+# HAR 录制 / 回放（python bench/replay.py）：record 把整次运行的浏览器请求录制到 HAR_PATH，replay 只用录制的响应离线运行
+HAR_MODE = os.environ.get("HAR_MODE", "")
+HAR_PATH = os.environ.get("HAR_PATH", os.path.join("bench", "har", "run.zip"))
+HAR_SEED = int(os.environ.get("HAR_SEED", 1))  # Python 和页面的随机种子
+HAR_DWELL_SECONDS = float(os.environ.get("HAR_DWELL_SECONDS", 1))  # 固定的停留时间
+if HAR_MODE:
+    # 固定停留时间，关闭浏览器之外的请求（接口读取、接口点赞）和依赖计时的行为（阅读确认、重建 context），
+    # 录制和回放发出的请求才能一一对应
+    DWELL_MIN = DWELL_MAX = HAR_DWELL_SECONDS
+    API_READ = False
+    LIKE_BACKEND = "dom"
+    DWELL_MODE = "fixed"
+    CONTEXT_MEMORY_MB = 0
+
+# 尾部采样：每个帖子、登录、点赞都记录 Playwright trace（可选 Python 调用栈），超过阈值或出错时保留，否则丢弃
+TAIL_TRACE = os.environ.get("TAIL_TRACE", "0") == "1"  # 默认关闭，trace 中有页面截图和请求 URL
+TAIL_PROFILE = os.environ.get("TAIL_PROFILE", "0") == "1"  # 同时采样 Python 调用栈（collapsed 格式）
+TAIL_DIR = os.environ.get("TAIL_DIR", os.path.join(DATA_DIR, "traces"))  # 保留的 trace 和调用栈的保存目录
+TAIL_MAX_ARTIFACTS = int(os.environ.get("TAIL_MAX_ARTIFACTS", 5))  # 每次运行最多保留的窗口数
+TAIL_TOPIC_SECONDS = float(os.environ.get("TAIL_TOPIC_SECONDS", 60))  # 单个帖子的耗时阈值
+TAIL_LOGIN_SECONDS = float(os.environ.get("TAIL_LOGIN_SECONDS", 30))  # 登录的耗时阈值
+TAIL_LIKE_SECONDS = float(os.environ.get("TAIL_LIKE_SECONDS", 10))  # 单次点赞的耗时阈值
+
+# 静态资源磁盘缓存：脚本、样式等按账号缓存在磁盘上跨运行复用，超过上限时按最近使用时间淘汰
+ASSET_CACHE = os.environ.get("ASSET_CACHE", "1") == "1" and not HAR_MODE  # 录制 / 回放时不使用，保证请求一致
+ASSET_CACHE_DIR = os.environ.get("ASSET_CACHE_DIR", os.path.join(DATA_DIR, "asset_cache"))
+ASSET_CACHE_MB = int(os.environ.get("ASSET_CACHE_MB", 200))  # 每个账号的缓存上限
@@ -0,0 +1,289 @@
+"""
+守护模式：常驻进程保持 Playwright 驱动、浏览器和每个账号的 context，按间隔或收到触发时运行一轮浏览，
+省掉每次定时任务启动驱动、浏览器和首次打开首页的开销
+
+    python daemon.py
+
+控制方式（只监听本机）：
+- UNIX socket（DAEMON_SOCKET）：发送一行 run / status / stop，返回一行 JSON
+- HTTP（DAEMON_HTTP_PORT）：POST /run、GET /status、POST /stop
+
+运行 DAEMON_RECYCLE_CYCLES 轮后，或进程树内存超过 DAEMON_MEMORY_MB 时，关闭浏览器并在下一轮重新启动
+"""
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+from playwright.sync_api import sync_playwright
+
+from main import LinuxDoBrowser, load_accounts, print_report
+from browsers import launch_browser
+from metrics import process_tree_rss
+from config import (
+    USERNAME, PASSWORD, ACCOUNTS_FILE, DAEMON_INTERVAL_MINUTES, DAEMON_SOCKET, DAEMON_HTTP_PORT,
+    DAEMON_RECYCLE_CYCLES, DAEMON_MEMORY_MB,
+)
+
+
+class Daemon:
+    def __init__(self, accounts) -> None:
+        """
+        :param accounts: [(username, password)]
+        """
+        self.accounts = accounts
+        self.pw = None
+        self.browser = None
+        self.sessions = {}  # username -> LinuxDoBrowser，浏览器存活期间保留
+        self.cycles = 0  # 总运行轮数
+        self.browser_cycles = 0  # 当前浏览器已运行的轮数
+        self.recycles = 0  # 浏览器重启次数
+        self.running = False
+        self.last_cycle = None  # 上一轮的摘要，供 status 查询
+        self.trigger = threading.Event()  # 控制端请求立即运行
+        self.stopping = threading.Event()
+
+    def start_browser(self):
+        """启动浏览器，返回耗时"""
+        started = time.time()
+        if self.pw is None:
+            self.pw = sync_playwright().start()
+        self.browser = launch_browser(self.pw)
+        self.browser_cycles = 0
+        elapsed = time.time() - started
+        logger.info(f"浏览器已启动，耗时 {elapsed:.1f} 秒")
+        return elapsed
+
+    def close_browser(self):
+        for session in self.sessions.values():
+            session.close()
+        self.sessions = {}
+        if self.browser:
+            try:
+                self.browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败: {str(e)}")
+        self.browser = None
+
+    def should_recycle(self):
+        """
+        :return: 需要重启浏览器的原因，不需要时返回 None
+        """
+        if DAEMON_RECYCLE_CYCLES and self.browser_cycles >= DAEMON_RECYCLE_CYCLES:
+            return f"已运行 {self.browser_cycles} 轮"
+        if DAEMON_MEMORY_MB:
+            rss = process_tree_rss()
+            if rss > DAEMON_MEMORY_MB:
+                return f"内存占用 {rss:.0f} MB 超过 {DAEMON_MEMORY_MB} MB"
+        return None
+
+    def run_account(self, username, password, launch_elapsed):
+        """
+        运行一个账号，第一次运行时创建 context，之后复用
+        :param launch_elapsed: 本轮启动浏览器的耗时，计入冷启动账号的启动耗时
+        """
+        l = self.sessions.get(username)
+        try:
+            if l is None:
+                l = LinuxDoBrowser(username, password, browser=self.browser)
+                l.startup_elapsed += launch_elapsed
+                self.sessions[username] = l
+            else:
+                l.new_cycle()
+            if not l.ensure_login():
+                logger.error(f"账号 {username} 登录失败")
+                self.sessions.pop(username, None)
+                l.close()
+                return {"username": username, "status": "登录失败"}
+            l.click_topic()
+            l.collect_report()
+            l.export_metrics()
+            return l.get_stats()
+        except Exception as e:
+            logger.error(f"账号 {username} 运行出错: {str(e)}")
+            # context 状态未知，下一轮重新创建
+            self.sessions.pop(username, None)
+            if l:
+                l.close()
+            return {"username": username, "status": f"运行出错: {str(e)}"}
+
+    def run_cycle(self):
+        """运行一轮：需要时先重启浏览器，再依次运行每个账号"""
+        self.running = True
+        start_time = time.time()
+        try:
+            reason = self.browser and self.should_recycle()
+            if reason:
+                logger.info(f"{reason}，重启浏览器")
+                self.close_browser()
+                self.recycles += 1
+            launch_elapsed = 0
+            if self.browser is None:
+                launch_elapsed = self.start_browser()
+
+            results = []
+            for username, password in self.accounts:
+                results.append(self.run_account(username, password, launch_elapsed))
+                launch_elapsed = 0  # 浏览器启动只算在第一个账号上
+            self.cycles += 1
+            self.browser_cycles += 1
+
+            print_report(results, time.time() - start_time)
+            self.last_cycle = {
+                "finished_at": time.time(),
+                "elapsed": time.time() - start_time,
+                "accounts": [
+                    {
+                        "username": r["username"],
+                        "status": r["status"],
+                        "startup_elapsed": r.get("startup_elapsed"),
+                        "warm": r.get("warm"),
+                        "browse_count": r.get("browse_count"),
+                        "like_count": r.get("like_count"),
+                    }
+                    for r in results
+                ],
+            }
+        finally:
+            self.running = False
+
+    def status(self):
+        return {
+            "cycles": self.cycles,
+            "browser_cycles": self.browser_cycles,
+            "recycles": self.recycles,
+            "running": self.running,
+            "rss_mb": round(process_tree_rss(), 1),
+            "last_cycle": self.last_cycle,
+        }
+
+    def command(self, name):
+        """
+        处理控制命令，在控制线程中调用，只设置事件，浏览器操作都在主线程
+        :return: dict 回复
+        """
+        if name == "run":
+            if self.running:
+                return {"ok": False, "message": "正在运行"}
+            self.trigger.set()
+            return {"ok": True, "message": "已触发"}
+        if name == "status":
+            return dict(self.status(), ok=True)
+        if name == "stop":
+            self.stop()
+            return {"ok": True, "message": "正在停止"}
+        return {"ok": False, "message": f"未知命令 {name}"}
+
+    def stop(self):
+        self.stopping.set()
+        self.trigger.set()
+
+    def serve_control(self):
+        """启动 UNIX socket 和 HTTP 控制端（后台线程）"""
+        daemon = self
+        servers = []
+
+        if DAEMON_SOCKET and hasattr(socketserver, "ThreadingUnixStreamServer"):
+            class SocketHandler(socketserver.StreamRequestHandler):
+                def handle(self):
+                    name = self.rfile.readline().decode("utf-8").strip()
+                    reply = daemon.command(name)
+                    self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+            os.makedirs(os.path.dirname(DAEMON_SOCKET) or ".", exist_ok=True)
+            if os.path.exists(DAEMON_SOCKET):
+                os.remove(DAEMON_SOCKET)
+            # 创建时就只允许本用户连接，共享主机上的其他用户不能发送 run / stop
+            umask = os.umask(0o177)
+            try:
+                servers.append(socketserver.ThreadingUnixStreamServer(DAEMON_SOCKET, SocketHandler))
+            finally:
+                os.umask(umask)
+            logger.info(f"控制 socket：{DAEMON_SOCKET}")
+
+        if DAEMON_HTTP_PORT:
+            class HttpHandler(BaseHTTPRequestHandler):
+                def reply(self, name):
+                    reply = daemon.command(name)
+                    body = json.dumps(reply, ensure_ascii=False).encode("utf-8")
+                    self.send_response(200 if reply["ok"] else 409)
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def do_GET(self):
+                    if self.path == "/status":
+                        self.reply("status")
+                    else:
+                        self.send_error(404)
+
+                def do_POST(self):
+                    if self.path in ("/run", "/stop"):
+                        self.reply(self.path.lstrip("/"))
+                    else:
+                        self.send_error(404)
+
+                def log_message(self, format, *args):
+                    logger.debug("控制请求: " + format % args)
+
+            servers.append(ThreadingHTTPServer(("127.0.0.1", DAEMON_HTTP_PORT), HttpHandler))
+            logger.info(f"控制端口：http://127.0.0.1:{DAEMON_HTTP_PORT}")
+
+        for server in servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return servers
+
+    def loop(self):
+        """主循环：启动后先运行一轮，之后按间隔或触发运行"""
+        servers = self.serve_control()
+        interval = DAEMON_INTERVAL_MINUTES * 60 or None
+        logger.info(
+            f"守护模式：{len(self.accounts)} 个账号，"
+            + (f"每 {DAEMON_INTERVAL_MINUTES:g} 分钟运行一轮" if interval else "只在触发时运行")
+        )
+        try:
+            self.trigger.set()
+            while not self.stopping.is_set():
+                self.trigger.wait(interval)
+                self.trigger.clear()
+                if self.stopping.is_set():
+                    break
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    logger.error(f"本轮运行出错: {str(e)}")
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+            if DAEMON_SOCKET and os.path.exists(DAEMON_SOCKET):
+                os.remove(DAEMON_SOCKET)
+            self.close_browser()
+            if self.pw:
+                self.pw.stop()
+            logger.info("守护进程已退出")
+
+
+if __name__ == "__main__":
+    if ACCOUNTS_FILE:
+        accounts = load_accounts(ACCOUNTS_FILE)
+    elif USERNAME and PASSWORD:
+        accounts = [(USERNAME, PASSWORD)]
+    else:
+        print("Please set USERNAME and PASSWORD or ACCOUNTS_FILE")
+        sys.exit(1)
+    if not accounts:
+        logger.error("没有可用账号")
+        sys.exit(1)
+
+    daemon = Daemon(accounts)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    daemon.loop()
@@ -0,0 +1,45 @@
+"""
+HAR 录制 / 回放：录制时把整次运行的浏览器请求保存到 HAR 文件（context 关闭时写入），
+回放时所有请求都由 route_from_har 用录制的响应应答，录制中没有的请求直接拦截，不访问网络
+
+两种模式下页面的 Math.random 都换成固定种子的伪随机数，Python 这边也固定随机种子，
+配合固定的停留时间，同一份代码的多次回放发出的请求和走过的流程相同
+"""
+import os
+
+# mulberry32，种子相同则序列相同
+SEED_JS = """
+(() => {
+    let state = %d >>> 0;
+    Math.random = function () {
+        state = state + 0x6D2B79F5 | 0;
+        let t = Math.imul(state ^ state >>> 15, 1 | state);
+        t = t + Math.imul(t ^ t >>> 7, 61 | t) ^ t;
+        return ((t ^ t >>> 14) >>> 0) / 4294967296;
+    };
+})();
+"""
+
+
+def har_record_options(mode, path):
+    """
+    录制模式下 new_context 的参数，其他模式返回空 dict
+    :param path: 以 .zip 结尾时响应内容单独存放，否则内嵌在 HAR 中
+    """
+    if mode != "record":
+        return {}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return {
+        "record_har_path": path,
+        "record_har_mode": "full",
+        "record_har_content": "attach" if path.endswith(".zip") else "embed",
+    }
+
+
+def install_har(context, mode, path, seed):
+    """固定页面的随机数，回放模式下再用 HAR 应答所有请求（在资源拦截之后注册，优先匹配）"""
+    context.add_init_script(SEED_JS % seed)
+    if mode == "replay":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"HAR 文件不存在: {path}，先用 python bench/replay.py record 录制")
+        context.route_from_har(path, not_found="abort")
@@ -0,0 +1,119 @@
+"""
+接口点赞：直接请求 Discourse 回应插件的切换接口，代替点击按钮、等待弹窗、重新读取点赞数的整套页面操作
+
+请求通过 context.request 发出，自动带上浏览器 context 的 cookies，另外附上 CSRF token。
+结果从 HTTP 状态码和返回的 JSON 判断：429 是频率限制或每日上限（extras.wait_seconds 给出等待秒数），
+其他失败由调用方改用页面点击
+"""
+import time
+
+from loguru import logger
+
+from linuxdo import HOME_URL, DAILY_LIMIT_TEXT
+
+LIKED = "liked"  # 点赞成功
+ALREADY = "already"  # 之前已经点过赞
+RATE_LIMITED = "rate_limited"  # 频率限制
+DAILY_LIMIT = "daily_limit"  # 每日上限
+DENIED = "denied"  # 不允许点赞（例如自己的帖子）
+FAILED = "failed"  # 接口不可用，改用页面点击
+
+DAILY_LIMIT_WAIT = 3600  # 等待时间超过该秒数的限制视为每日上限
+
+
+class LikeApi:
+    def __init__(self, context, reaction="heart") -> None:
+        """
+        :param context: 已登录的浏览器 context
+        :param reaction: 点赞使用的回应
+        """
+        self.context = context
+        self.reaction = reaction
+        self.csrf = None
+
+    def rebind(self, context):
+        """context 重建后改用新 context，登录状态不变，CSRF token 继续有效"""
+        self.context = context
+
+    def headers(self):
+        return {
+            "Accept": "application/json",
+            "X-Requested-With": "XMLHttpRequest",
+            "X-CSRF-Token": self.csrf or "",
+        }
+
+    def refresh_csrf(self):
+        """从 /session/csrf 获取 CSRF token"""
+        response = self.context.request.get(
+            HOME_URL + "session/csrf", headers={"X-Requested-With": "XMLHttpRequest"}, timeout=10000
+        )
+        self.csrf = response.json().get("csrf") if response.ok else None
+        return self.csrf
+
+    def toggle(self, post_id):
+        url = f"{HOME_URL}discourse-reactions/posts/{post_id}/custom-reactions/{self.reaction}/toggle.json"
+        return self.context.request.put(url, headers=self.headers(), timeout=10000)
+
+    def like(self, post_id):
+        """
+        给一个帖子楼层点赞
+        :return: {"outcome": 上面的结果之一, "wait": 需要等待的秒数, "likes": 点赞后的点赞数, "message": 接口返回的说明}
+        """
+        result = {"outcome": FAILED, "wait": 0, "likes": None, "message": None}
+        started = time.time()
+        try:
+            if not self.csrf and not self.refresh_csrf():
+                result["message"] = "获取 CSRF token 失败"
+                return result
+            response = self.toggle(post_id)
+            if response.status == 403 and "BAD CSRF" in response.text():
+                # token 过期（例如会话刷新后），重新获取一次
+                self.refresh_csrf()
+                response = self.toggle(post_id)
+            data = self.read_json(response)
+
+            if response.status == 429:
+                extras = data.get("extras") or {}
+                message = " ".join(data.get("errors") or [])
+                result["wait"] = int(extras.get("wait_seconds") or 60)
+                result["message"] = message
+                daily = DAILY_LIMIT_TEXT in message or result["wait"] >= DAILY_LIMIT_WAIT
+                result["outcome"] = DAILY_LIMIT if daily else RATE_LIMITED
+                return result
+            if response.status == 403:
+                result["outcome"] = DENIED
+                result["message"] = " ".join(data.get("errors") or []) or "HTTP 403"
+                return result
+            if not response.ok:
+                result["message"] = f"HTTP {response.status}"
+                return result
+
+            result["likes"] = data.get("reaction_users_count")
+            if data.get("current_user_reaction"):
+                result["outcome"] = LIKED
+                return result
+            # 切换接口对已点赞的楼层会取消点赞，再切换一次恢复，并确认恢复成功
+            logger.warning(f"楼层 {post_id} 已经点过赞，接口取消了点赞，重新恢复")
+            response = self.toggle(post_id)
+            restored = self.read_json(response)
+            if response.ok and restored.get("current_user_reaction"):
+                result["likes"] = restored.get("reaction_users_count", result["likes"])
+                result["outcome"] = ALREADY
+                return result
+            # 点赞已被取消，交给调用方改用页面点击重新点赞
+            result["message"] = f"恢复点赞失败(HTTP {response.status})"
+            logger.error(f"楼层 {post_id} {result['message']}，当前处于未点赞状态")
+            return result
+        except Exception as e:
+            result["message"] = str(e)
+            return result
+        finally:
+            logger.debug(f"接口点赞 {post_id}: {result['outcome']}，耗时 {(time.time() - started) * 1000:.0f} 毫秒")
+
+    @staticmethod
+    def read_json(response):
+        try:
+            data = response.json()
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
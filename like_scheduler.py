@@ -0,0 +1,134 @@
+"""
+点赞调度：点赞不再阻塞浏览
+
+- 要点赞的帖子先放进队列，令牌桶有令牌时再点；触发频率限制后按弹窗里的等待时间暂停发放令牌，浏览照常继续
+- 每次成功点赞都记入索引的点赞流水。触发每日上限时记下恢复时间和 24 小时内的点赞数，
+  之后的运行在额度恢复前直接跳过点赞，不再用一次真实点击去试
+"""
+import time
+from collections import deque
+
+from loguru import logger
+
+QUOTA_WINDOW = 24 * 3600  # 每日点赞上限按滚动 24 小时计算
+RATE_LIMIT_MARGIN = 2  # 频率限制解除后多等的秒数
+MAX_ATTEMPTS = 3  # 每个帖子最多尝试点赞的次数
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, burst) -> None:
+        """
+        :param rate_per_minute: 每分钟补充的令牌数
+        :param burst: 桶容量，即允许连续点赞的次数
+        """
+        self.rate = max(rate_per_minute, 0.01) / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.time()
+        self.blocked_until = 0  # 频率限制解除的时间
+
+    def _refill(self):
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """还要等多少秒才有令牌，0 表示现在就可以"""
+        self._refill()
+        blocked = max(0.0, self.blocked_until - time.time())
+        if self.tokens >= 1:
+            return blocked
+        return max(blocked, (1 - self.tokens) / self.rate)
+
+    def take(self):
+        self._refill()
+        self.tokens = max(0.0, self.tokens - 1)
+
+    def block(self, seconds):
+        """暂停发放令牌，解除后从空桶开始补充"""
+        self.blocked_until = max(self.blocked_until, time.time() + seconds)
+        self.tokens = 0.0
+        self.updated = self.blocked_until
+
+
+class LikeScheduler:
+    def __init__(self, index, rate_per_minute=4, burst=2, daily_limit=0) -> None:
+        """
+        :param index: TopicIndex，保存点赞流水和学到的每日上限
+        :param daily_limit: 24 小时点赞上限，0 表示使用上次触发每日上限时学到的值
+        """
+        self.index = index
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.daily_limit = daily_limit
+        self.queue = deque()  # 待点赞的帖子 {"url", "post_id", "topic_id", "attempts"}
+        self.dropped = 0  # 尝试次数用完或运行结束时放弃的帖子数
+
+    def learned_limit(self):
+        return self.daily_limit or int(float(self.index.get_meta("like_daily_limit", 0)))
+
+    def quota_reset_at(self):
+        """
+        预计每日点赞额度恢复的时间戳，额度可用时返回 0
+        优先使用每日上限弹窗给出的时间，否则按点赞流水和已知上限推算
+        """
+        now = time.time()
+        reset_at = float(self.index.get_meta("like_quota_reset_at", 0))
+        if reset_at > now:
+            return reset_at
+        limit = self.learned_limit()
+        if limit:
+            times = self.index.like_times(now - QUOTA_WINDOW)
+            if len(times) >= limit:
+                return times[len(times) - limit] + QUOTA_WINDOW
+        return 0
+
+    def enqueue(self, item):
+        item.setdefault("attempts", 0)
+        self.queue.append(item)
+
+    def pending(self):
+        return len(self.queue)
+
+    def wait_time(self):
+        return self.bucket.wait_time()
+
+    def next_ready(self):
+        """令牌桶允许时取出下一个待点赞的帖子，否则返回 None，不等待"""
+        if not self.queue or self.bucket.wait_time() > 0:
+            return None
+        return self.queue.popleft()
+
+    def requeue(self, item):
+        """点赞失败的帖子放回队尾，尝试次数用完则放弃"""
+        item["attempts"] += 1
+        if item["attempts"] < MAX_ATTEMPTS:
+            self.queue.append(item)
+        else:
+            self.dropped += 1
+
+    def clear(self):
+        self.dropped += len(self.queue)
+        self.queue.clear()
+
+    def spend(self):
+        """真正点击点赞按钮前调用"""
+        self.bucket.take()
+
+    def record_like(self):
+        self.index.record_like_event()
+
+    def rate_limited(self, wait_seconds):
+        """触发频率限制：暂停点赞，浏览继续"""
+        self.bucket.block(wait_seconds + RATE_LIMIT_MARGIN)
+
+    def daily_limit_hit(self, wait_seconds):
+        """
+        触发每日上限：记下恢复时间，并把 24 小时内的点赞数作为学到的上限，清空队列
+        """
+        now = time.time()
+        self.index.set_meta("like_quota_reset_at", now + wait_seconds)
+        count = len(self.index.like_times(now - QUOTA_WINDOW))
+        if count and not self.daily_limit:
+            self.index.set_meta("like_daily_limit", count)
+            logger.info(f"记录每日点赞上限：24 小时内 {count} 个")
+        self.clear()
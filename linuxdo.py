@@ -0,0 +1,164 @@
+"""
+linux.do 站点相关的常量：页面地址、选择器、限制弹窗，以及同步/异步引擎共用的点赞策略
+"""
+import re
+
+HOME_URL = "https://linux.do/"
+CONNECT_URL = "https://connect.linux.do/"
+
+# 登录失败提示
+LOGIN_ERROR_SELECTORS = [
+    "#modal-alert .alert-error",  # 通用错误提示
+    "#login-error",  # 登录错误
+    ".alert-error",  # 其他错误提示
+    "#modal-alert"   # 模态框错误
+]
+
+# 页头渲染完成：已登录时出现用户菜单，未登录时出现登录按钮
+# （消息总线的长轮询让网络一直忙，不能用 networkidle 判断页面加载完成）
+HEADER_READY_SELECTORS = ["#toggle-current-user", ".login-button"]
+
+# 帖子标题
+TITLE_SELECTORS = [
+    "#main-outlet .topic-title h1",           # 第一种形式
+    "h1 .fancy-title span[dir='auto']",       # 第二种形式
+    "#main-outlet h1",                        # 第三种形式
+    ".topic-title",                           # 第四种形式
+    ".title-wrapper h1 a[data-topic-id]",     # 第五种形式（分页帖子，使用更精确的选择器）
+    ".title-wrapper h1 a .fancy-title span",  # 第六种形式
+    "h1.topic-title",                         # 第七种形式
+    ".topic-title h1 span"                    # 第八种形式
+]
+
+# 已点赞状态
+ALREADY_LIKED_SELECTORS = [
+    # 基础已点赞状态
+    '.discourse-reactions-actions.has-reacted.has-reactions',
+    # 带有主要反应的已点赞状态
+    '.discourse-reactions-actions.has-reactions.has-reacted.has-used-main-reaction',
+    # 删除按钮状态
+    '.discourse-reactions-double-button button[title="删除此 heart 回应"]',
+    'button[title="移除此赞"]',
+    # 自定义表情状态
+    '.discourse-reactions-actions.custom-reaction-used.has-reactions.has-reacted',
+    # 组合状态
+    '.discourse-reactions-actions.has-reactions.has-reacted.has-used-main-reaction.can-toggle-reaction'
+]
+
+# 未点赞的按钮
+LIKE_BUTTON_SELECTORS = [
+    # 先尝试点击父元素
+    'div[title="点赞此帖子"].discourse-reactions-reaction-button',
+    # 双按钮布局的父元素
+    '.discourse-reactions-double-button div[title="点赞此帖子"].discourse-reactions-reaction-button',
+    # 如果父元素不可用，再尝试按钮本身
+    'button[title="点赞此帖子"]',
+    # 带有反应状态的未点赞按钮
+    '.discourse-reactions-actions.has-reactions:not(.has-reacted) button[title="点赞此帖子"]',
+    # 双按钮布局的未点赞按钮
+    '.discourse-reactions-double-button .discourse-reactions-reaction-button button[title="点赞此帖子"]',
+    # 基础点赞按钮类
+    'button.btn-toggle-reaction-like[title="点赞此帖子"]',
+    '.discourse-reactions-double-button button[title="点赞此帖子"]',
+    # 可切换反应的未点赞按钮
+    '.discourse-reactions-actions.has-reactions.can-toggle-reaction:not(.has-reacted) .btn-toggle-reaction-like'
+]
+
+# 点赞数
+COUNTER_SELECTORS = [
+    '.discourse-reactions-double-button .reactions-counter',  # 双按钮布局中的计数器
+    '.only-like.discourse-reactions-counter .reactions-counter',  # 只有点赞的计数器
+    '.discourse-reactions-counter .reactions-counter',  # 通用计数器
+    '.reactions-counter',  # 基础计数器
+    '[id^="discourse-reactions-counter-"][id$="-right"] .reactions-counter',  # 右侧计数器
+    '[id^="discourse-reactions-counter-"][id$="-left"] .reactions-counter'    # 左侧计数器
+]
+
+# 楼层号
+FLOOR_SELECTORS = [
+    '.linuxfloor',  # 原有的选择器
+    '.post-infos .linuxfloor',  # 新增的选择器
+    'div.post-infos span.linuxfloor'  # 更精确的选择器
+]
+
+# 点赞后的限制弹窗
+RATE_LIMIT_DIALOGS = [
+    # 频率限制弹窗
+    {
+        'selector': '.dialog-content p:has-text("您执行此操作的次数过多")',
+        'pattern': r'(\d+)\s*秒',
+        'default_wait': 60,
+        'message': "触发操作频率限制"
+    },
+    # 每日上限弹窗
+    {
+        'selector': '.dialog-content p:has-text("您已经达到 24 小时点赞上限")',
+        'pattern': r'(\d+)\s*分钟',
+        'default_wait': 60 * 48,  # 默认等待48分钟
+        'message': "达到每日点赞上限"
+    }
+]
+DIALOG_CONFIRM_SELECTOR = '.dialog-footer .btn-primary:has-text("确定")'
+DAILY_LIMIT_TEXT = "24 小时点赞上限"
+
+RESTORE_SCROLL_JS = """
+    document.body.style.overflow = window.originalOverflow || '';
+    delete window.originalOverflow;
+"""
+DISABLE_SCROLL_JS = """
+    window.originalOverflow = document.body.style.overflow;
+    document.body.style.overflow = 'hidden';
+"""
+
+
+def topic_id_from_url(url):
+    """从 /t/slug/123 或 /t/slug/123/45 中取出帖子 id"""
+    match = re.search(r"/t/[^/]+/(\d+)", url or "")
+    return int(match.group(1)) if match else None
+
+
+def post_number_from_url(url):
+    """从 /t/slug/123/45 中取出当前楼层号，没有时为 1"""
+    match = re.search(r"/t/[^/]+/\d+/(\d+)", url or "")
+    return int(match.group(1)) if match else 1
+
+
+def is_valid_title(text):
+    """排除“此话题…”之类的提示文本"""
+    return bool(text) and not text.startswith("此话题")
+
+
+def parse_count(text):
+    """从计数器文本中提取数字"""
+    return int(''.join(filter(str.isdigit, text)) or 0)
+
+
+def parse_limit_wait(dialog, dialog_text):
+    """从限制弹窗文本中解析需要等待的秒数"""
+    wait_match = re.search(dialog['pattern'], dialog_text)
+    if not wait_match:
+        return dialog['default_wait']
+    wait_time = int(wait_match.group(1))
+    if '分钟' in dialog_text:
+        return wait_time * 60
+    return wait_time
+
+
+def topic_like_probability(like_count):
+    """根据已点赞数量动态调整进入点赞流程的概率"""
+    if like_count < 5:  # 如果点赞数少于5个，提高点赞概率
+        return 0.5  # 50% 概率
+    elif like_count < 10:  # 如果点赞数在5-10之间
+        return 0.3  # 30% 概率
+    return 0.1  # 如果已经点赞超过10个，降低到10%概率
+
+
+def post_like_probability(likes_count):
+    """根据帖子点赞数决定点赞概率"""
+    if likes_count >= 50:  # 高赞帖子
+        return 0.9   # 90% 概率点赞
+    elif likes_count >= 30:
+        return 0.7   # 70% 概率点赞
+    elif likes_count >= 10:
+        return 0.5   # 50% 概率点赞
+    return 0.3   # 30% 基础概率
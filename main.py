@@ -1,10 +1,10 @@
 import os
 import random
 import time
-import functools
 import sys
-import requests
-import re
+import signal
+import multiprocessing
+from multiprocessing.util import Finalize
 
 from loguru import logger
 from playwright.sync_api import sync_playwright
@@ -12,48 +12,321 @@ from tabulate import tabulate
 from datetime import datetime
 import pytz
 
-
-def retry_decorator(retries=3):
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == retries - 1:  # 最后一次尝试
-                        logger.error(f"函数 {func.__name__} 最终执行失败: {str(e)}")
-                    logger.warning(f"函数 {func.__name__} 第 {attempt + 1}/{retries} 次尝试失败: {str(e)}")
-                    time.sleep(1)
-            return None
-
-        return wrapper
-
-    return decorator
+from session_store import SessionStore, account_key
+from waits import Waiter
+from probe import PageProbe, read_limit_dialog, read_connect_table
+from api import DiscourseApi
+from routing import ResourceBlocker
+from topic_index import TopicIndex, PRIORITY_DONE
+from scheduler import TopicScheduler
+from metrics import Metrics, MemorySampler, timed, percentile
+from page_pool import PagePool
+from browsers import launch_browser, context_options
+from checkpoint import Checkpoint, RunInterrupted, raise_interrupted
+from budget import TimeBudget
+from retry import RetryEngine, SiteUnhealthy, retrying, classify, check_response, OTHER, ERROR_NAMES
+from like_scheduler import LikeScheduler
+from like_api import LikeApi, LIKED, ALREADY, RATE_LIMITED, DAILY_LIMIT, DENIED
+from scroller import ScrollDriver
+from read_credit import ReadCredit
+from har import har_record_options, install_har
+from tail_sampler import TailSampler, tail_sampled
+from asset_cache import AssetCache
+from prefetch import ReportPrefetch, get_yiyan, load_cached_yiyan, YIYAN_FALLBACK
+from config import (
+    USERNAME, PASSWORD, SESSION_DIR, DATA_DIR, ACCOUNTS_FILE, WORKERS, ENGINE, DWELL_MIN, DWELL_MAX,
+    API_READ, API_CONCURRENCY, BLOCK_PROFILE, ALLOW_HOSTS, INDEX_TTL_DAYS,
+    FEEDS, FEED_PAGES, TARGET_TOPICS, TARGET_READ_MINUTES, METRICS_DIR,
+    LIKE_RATE_PER_MINUTE, LIKE_BURST, LIKE_DAILY_LIMIT, LIKE_DRAIN_SECONDS, SCROLL_ENGINE,
+    PAGE_POOL_SIZE, CONTEXT_MEMORY_MB, CONTEXT_RECYCLE_COOLDOWN, CHECKPOINT_MAX_AGE_HOURS,
+    RUN_BUDGET_MINUTES, BUDGET_RESERVE_SECONDS, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, BREAKER_THRESHOLD,
+    FORBIDDEN_THRESHOLD,
+    LIKE_BACKEND, LIKE_REACTION, DWELL_MODE, CREDIT_FLUSH_SECONDS, CREDIT_SETTLE_SECONDS,
+    HAR_MODE, HAR_PATH, HAR_SEED,
+    TAIL_TRACE, TAIL_PROFILE, TAIL_DIR, TAIL_MAX_ARTIFACTS, TAIL_TOPIC_SECONDS, TAIL_LOGIN_SECONDS, TAIL_LIKE_SECONDS,
+    ASSET_CACHE, ASSET_CACHE_DIR, ASSET_CACHE_MB,
+)
+from linuxdo import (
+    HOME_URL, CONNECT_URL, LOGIN_ERROR_SELECTORS, HEADER_READY_SELECTORS, TITLE_SELECTORS, ALREADY_LIKED_SELECTORS,
+    RATE_LIMIT_DIALOGS, DIALOG_CONFIRM_SELECTOR, DAILY_LIMIT_TEXT, DISABLE_SCROLL_JS, RESTORE_SCROLL_JS,
+    parse_limit_wait, topic_like_probability, post_like_probability, topic_id_from_url, post_number_from_url,
+)
 
 
 os.environ.pop("DISPLAY", None)
 os.environ.pop("DYLD_LIBRARY_PATH", None)
 
-USERNAME = os.environ.get("USERNAME")
-PASSWORD = os.environ.get("PASSWORD")
-
-HOME_URL = "https://linux.do/"
-
 
 class LinuxDoBrowser:
-    def __init__(self) -> None:
+    def __init__(self, username=None, password=None, browser=None) -> None:
+        """
+        :param username: 账号，默认读取环境变量 USERNAME
+        :param password: 密码，默认读取环境变量 PASSWORD
+        :param browser: 复用已启动的浏览器（多账号模式），为空时自行启动
+        """
+        self.username = username or USERNAME
+        self.password = password or PASSWORD
+        self.connect_info = []  # Connect 数据
+        self.yiyan = None  # 一言，登录后在后台预取
         self.browse_count = 0  # 浏览帖子计数
         self.like_count = 0    # 点赞计数
         self.daily_limit_reached = False  # 新增：标记是否达到每日上限
         self.start_time = time.time()  # 记录开始时间
+        if HAR_MODE:
+            random.seed(HAR_SEED)  # 录制 / 回放时固定帖子选择、点赞和退出的随机结果
+        self.metrics = Metrics()  # 分阶段计时
+        self.budget = self.new_budget()  # 整次运行的时间预算
+        self.scroll_steps = 0  # 上一个帖子的滚动次数，用于更新耗时模型
+        self.retry = self.new_retry()  # 重试策略和熔断
+
+        self.login_mode = None  # 登录方式：session（复用会话）/ login（账号密码登录）
+        self.login_elapsed = 0  # 登录阶段耗时
+        self.waiter = Waiter()  # 条件等待，记录实际等待时间
+        self.probe = PageProbe(os.path.join(DATA_DIR, "selector_cache.json"))  # 帖子页面探测
+        self.api = None  # JSON 接口读取，登录后创建
+        self.navigations_avoided = 0  # 因接口数据而省掉的页面打开次数
+        # 跨运行的已读帖子 / 已点赞索引，按账号区分
+        self.index = TopicIndex(
+            os.path.join(DATA_DIR, f"topics_{account_key(self.username)}.db"), INDEX_TTL_DAYS
+        )
+        self.skipped_read = 0  # 因已读完而跳过的帖子数
+        self.liked_posts = []  # 本次（含断点之前）点过赞的帖子 id
+        # 断点：每读完一个帖子保存一次，被超时杀掉后下次从这里继续
+        self.checkpoint = Checkpoint(
+            os.path.join(DATA_DIR, f"checkpoint_{account_key(self.username)}.json"), CHECKPOINT_MAX_AGE_HOURS
+        )
+        self.queue = []  # 本次的帖子队列
+        self.position = 0  # 已完成的帖子数
+        self.scheduled = False  # 队列是否来自调度器
+        self.read_seconds = 0  # 之前的运行已经阅读的时间
+        self.read_start = None  # 本次开始阅读的时间（已扣除 read_seconds）
+        self.interrupted = False  # 是否被信号中断
+        self.prefetch = ReportPrefetch(self.retry, offline=bool(HAR_MODE))  # 浏览期间在后台准备报告数据
+        # 点赞队列和令牌桶，点赞流水保存在帖子索引里
+        self.likes = LikeScheduler(self.index, LIKE_RATE_PER_MINUTE, LIKE_BURST, LIKE_DAILY_LIMIT)
+        self.check_like_quota()
 
-        self.pw = sync_playwright().start()
-        self.browser = self.pw.firefox.launch(headless=True, timeout=30000)
-        self.context = self.browser.new_context()
+        # 多账号模式下由 worker 传入共享的浏览器，每个账号只新建自己的 context
+        self.owns_browser = browser is None
+        if self.owns_browser:
+            with self.metrics.span("browser_launch"):
+                self.pw = sync_playwright().start()
+                self.browser = launch_browser(self.pw)
+        else:
+            self.pw = None
+            self.browser = browser
+
+        # 优先使用保存的会话创建上下文
+        self.session_store = SessionStore(SESSION_DIR, self.username)
+        # 录制 / 回放时不使用保存的会话，登录流程也在录制范围内
+        storage_state = None if HAR_MODE else self.session_store.load()
+        # 按档位屏蔽用不到的图片、字体和第三方资源
+        self.blocker = ResourceBlocker(BLOCK_PROFILE, os.path.join(DATA_DIR, "resource_sizes.json"), ALLOW_HOSTS)
+        # 页面内滚动，进度通过 binding 回报
+        self.scroller = ScrollDriver(10, DWELL_MIN, DWELL_MAX)
+        # 监听 /topics/timings，记录服务器确认阅读的楼层
+        self.credit = ReadCredit(CREDIT_FLUSH_SECONDS)
+        # 帖子、登录、点赞过慢或出错时保留 trace 和调用栈
+        self.tail = TailSampler(
+            TAIL_DIR, {"topic": TAIL_TOPIC_SECONDS, "login": TAIL_LOGIN_SECONDS, "click_like": TAIL_LIKE_SECONDS},
+            TAIL_TRACE, TAIL_PROFILE, TAIL_MAX_ARTIFACTS,
+        )
+        # 按账号在磁盘上缓存脚本、样式等静态资源，跨运行复用
+        self.assets = None
+        if ASSET_CACHE:
+            self.assets = AssetCache(os.path.join(ASSET_CACHE_DIR, account_key(self.username)), ASSET_CACHE_MB)
+        self.context = self.open_context(storage_state)
+        # 帖子之间复用标签页，内存超限时重建 context
+        self.pages = PagePool(self.context, PAGE_POOL_SIZE)
+        # 接口点赞，失败时改用页面点击
+        self.like_api = LikeApi(self.context, LIKE_REACTION) if LIKE_BACKEND == "api" else None
+        self.memory = MemorySampler()
+        self.context_recycles = 0
+        self.memory_baseline = None  # 第一个帖子读完后的内存，作为增长的基准
+        self.recycle_cooldown = 0  # 还要读多少个帖子才允许再次重建
+        self.recycle_enabled = bool(CONTEXT_MEMORY_MB)
         self.page = self.context.new_page()
         self.page.goto(HOME_URL)
+        if self.assets:
+            self.assets.record_first_paint(self.page)
+
+        probe_start = time.time()
+        self.session_valid = storage_state is not None and self.check_session()
+        self.login_elapsed = time.time() - probe_start
+        self.metrics.record("init", time.time() - self.start_time, started=self.start_time)
+        self.startup_elapsed = time.time() - self.start_time  # 从创建到可以开始浏览的耗时
+        self.warm = False  # 是否复用了常驻进程中的 context（守护模式）
+
+    def new_budget(self):
+        return TimeBudget(
+            RUN_BUDGET_MINUTES * 60, DWELL_MIN, DWELL_MAX,
+            os.path.join(DATA_DIR, "topic_costs.json"), BUDGET_RESERVE_SECONDS, self.start_time,
+        )
+
+    def open_context(self, storage_state=None):
+        """创建 context 并安装资源拦截和滚动回报"""
+        context = self.browser.new_context(
+            **context_options(storage_state=storage_state, **har_record_options(HAR_MODE, HAR_PATH))
+        )
+        if self.assets:
+            self.assets.install(context)  # 先于资源拦截注册，拦截放行的请求才会进入缓存
+        self.blocker.install(context)
+        if HAR_MODE:
+            install_har(context, HAR_MODE, HAR_PATH, HAR_SEED)
+        self.credit.install(context)
+        self.tail.install(context)
+        if SCROLL_ENGINE == "page":
+            self.scroller.install(context)
+        return context
+
+    def check_memory(self):
+        """
+        采样内存，比第一个帖子读完时增长超过 CONTEXT_MEMORY_MB 时重建 context
+        进程树的内存包含共享页、驱动进程和浏览器主进程，绝对值偏大，只看增长；重建后有冷却期，
+        重建没有让内存下降时本次运行不再重建
+        """
+        total = self.memory.sample()
+        if not self.recycle_enabled:
+            return
+        if self.memory_baseline is None:
+            self.memory_baseline = total
+            return
+        if self.recycle_cooldown > 0:
+            self.recycle_cooldown -= 1
+            return
+        growth = total - self.memory_baseline
+        if growth <= CONTEXT_MEMORY_MB:
+            return
+        self.recycle_context(f"内存比基准增长 {growth:.0f} MB，超过 {CONTEXT_MEMORY_MB} MB")
+        self.recycle_cooldown = CONTEXT_RECYCLE_COOLDOWN
+        after = self.memory.sample()
+        if total - after < growth / 2:
+            self.recycle_enabled = False
+            logger.warning(f"重建 context 后内存没有明显下降（{total:.0f} -> {after:.0f} MB），本次运行不再重建")
+        else:
+            logger.info(f"重建 context 后内存 {total:.0f} -> {after:.0f} MB")
+
+    @timed("recycle_context")
+    def recycle_context(self, reason):
+        """关闭当前 context，用它的 cookies 和 localStorage 新建一个，登录状态不变"""
+        logger.info(f"{reason}，重建浏览器 context")
+        storage_state = self.context.storage_state()
+        self.pages.close()
+        self.prefetch.close_page()  # 预取的页面随旧 context 关闭，收尾时重新读取
+        self.tail.close()
+        self.context.close()
+        self.context = self.open_context(storage_state)
+        self.pages.rebind(self.context)
+        if self.like_api:
+            self.like_api.rebind(self.context)
+        self.page = self.context.new_page()
+        self.context_recycles += 1
+
+    def new_cycle(self):
+        """
+        守护模式下开始新一轮浏览：保留 context、接口连接池和索引，只重置本轮的计数和计时，
+        重新打开首页并检查会话
+        """
+        self.start_time = time.time()
+        self.budget = self.new_budget()
+        self.browse_count = 0
+        self.like_count = 0
+        self.skipped_read = 0
+        self.navigations_avoided = 0
+        self.liked_posts = []
+        self.read_seconds = 0
+        self.read_start = None
+        self.check_like_quota()
+        self.connect_info = []
+        self.yiyan = None
+        self.login_mode = None
+        self.metrics = Metrics()
+        self.retry = self.new_retry()
+        self.prefetch.retry = self.retry
+        self.waiter = Waiter()
+        self.blocker.reset_stats()
+        self.pages.reset_stats()
+        self.credit.reset_stats()
+        self.tail.reset_stats()
+        if self.assets:
+            self.assets.reset_stats()
+        self.memory = MemorySampler()
+        self.context_recycles = 0
+        self.memory_baseline = None  # 第一个帖子读完后的内存，作为增长的基准
+        self.recycle_cooldown = 0  # 还要读多少个帖子才允许再次重建
+        self.recycle_enabled = bool(CONTEXT_MEMORY_MB)
+        if self.api:
+            self.api.reset_stats()
+            self.api.sync_cookies(self.context)
+
+        self.page.goto(HOME_URL)
+        probe_start = time.time()
+        self.session_valid = self.check_session()
+        self.login_elapsed = time.time() - probe_start
+        self.metrics.record("init", time.time() - self.start_time, started=self.start_time)
+        self.startup_elapsed = time.time() - self.start_time
+        self.warm = True
+
+    def check_like_quota(self):
+        """按点赞流水判断每日点赞额度是否已用完，用完时本次不再尝试点赞"""
+        reset_at = self.likes.quota_reset_at()
+        self.daily_limit_reached = bool(reset_at)
+        if reset_at:
+            reset_time = datetime.fromtimestamp(reset_at, pytz.timezone('Asia/Shanghai')).strftime('%m-%d %H:%M')
+            logger.info(f"每日点赞额度预计 {reset_time} 恢复，本次跳过点赞")
 
+    def new_retry(self):
+        retry = RetryEngine(
+            RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, BREAKER_THRESHOLD, FORBIDDEN_THRESHOLD, session_check=self.session_alive
+        )
+        retry.sleep = self.pause
+        return retry
+
+    def pause(self, seconds):
+        """
+        在页面上等待：同步 API 只在 Playwright 调用期间分发事件，time.sleep 会让路由处理函数、
+        响应监听在等待期间全部停住
+        """
+        try:
+            self.page.wait_for_timeout(seconds * 1000)
+        except Exception:
+            time.sleep(seconds)
+
+    def session_alive(self):
+        """
+        运行中连续遇到 403 时复查会话，区分登录失效和 Cloudflare 拦截
+        :return: bool 会话是否有效，请求本身失败时按有效处理
+        """
+        try:
+            response = self.context.request.get(HOME_URL + "session/current.json", timeout=10000)
+            # 未登录时返回 404；403 可能同样是被拦截，不能说明会话失效
+            expired = response.status in (401, 404) or (response.ok and not response.json().get("current_user"))
+        except Exception as e:
+            logger.warning(f"复查会话失败: {str(e)}")
+            return True
+        if expired:
+            logger.warning(f"会话已失效(HTTP {response.status})")
+        return not expired
+
+    def check_session(self):
+        """
+        检查保存的会话是否仍然有效（只请求一次 /session/current.json）
+        :return: bool 会话是否有效
+        """
+        try:
+            response = self.context.request.get(HOME_URL + "session/current.json", timeout=10000)
+            current_user = response.json().get("current_user") if response.ok else None
+            if current_user:
+                username = current_user.get("username", "未知用户")
+                logger.success(f"会话有效，跳过登录！用户名: {username}")
+                return True
+            logger.info(f"会话已过期(HTTP {response.status})，需要重新登录")
+        except Exception as e:
+            logger.warning(f"检查会话失败: {str(e)}")
+        self.session_store.clear()
+        return False
+
+    @timed("login")
     def login(self, max_retries=3):
         """
         登录函数，支持重试和错误信息提示
@@ -70,44 +343,44 @@ class LinuxDoBrowser:
                     logger.error("找不到登录按钮")
                     continue
                 login_button.click()
-                time.sleep(2)
+                self.waiter.selector(self.page, "#login-account-name", "login_form", timeout=10000)
                 
                 # 填写用户名
-                if not USERNAME:
+                if not self.username:
                     logger.error("环境变量 USERNAME 未设置")
                     return False
-                self.page.fill("#login-account-name", USERNAME)
-                time.sleep(2)
+                self.page.fill("#login-account-name", self.username)
                 
                 # 填写密码
-                if not PASSWORD:
+                if not self.password:
                     logger.error("环境变量 PASSWORD 未设置")
                     return False
-                self.page.fill("#login-account-password", PASSWORD)
-                time.sleep(2)
+                self.page.fill("#login-account-password", self.password)
                 
-                # 点击登录
-                self.page.click("#login-button")
-                time.sleep(5)  # 等待登录响应
+                # 点击登录，等待 POST /session 返回，再等待页面出现登录结果
+                self.waiter.response(
+                    self.page, "/session", lambda: self.page.click("#login-button"),
+                    "login_response", timeout=15000, method="POST"
+                )
+                self.waiter.any_selector(
+                    self.page, ["#toggle-current-user"] + LOGIN_ERROR_SELECTORS, "login_result", timeout=10000
+                )
                 
                 # 检查错误信息
-                error_selectors = [
-                    "#modal-alert .alert-error",  # 通用错误提示
-                    "#login-error",  # 登录错误
-                    ".alert-error",  # 其他错误提示
-                    "#modal-alert"   # 模态框错误
-                ]
-                
-                for selector in error_selectors:
+                login_error = None
+                for selector in LOGIN_ERROR_SELECTORS:
                     error_element = self.page.locator(selector).first
                     if error_element and error_element.is_visible():
-                        error_text = error_element.inner_text().strip()
-                        logger.error(f"登录失败: {error_text}")
-                        # 如果是密码错误，直接返回，不需要重试
-                        if "密码" in error_text or "password" in error_text.lower():
-                            return False
-                        time.sleep(5)  # 遇到错误等待longer再重试
-                        continue
+                        login_error = error_element.inner_text().strip()
+                        break
+                if login_error:
+                    logger.error(f"登录失败: {login_error}")
+                    # 如果是密码错误，直接返回，不需要重试
+                    if "密码" in login_error or "password" in login_error.lower():
+                        return False
+                    if attempt < max_retries - 1:
+                        self.retry.wait("登录", attempt + 1, OTHER)  # 遇到错误退避后再重试
+                    continue
                 
                 # 检查是否登录成功
                 user_button = self.page.locator("#toggle-current-user").first
@@ -136,14 +409,17 @@ class LinuxDoBrowser:
                 
                 # 如果没有明确的错误信息但也没有登录成功
                 logger.warning(f"登录状态未知，尝试刷新页面")
-                self.page.reload()
-                time.sleep(5)
+                self.page.reload(wait_until="domcontentloaded")
+                self.waiter.any_selector(self.page, HEADER_READY_SELECTORS, "login_reload", timeout=10000)
                 
             except Exception as e:
                 logger.error(f"登录过程出错: {str(e)}")
+                error_class = classify(e)
+                self.retry.record(error_class)
+                if not self.retry.healthy:
+                    return False
                 if attempt < max_retries - 1:  # 如果不是最后一次尝试
-                    logger.info("等待 10 秒后重试...")
-                    time.sleep(10)
+                    self.retry.wait("登录", attempt + 1, error_class)
                 continue
         
         logger.error(f"登录失败，已尝试 {max_retries} 次")
@@ -155,24 +431,170 @@ class LinuxDoBrowser:
     #     for topic in topic_list:
     #         self.click_one_topic(topic.get_attribute("href"))
 
+    def fetch_topics(self):
+        """
+        通过 JSON 接口从多个列表收集候选帖子，按调度器排好序，再获取每个帖子的元数据，
+        已关闭/归档的帖子直接跳过
+        :return: [{"url": ..., "meta": ...}]，接口不可用时返回 None
+        """
+        self.ensure_api()
+        scheduler = TopicScheduler(self.api, self.index, (DWELL_MIN + DWELL_MAX) / 2)
+        # 有时间预算时，计划的阅读时间不超过预算内剩余的时间
+        target_seconds = TARGET_READ_MINUTES * 60
+        if self.budget.enabled:
+            budget_seconds = self.budget.reading_seconds()
+            target_seconds = min(target_seconds, budget_seconds) if target_seconds else budget_seconds
+        queue = scheduler.plan(FEEDS, FEED_PAGES, TARGET_TOPICS, target_seconds)
+        if not queue:
+            logger.warning("接口获取帖子列表失败，改为读取页面")
+            return None
+
+        metas = self.api.topics([t["id"] for t in queue])
+        topics = []
+        for t in queue:
+            meta = metas.get(t["id"])
+            if meta and meta["closed"]:
+                logger.info(f"跳过已关闭的帖子: {meta['title']}")
+                self.navigations_avoided += 1
+                continue
+            topics.append({"url": f"t/{t['slug']}/{t['id']}", "meta": meta})
+        return topics
+
+    def ensure_api(self):
+        if self.api is None:
+            self.api = DiscourseApi(self.context, self.page.evaluate("navigator.userAgent"), API_CONCURRENCY)
+        return self.api
+
+    def prioritize(self, topics):
+        """
+        按帖子索引排序：没读过的在前，读过一部分的在后，已读完且没有新回复的跳过
+        """
+        ranked = []
+        for topic in topics:
+            meta = topic["meta"] or {}
+            topic_id = self.topic_id(topic)
+            priority = self.index.priority(topic_id, meta.get("posts_count")) if topic_id else 0
+            if priority == PRIORITY_DONE:
+                self.skipped_read += 1
+                continue
+            ranked.append((priority, topic))
+        if self.skipped_read:
+            logger.info(f"跳过 {self.skipped_read} 个已读完的帖子")
+        ranked.sort(key=lambda item: item[0])  # 稳定排序，同优先级保持原顺序
+        return [topic for _, topic in ranked]
+
+    def resume(self):
+        """
+        从未过期的断点恢复帖子队列和计数，断点中只有帖子 id 和 URL，剩余帖子的元数据重新从接口获取
+        :return: bool 是否恢复了断点
+        """
+        state = self.checkpoint.load()
+        if not state or state.get("position", 0) >= len(state.get("queue", [])):
+            return False
+        self.queue = [{"id": topic.get("id"), "url": topic["url"], "meta": None} for topic in state["queue"]]
+        self.position = state["position"]
+        self.scheduled = state["scheduled"]
+        self.browse_count = state["browse_count"]
+        self.like_count = state["like_count"]
+        self.skipped_read = state["skipped_read"]
+        self.liked_posts = state["liked_posts"]
+        self.read_seconds = state["read_seconds"]
+        self.start_time = time.time() - state["elapsed"]
+        logger.info(f"从断点继续：已完成 {self.position}/{len(self.queue)} 个帖子")
+        if self.scheduled and API_READ:
+            remaining = [topic for topic in self.queue[self.position:] if topic["id"]]
+            try:
+                metas = self.ensure_api().topics([topic["id"] for topic in remaining])
+            except Exception as e:
+                logger.warning(f"重新获取帖子元数据失败，改为读取页面: {str(e)}")
+                metas = {}
+            for topic in remaining:
+                topic["meta"] = metas.get(topic["id"])
+        return True
+
+    @staticmethod
+    def topic_id(topic):
+        return (topic["meta"] or {}).get("id") or topic.get("id") or topic_id_from_url(topic["url"])
+
+    def save_checkpoint(self):
+        read_seconds = time.time() - self.read_start if self.read_start else self.read_seconds
+        self.checkpoint.save({
+            # 只保存帖子 id 和 URL，元数据（含 post_ids）恢复时重新获取
+            "queue": [{"id": self.topic_id(topic), "url": topic["url"]} for topic in self.queue],
+            "position": self.position,
+            "scheduled": self.scheduled,
+            "browse_count": self.browse_count,
+            "like_count": self.like_count,
+            "skipped_read": self.skipped_read,
+            "liked_posts": self.liked_posts,
+            "read_seconds": read_seconds,
+            "elapsed": time.time() - self.start_time,
+        })
+
     def click_topic(self):
-        topic_list = self.page.query_selector_all("#list-area .title")
-        total_topics = len(topic_list)
+        if not self.resume():
+            topics = self.fetch_topics() if API_READ else None
+            # 调度器已经按目标排好队列；读取页面时仍按原来的方式随机提前退出
+            self.scheduled = topics is not None
+            if not self.scheduled:
+                # 调度器已经按索引排除已读帖子并排好顺序，只有读取页面时需要按索引排序
+                topic_list = self.page.query_selector_all("#list-area .title")
+                topics = self.prioritize([{"url": topic.get_attribute("href"), "meta": None} for topic in topic_list])
+            self.queue = topics
+            self.position = 0
+        topics = self.queue
+        scheduled = self.scheduled
+        total_topics = len(topics)
         logger.info("=" * 50)
         logger.info(f"共发现 {total_topics} 个主题帖")
         logger.info("=" * 50)
         
-        for index, topic in enumerate(topic_list, 1):
+        read_start = self.read_start = time.time() - self.read_seconds
+        for index, topic in enumerate(topics[self.position:], self.position + 1):
             logger.info("\n" + "-" * 30)
             logger.success(f"进度：{index}/{total_topics} ({(index/total_topics*100):.1f}%)")
-            topic_url = topic.get_attribute("href")
-            self.click_one_topic(topic_url, index, total_topics)
+            if self.budget.enabled:
+                # 剩余时间不够就提前收尾，够用时按剩余帖子数调整停留时间
+                if not self.budget.can_start():
+                    logger.info(f"剩余时间不足以再读一个帖子（约 {self.budget.estimate():.0f} 秒），结束浏览")
+                    break
+                self.scroller.set_dwell(*self.budget.adjust(total_topics - index + 1))
+            topic_start = time.time()
+            self.scroll_steps = 0
+            try:
+                with self.tail.window("topic", HOME_URL + topic["url"]):
+                    if self.click_one_topic(topic["url"], index, total_topics, topic["meta"]) is None:
+                        self.tail.fail("重试后仍然失败")
+            except SiteUnhealthy:
+                logger.error("站点异常，结束浏览，下次运行从这个帖子继续")
+                break
+            self.budget.record(time.time() - topic_start, self.scroll_steps)
+            self.position = index
+            self.save_checkpoint()
+            self.drain_likes()  # 处理之前因频率限制推迟的点赞
+            self.check_memory()
             
-            if random.random() < 0.1:  # 10% 概率提前退出
+            if scheduled:
+                if TARGET_READ_MINUTES and time.time() - read_start >= TARGET_READ_MINUTES * 60:
+                    logger.info("已达到目标阅读时间，结束浏览")
+                    break
+            elif not self.budget.enabled and random.random() < 0.1:  # 10% 概率提前退出，有时间预算时由预算决定
                 logger.info("随机退出浏览")
                 break
 
-    @retry_decorator()
+        self.finish_likes()
+        if self.retry.healthy:
+            self.checkpoint.clear()  # 正常结束，下次重新开始
+        else:
+            self.save_checkpoint()  # 熔断提前结束，保留断点，下次从未完成的帖子继续
+        self.read_start = None
+        self.save_session()
+        self.budget.save()
+        self.probe.cache.save()
+        self.blocker.save()
+
+    @timed("click_one_topic", detail_arg=0)
+    @retrying("click_one_topic")
     # def click_one_topic(self, topic_url):
     #     page = self.context.new_page()
     #     page.goto(HOME_URL + topic_url)
@@ -181,146 +603,144 @@ class LinuxDoBrowser:
     #     self.browse_post(page)
     #     self.browse_count += 1  # 增加浏览计数
     #     page.close()
-    def click_one_topic(self, topic_url, current_index, total_topics):
-        page = self.context.new_page()
+    def click_one_topic(self, topic_url, current_index, total_topics, meta=None):
+        page = self.pages.acquire()
         full_url = HOME_URL + topic_url
-        page.goto(full_url)
-        
         try:
-            # 获取帖子标题
-            title = None
-            title_selectors = [
-                "#main-outlet .topic-title h1",
-                "h1 .fancy-title span[dir='auto']",
-                "#main-outlet h1",
-                ".topic-title",
-                ".title-wrapper h1 a[data-topic-id]",  # 使用更精确的选择器
-                ".title-wrapper h1 a .fancy-title span"
-            ]
-            
-            # 依次尝试不同的选择器
-            for selector in title_selectors:
-                try:
-                    title_elements = page.locator(selector)
-                    count = title_elements.count()
-                    if count > 0:
-                        # 如果有多个元素，遍历它们找到实际的标题
-                        for i in range(count):
-                            element_text = title_elements.nth(i).inner_text().strip()
-                            if element_text and not element_text.startswith("此话题"):  # 排除提示文本
-                                title = element_text
-                                break
-                        if title:  # 如果找到有效标题就退出循环
-                            break
-                except Exception as e:
-                    logger.debug(f"选择器 '{selector}' 尝试失败: {str(e)}")
-                    continue
-            
-            # 如果上述方法都失败，尝试直接获取带有 data-topic-id 的链接文本
-            if not title:
-                try:
-                    topic_link = page.locator("a[data-topic-id]").first
-                    if topic_link:
-                        title = topic_link.inner_text().strip()
-                except Exception as e:
-                    logger.debug(f"备用方法获取标题失败: {str(e)}")
-            
-            if not title:
-                title = "未知标题"
+            load_start = time.time()
+            # 429 / 5xx 抛出 HttpStatusError，由重试策略退避后重试
+            check_response(page.goto(full_url), full_url)
+            self.blocker.record_load(time.time() - load_start)
+            # 等待 Ember 渲染出标题再读取
+            self.waiter.any_selector(page, TITLE_SELECTORS[:3], "topic_title", timeout=10000)
+            self.read_topic(page, topic_url, full_url, current_index, total_topics, meta)
+            return True
+        finally:
+            self.pages.release(page)
+
+    def read_topic(self, page, topic_url, full_url, current_index, total_topics, meta=None):
+        """读取已经打开的帖子：点赞、滚动、记录索引；页面本身的错误在这里处理，站点错误交给重试策略"""
+        try:
+            # 已有接口元数据时不再探测页面；否则一次 evaluate 取出标题、分类、标签和点赞信息，
+            # browse_post / click_like 共用
+            meta = meta or {}
+            probe = None if meta else self.probe.probe(page)
+            title = (meta or probe)["title"] or "未知标题"
             
             logger.info(f"[{current_index}/{total_topics}] 正在浏览: {title} | URL: {full_url}")
             
-            # 如果没有达到每日上限，才考虑点赞
-            if not self.daily_limit_reached:
+            topic_id = meta.get("id") or topic_id_from_url(full_url)
+            post_id = meta.get("post_id") or (probe or {}).get("post_id")
+
+            # 如果没有达到每日上限，才考虑点赞（接口或索引显示已点过赞的帖子直接跳过）
+            if meta.get("liked") or self.index.is_liked(post_id):
+                logger.info("已经点过赞了")
+                self.index.mark_liked(post_id, topic_id)
+            elif not self.daily_limit_reached:
                 # 根据已点赞数量动态调整点赞概率
-                if self.like_count < 5:  # 如果点赞数少于5个，提高点赞概率
-                    like_probability = 0.5  # 50% 概率
-                elif self.like_count < 10:  # 如果点赞数在5-10之间
-                    like_probability = 0.3  # 30% 概率
-                else:  # 如果已经点赞超过10个
-                    like_probability = 0.1  # 降低到10%概率
+                like_probability = topic_like_probability(self.like_count)
                 
                 if random.random() < like_probability:
-                    # 最多重试3次
-                    for attempt in range(3):
-                        if self.click_like(page):
-                            break
-                        logger.info(f"第 {attempt + 1} 次点赞尝试失败，准备重试...")
+                    # 放进点赞队列：令牌桶允许时直接在当前页面点赞，否则稍后重新打开帖子再点
+                    self.likes.enqueue({"url": topic_url, "post_id": post_id, "topic_id": topic_id})
+                    self.drain_likes(page, topic_url, probe)
             
-            self.browse_post(page)
+            read_post_number, reached_bottom = self.browse_post(page, probe or meta or None)
             self.browse_count += 1
+            if topic_id:
+                self.index.mark_read(topic_id, read_post_number, meta.get("posts_count"), reached_bottom)
         except Exception as e:
+            if classify(e) != OTHER:
+                raise
             logger.error(f"浏览帖子时出错: {str(e)}")
-        finally:
-            page.close()
+            self.tail.fail(str(e))
+
+    def drain_likes(self, page=None, topic_url=None, probe=None):
+        """
+        在令牌桶允许的范围内处理点赞队列，不等待
+        :param page: 当前正在浏览的帖子页面，队列中是这个帖子时直接在上面点赞
+        """
+        while not self.daily_limit_reached and self.retry.healthy:
+            item = self.likes.next_ready()
+            if item is None:
+                return
+            current = page is not None and item["url"] == topic_url
+            target = page if current else self.pages.acquire()
+            try:
+                if not current:
+                    check_response(target.goto(HOME_URL + item["url"]))
+                    self.waiter.any_selector(target, TITLE_SELECTORS[:3], "topic_title", timeout=10000)
+                if not self.click_like(target, probe if current else None):
+                    if not self.daily_limit_reached:
+                        logger.info(f"第 {item['attempts'] + 1} 次点赞尝试失败，稍后重试")
+                        self.likes.requeue(item)
+                    probe = None  # 重试时重新探测
+            except Exception as e:
+                logger.warning(f"处理点赞队列失败: {str(e)}")
+                self.retry.record(classify(e))
+                self.likes.requeue(item)
+            finally:
+                if not current:
+                    self.pages.release(target)
+
+    def finish_likes(self):
+        """浏览结束后在 LIKE_DRAIN_SECONDS 内处理剩余的点赞，来不及的放弃，最多占用一半的收尾时间"""
+        drain_seconds = LIKE_DRAIN_SECONDS
+        if self.budget.enabled:
+            drain_seconds = min(drain_seconds, max(0, self.budget.remaining() + self.budget.reserve / 2))
+        deadline = time.time() + drain_seconds
+        while self.likes.pending() and not self.daily_limit_reached and self.retry.healthy:
+            wait = self.likes.wait_time()
+            if time.time() + wait > deadline:
+                logger.info(f"放弃 {self.likes.pending()} 个待点赞帖子（还需等待 {wait:.0f} 秒）")
+                self.likes.clear()
+                return
+            self.pause(wait)
+            self.drain_likes()
 
-    def browse_post(self, page):
+    @timed("browse_post")
+    def browse_post(self, page, probe=None):
         # 获取帖子标题和信息
         try:
-            # 尝试多种可能的标题选择器
-            title = None
-            title_selectors = [
-                "#main-outlet .topic-title h1",           # 第一种形式
-                "h1 .fancy-title span[dir='auto']",       # 第二种形式
-                "#main-outlet h1",                        # 第三种形式
-                ".topic-title",                           # 第四种形式
-                ".title-wrapper h1 a[data-topic-id]",     # 第五种形式（分页帖子，使用更精确的选择器）
-                ".title-wrapper h1 a .fancy-title span",  # 第六种形式
-                "h1.topic-title",                         # 第七种形式
-                ".topic-title h1 span"                    # 第八种形式
-            ]
-            
-            # 依次尝试不同的选择器
-            for selector in title_selectors:
-                try:
-                    title_elements = page.locator(selector)
-                    count = title_elements.count()
-                    if count > 0:
-                        # 如果有多个元素，尝试找到包含实际标题的那个
-                        for i in range(count):
-                            element_text = title_elements.nth(i).inner_text().strip()
-                            if element_text and not element_text.startswith("此话题"):  # 排除提示文本
-                                title = element_text
-                                break
-                        if title:  # 如果找到有效标题就退出循环
-                            break
-                except Exception as e:
-                    logger.debug(f"选择器 '{selector}' 尝试失败: {str(e)}")
-                    continue
-            
-            # 如果上述方法都失败，尝试直接获取带有 data-topic-id 的链接文本
-            if not title:
-                try:
-                    topic_link = page.locator("a[data-topic-id]").first
-                    if topic_link:
-                        title = topic_link.inner_text().strip()
-                except Exception as e:
-                    logger.debug(f"备用方法获取标题失败: {str(e)}")
-            
+            probe = probe or self.probe.probe(page)
+            title = probe["title"]
             if not title:
                 title = "未知标题"
                 logger.warning("无法获取标题")
             
-            # 获取分类（使用 first 避免多个元素的问题）
-            category = page.locator(".title-wrapper .badge-category__name").first.inner_text()
-            # 获取所有标签
-            tags = page.locator(".discourse-tags .discourse-tag").all_inner_texts()
-            
             logger.info(f"已加载页面: {page.url} | 标题: {title}")
-            logger.info(f"分类：{category}")
-            if tags:
-                logger.info(f"标签：{', '.join(tags)}")
+            logger.info(f"分类：{probe['category']}")
+            if probe["tags"]:
+                logger.info(f"标签：{', '.join(probe['tags'])}")
         except Exception as e:
             logger.warning(f"获取帖子信息失败: {str(e)}")
             title = "未知标题"
 
+        # credit 模式：服务器确认全部楼层的阅读后提前结束停留
+        topic_id = topic_id_from_url(page.url)
+        posts_count = (probe or {}).get("posts_count")
+        until = self.credit.watcher(page, topic_id, posts_count) if DWELL_MODE == "credit" else None
+
+        # 整个滚动和停留在页面中完成，只等待结束
+        if SCROLL_ENGINE == "page":
+            result = self.scroller.run(page, until)
+            self.scroll_steps = result["steps"]
+            logger.info(f"滚动 {result['steps']} 次，已加载 {result['posts']} 层 | URL: {result['url']}")
+            if result["reason"] == "credited":
+                self.credit.early_stops += 1
+            return self.settle_reading(
+                page, topic_id, posts_count, result["post_number"], result["reason"] in ("bottom", "credited")
+            )
+
         prev_url = None
+        reached_bottom = False
         # 开始自动滚动，最多滚动10次
         for _ in range(10):
             # 随机滚动一段距离
             scroll_distance = random.randint(550, 650)  # 随机滚动 550-650 像素
             logger.info(f"向下滚动 {scroll_distance} 像素...")
             page.evaluate(f"window.scrollBy(0, {scroll_distance})")
+            self.scroll_steps += 1
             # logger.info(f"已加载页面: {page.url}")
             # logger.info(f"已加载页面: {page.url} | 标题: {title}")
             logger.info("已加载页面: {} | 标题: {}", page.url, title)
@@ -336,241 +756,194 @@ class LinuxDoBrowser:
                 prev_url = current_url
             elif at_bottom and prev_url == current_url:
                 logger.success("已到达页面底部，退出浏览")
+                reached_bottom = True
                 break
 
             # 动态随机等待
-            wait_time = random.uniform(2, 4)  # 随机等待 2-4 秒
+            wait_time = random.uniform(*self.budget.dwell())  # 模拟阅读的停留时间，默认 2-4 秒，时间预算不足时缩短
             logger.info(f"等待 {wait_time:.2f} 秒...")
-            time.sleep(wait_time)
+            # 等待期间 Playwright 才会分发路由和 /topics/timings 的响应事件
+            page.wait_for_timeout(wait_time * 1000)
+            if until is None:
+                continue
+            if until():
+                logger.success("服务器已确认全部楼层的阅读，结束停留")
+                self.credit.early_stops += 1
+                reached_bottom = True
+                break
+
+        # 返回读到的楼层和是否读完，记录到帖子索引
+        return self.settle_reading(page, topic_id, posts_count, post_number_from_url(page.url), reached_bottom)
+
+    def settle_reading(self, page, topic_id, posts_count, post_number, reached_end):
+        """
+        离开帖子前提交最后一次阅读时间，已确认的最大楼层计入读到的位置
+        :return: (读到的楼层, 是否读完)
+        """
+        if DWELL_MODE == "credit" and not self.credit.complete(topic_id, posts_count):
+            credited = self.credit.settle(page, topic_id, CREDIT_SETTLE_SECONDS)
+            logger.info(f"服务器已确认 {credited} 层的阅读")
+        return max(post_number or 0, self.credit.highest(topic_id)) or post_number, reached_end
+
+    def ensure_login(self):
+        """
+        会话有效时直接复用，否则走登录流程并保存新会话
+        :return: bool 是否处于登录状态
+        """
+        if self.session_valid:
+            self.login_mode = "session"
+        else:
+            login_start = time.time()
+            with self.tail.window("login", HOME_URL):
+                logged_in = self.login()
+                if not logged_in:
+                    self.tail.fail("登录失败")
+            if not logged_in:
+                return False
+            self.login_mode = "login"
+            self.login_elapsed += time.time() - login_start
+            self.session_store.save(self.context)
+        # 登录后马上开始预取报告数据，与浏览同时进行
+        self.prefetch.start(self.context)
+        return True
+
+    def save_session(self):
+        """运行结束时保存会话：服务器会轮换 _t cookie，只在登录后保存的话下次运行拿到的是旧 cookie"""
+        if self.login_mode and not HAR_MODE:
+            self.session_store.save(self.context)
 
     def run(self):
-        if not self.login():
-            logger.error("登录失败，程序终止")
-            sys.exit(1)  # 使用非零退出码终止整个程序
-        self.click_topic()
-        self.print_connect_info()
+        # 定时任务超时会发送 SIGTERM（手动中断是 SIGINT），保存断点并输出部分报告
+        signal.signal(signal.SIGTERM, raise_interrupted)
+        signal.signal(signal.SIGINT, raise_interrupted)
+        try:
+            if not self.ensure_login():
+                logger.error("登录失败，程序终止")
+                sys.exit(1)  # 使用非零退出码终止整个程序
+            self.click_topic()
+            self.print_connect_info()
+            self.export_metrics()
+            if not self.retry.healthy:
+                sys.exit(1)  # 站点异常提前结束，以失败状态退出
+        except RunInterrupted:
+            self.interrupted = True
+            logger.warning(f"运行被中断，已保存断点（完成 {self.position}/{len(self.queue)} 个帖子），输出部分报告")
+            if self.queue:
+                self.save_checkpoint()
+            # 不再访问浏览器和网络，只使用已经拿到的数据；浏览器连接可能卡住，会话不在这里保存
+            self.yiyan = self.prefetch.yiyan(timeout=0) or load_cached_yiyan() or YIYAN_FALLBACK
+            print_report([self.get_stats()], time.time() - self.start_time)
+            self.export_metrics()
+            sys.exit(1)
 
-    def click_like(self, page):
+    @timed("click_like")
+    @tail_sampled("click_like")
+    def click_like(self, page, probe=None):
         # 如果已经达到每日上限，直接返回
         if self.daily_limit_reached:
             logger.info("已达到每日点赞上限，跳过点赞")
             return True
 
         try:
-            # 1. 检查是否已经点赞（更精确的选择器）
-            already_liked = False
-            already_liked_selectors = [
-                # 基础已点赞状态
-                '.discourse-reactions-actions.has-reacted.has-reactions',
-                # 带有主要反应的已点赞状态
-                '.discourse-reactions-actions.has-reactions.has-reacted.has-used-main-reaction',
-                # 删除按钮状态
-                '.discourse-reactions-double-button button[title="删除此 heart 回应"]',
-                'button[title="移除此赞"]',
-                # 自定义表情状态
-                '.discourse-reactions-actions.custom-reaction-used.has-reactions.has-reacted',
-                # 组合状态
-                '.discourse-reactions-actions.has-reactions.has-reacted.has-used-main-reaction.can-toggle-reaction'
-            ]
-            
-            for selector in already_liked_selectors:
-                element = page.locator(selector).first
-                if element and element.is_visible():  # 添加可见性检查
-                    logger.debug(f"检测到已点赞状态: {selector}")
-                    already_liked = True
-                    break
-            
-            if already_liked:
+            probe = probe or self.probe.probe(page)
+
+            # 1. 检查是否已经点赞
+            if probe["liked"]:
+                logger.debug(f"检测到已点赞状态: {probe['liked_selector']}")
                 logger.info("已经点过赞了")
+                self.index.mark_liked(probe["post_id"], probe["topic_id"])
                 return True
 
-            # 2. 查找未点赞的按钮（更新选择器）
-            like_button = None
-            button_selectors = [
-                # 先尝试点击父元素
-                'div[title="点赞此帖子"].discourse-reactions-reaction-button',
-                # 双按钮布局的父元素
-                '.discourse-reactions-double-button div[title="点赞此帖子"].discourse-reactions-reaction-button',
-                # 如果父元素不可用，再尝试按钮本身
-                'button[title="点赞此帖子"]',
-                # 带有反应状态的未点赞按钮
-                '.discourse-reactions-actions.has-reactions:not(.has-reacted) button[title="点赞此帖子"]',
-                # 双按钮布局的未点赞按钮
-                '.discourse-reactions-double-button .discourse-reactions-reaction-button button[title="点赞此帖子"]',
-                # 基础点赞按钮类
-                'button.btn-toggle-reaction-like[title="点赞此帖子"]',
-                '.discourse-reactions-double-button button[title="点赞此帖子"]',
-                # 可切换反应的未点赞按钮
-                '.discourse-reactions-actions.has-reactions.can-toggle-reaction:not(.has-reacted) .btn-toggle-reaction-like'
-            ]
-            
-            # 查找点赞按钮
-            for selector in button_selectors:
-                button = page.locator(selector).first
-                if button and button.is_visible():  # 添加可见性检查
-                    logger.debug(f"找到点赞按钮: {selector}")
-                    like_button = button
-                    break
-
-            if not like_button:
+            # 2. 查找未点赞的按钮
+            if not probe["like_button"]:
                 logger.info("未找到点赞按钮")
                 return True  # 返回 True 因为这不是错误状态
+            logger.debug(f"找到点赞按钮: {probe['like_button']}")
+            like_button = page.locator(probe["like_button"]).first
 
             # 3. 获取帖子的点赞数
-            counter_selectors = [
-                '.discourse-reactions-double-button .reactions-counter',  # 双按钮布局中的计数器
-                '.only-like.discourse-reactions-counter .reactions-counter',  # 只有点赞的计数器
-                '.discourse-reactions-counter .reactions-counter',  # 通用计数器
-                '.reactions-counter',  # 基础计数器
-                '[id^="discourse-reactions-counter-"][id$="-right"] .reactions-counter',  # 右侧计数器
-                '[id^="discourse-reactions-counter-"][id$="-left"] .reactions-counter'    # 左侧计数器
-            ]
-
-            try:
-                likes_count = 0  # 默认值
-                for selector in counter_selectors:
-                    try:
-                        counter = page.locator(selector).first
-                        if counter and counter.is_visible():
-                            likes_text = counter.inner_text().strip()
-                            if likes_text:  # 如果有文本
-                                likes_count = int(''.join(filter(str.isdigit, likes_text)) or 0)
-                                logger.info(f"发现帖子，当前点赞数：{likes_count} | URL: {page.url}")
-                                break
-                    except Exception as e:
-                        logger.debug(f"选择器 '{selector}' 尝试失败: {str(e)}")
-                        continue
-                
-                if not likes_count:
-                    logger.debug(f"未找到点赞数，默认为0 | URL: {page.url}")
-            except Exception as e:
-                logger.debug(f"获取点赞数失败: {str(e)}")
-                likes_count = 0  # 设置默认值
+            likes_count = probe["likes"]
+            if likes_count:
+                logger.info(f"发现帖子，当前点赞数：{likes_count} | URL: {page.url}")
+            else:
+                logger.debug(f"未找到点赞数，默认为0 | URL: {page.url}")
 
             # 4. 根据点赞数决定点赞概率
-            if likes_count >= 50:  # 高赞帖子
-                probability = 0.9   # 90% 概率点赞
-            elif likes_count >= 30:
-                probability = 0.7   # 70% 概率点赞
-            elif likes_count >= 10:
-                probability = 0.5   # 50% 概率点赞
-            else:
-                probability = 0.3   # 30% 基础概率
+            probability = post_like_probability(likes_count)
 
             # 5. 执行点赞
             if random.random() < probability:
                 logger.info(f"准备点赞(当前点赞数：{likes_count}，点赞概率：{probability:.0%})")
-                
+                self.likes.spend()
+                if self.like_api:
+                    result = self.like_via_api(probe, likes_count)
+                    if result is not None:
+                        return result
+
                 # 禁用页面滚动
-                page.evaluate("""
-                    window.originalOverflow = document.body.style.overflow;
-                    document.body.style.overflow = 'hidden';
-                """)
+                page.evaluate(DISABLE_SCROLL_JS)
+                dom_start = time.time()
                 
                 try:
-                    like_button.click()
-                    time.sleep(1)  # 等待可能的弹窗出现
+                    # 点击并等待回应切换接口返回
+                    toggle_response = self.waiter.response(
+                        page, "/discourse-reactions/posts/", like_button.click,
+                        "like_toggle", timeout=5000, method="PUT"
+                    )
 
-                    # 检查限制弹窗
-                    rate_limit_dialogs = [
-                        # 频率限制弹窗
-                        {
-                            'selector': '.dialog-content p:has-text("您执行此操作的次数过多")',
-                            'pattern': r'(\d+)\s*秒',
-                            'default_wait': 60,
-                            'message': "触发操作频率限制"
-                        },
-                        # 每日上限弹窗
-                        {
-                            'selector': '.dialog-content p:has-text("您已经达到 24 小时点赞上限")',
-                            'pattern': r'(\d+)\s*分钟',
-                            'default_wait': 60 * 48,  # 默认等待48分钟
-                            'message': "达到每日点赞上限"
-                        }
-                    ]
-
-                    for dialog in rate_limit_dialogs:
+                    # 接口成功时不会有限制弹窗；失败或没等到响应时再等待弹窗出现
+                    dialog, dialog_text = None, None
+                    if toggle_response is None or not toggle_response.ok:
+                        self.waiter.any_selector(
+                            page, [dialog['selector'] for dialog in RATE_LIMIT_DIALOGS], "like_dialog", timeout=3000
+                        )
                         try:
-                            limit_dialog = page.locator(dialog['selector']).first
-                            if limit_dialog and limit_dialog.is_visible(timeout=3000):
-                                dialog_text = limit_dialog.inner_text()
-                                
-                                # 点击确定按钮关闭弹窗
-                                confirm_button = page.locator('.dialog-footer .btn-primary:has-text("确定")')
-                                if confirm_button.first:
-                                    confirm_button.click()
-                                    time.sleep(1)  # 等待弹窗关闭
-                                
-                                # 如果是每日上限，设置标记并返回
-                                if "24 小时点赞上限" in dialog_text:
-                                    logger.warning("已达到每日点赞上限，后续帖子将不再尝试点赞")
-                                    self.daily_limit_reached = True  # 设置每日上限标记
-                                    return False  # 返回 False 表示需要重试
-                                
-                                # 如果是频率限制，提取等待时间
-                                wait_match = re.search(dialog['pattern'], dialog_text)
-                                if wait_match:
-                                    wait_time = int(wait_match.group(1))
-                                    if '分钟' in dialog_text:
-                                        wait_seconds = wait_time * 60
-                                    else:
-                                        wait_seconds = wait_time
-                                else:
-                                    wait_seconds = dialog['default_wait']
-                                
-                                logger.warning(f"{dialog['message']}，需要等待 {wait_seconds} 秒")
-                                time.sleep(wait_seconds + 2)  # 多等待2秒以确保限制解除
-                                return False  # 返回 False 表示需要重试
+                            dialog, dialog_text = read_limit_dialog(page)
                         except Exception as e:
                             logger.debug(f"检查限制弹窗失败: {str(e)}")
-                            continue
+
+                    # 检查限制弹窗
+                    if dialog:
+                        # 点击确定按钮关闭弹窗
+                        confirm_button = page.locator(DIALOG_CONFIRM_SELECTOR)
+                        if confirm_button.first:
+                            confirm_button.click()
+                            self.waiter.selector(page, ".dialog-content", "dialog_close", timeout=3000, state="hidden")
+                        
+                        wait_seconds = parse_limit_wait(dialog, dialog_text)
+
+                        # 如果是每日上限，设置标记并记下恢复时间，之后的运行在恢复前不再尝试
+                        if DAILY_LIMIT_TEXT in dialog_text:
+                            logger.warning("已达到每日点赞上限，后续帖子将不再尝试点赞")
+                            self.daily_limit_reached = True  # 设置每日上限标记
+                            self.likes.daily_limit_hit(wait_seconds)
+                            return False  # 返回 False 表示需要重试
+                        
+                        # 如果是频率限制，暂停点赞但继续浏览
+                        logger.warning(f"{dialog['message']}，暂停点赞 {wait_seconds} 秒，继续浏览")
+                        self.likes.rate_limited(wait_seconds)
+                        return False  # 返回 False 表示需要重试
 
                     # 点赞成功后重新获取点赞数
-                    time.sleep(1)  # 等待点赞数更新
-                    current_likes = 0
-                    for selector in counter_selectors:
-                        counter = page.locator(selector).first
-                        if counter and counter.is_visible():
-                            try:
-                                likes_text = counter.inner_text().strip()
-                                if likes_text:
-                                    current_likes = int(''.join(filter(str.isdigit, likes_text)) or 0)
-                                    break
-                            except:
-                                continue
+                    self.waiter.any_selector(page, ALREADY_LIKED_SELECTORS, "like_counter", timeout=3000)  # 等待点赞状态更新
+                    after = self.probe.probe(page)
+                    current_likes = after["likes"]
                     # 验证点赞是否真的成功
                     if current_likes <= likes_count:  # 如果点赞数没有增加
                         logger.warning(f"点赞可能失败 ❌ | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes}")
                         return False  # 返回 False 以便重试
                     
-                    self.like_count += 1
-                    # 获取楼层号
-                    try:
-                        floor_selectors = [
-                            '.linuxfloor',  # 原有的选择器
-                            '.post-infos .linuxfloor',  # 新增的选择器
-                            'div.post-infos span.linuxfloor'  # 更精确的选择器
-                        ]
-                        
-                        floor_number = None
-                        for selector in floor_selectors:
-                            floor_element = page.locator(selector).first
-                            if floor_element and floor_element.is_visible():
-                                floor_number = floor_element.inner_text().strip('#')
-                                break
-                        
-                        if floor_number:
-                            logger.success(f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes} | 楼层: {floor_number}")
-                        else:
-                            logger.success(f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes}")
-                    except:
+                    self.count_like(probe)
+                    # 楼层号
+                    floor_number = after["floor"]
+                    if floor_number:
+                        logger.success(f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes} | 楼层: {floor_number}")
+                    else:
                         logger.success(f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {current_likes}")
                 finally:
+                    self.metrics.record("like_dom", time.time() - dom_start, probe["post_id"], started=dom_start)
                     # 恢复页面滚动
-                    page.evaluate("""
-                        document.body.style.overflow = window.originalOverflow || '';
-                        delete window.originalOverflow;
-                    """)
+                    page.evaluate(RESTORE_SCROLL_JS)
             else:
                 logger.info(f"跳过点赞(当前点赞数：{likes_count}，点赞概率：{probability:.0%})")
 
@@ -578,93 +951,398 @@ class LinuxDoBrowser:
 
         except Exception as e:
             logger.error(f"点赞失败: {str(e)}")
+            self.retry.record(classify(e))
+            self.tail.fail(str(e))
             # 确保在发生错误时也恢复页面滚动
             try:
-                page.evaluate("""
-                    document.body.style.overflow = window.originalOverflow || '';
-                    delete window.originalOverflow;
-                """)
+                page.evaluate(RESTORE_SCROLL_JS)
             except:
                 pass
             return False
 
-    
+    def like_via_api(self, probe, likes_count):
+        """
+        通过回应切换接口点赞，结果从 HTTP 状态码和 JSON 判断
+        :return: click_like 的返回值，接口不可用时返回 None，由调用方改用页面点击
+        """
+        with self.metrics.span("like_api", probe["post_id"]):
+            result = self.like_api.like(probe["post_id"])
+        outcome = result["outcome"]
+        if outcome == LIKED:
+            self.count_like(probe)
+            logger.success(
+                f"点赞成功 ✨ 总点赞数: {self.like_count} | 点赞前数量: {likes_count} -> 点赞后数量: {result['likes']}"
+                + (f" | 楼层: {probe['floor']}" if probe["floor"] else "")
+            )
+            return True
+        if outcome == ALREADY:
+            logger.info("已经点过赞了")
+            self.index.mark_liked(probe["post_id"], probe["topic_id"])
+            return True
+        if outcome == DAILY_LIMIT:
+            logger.warning("已达到每日点赞上限，后续帖子将不再尝试点赞")
+            self.daily_limit_reached = True
+            self.likes.daily_limit_hit(result["wait"])
+            return False
+        if outcome == RATE_LIMITED:
+            logger.warning(f"触发操作频率限制，暂停点赞 {result['wait']} 秒，继续浏览")
+            self.likes.rate_limited(result["wait"])
+            return False
+        if outcome == DENIED:
+            logger.info(f"不能给这个楼层点赞: {result['message']}")
+            return True
+        logger.info(f"接口点赞失败（{result['message']}），改为点击页面按钮")
+        return None
+
+    def count_like(self, probe):
+        self.like_count += 1
+        self.liked_posts.append(probe["post_id"])
+        self.index.mark_liked(probe["post_id"], probe["topic_id"])
+        self.likes.record_like()
 
-    def get_yiyan(self):
-        """获取一言"""
+    @timed("get_connect_info")
+    def get_connect_info(self):
+        """读取 connect.linux.do 的信任等级数据，优先使用预取的页面"""
+        info = self.prefetch.connect_info()
+        if info is not None:
+            return info
+        if not self.retry.healthy:
+            return []
+        return self.retry.call("get_connect_info", self.load_connect_info) or []
+
+    def load_connect_info(self):
+        page = self.context.new_page()
         try:
-            headers = {
-                'User-Agent': 'xiaoxiaoapi/1.0.0 (https://xxapi.cn)'
-            }
-            response = requests.get("https://v2.xxapi.cn/api/yiyan?type=hitokoto", headers=headers)
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("code") == 200:  # 修改这里：使用数字而不是字符串
-                    return result.get("data")
-            logger.warning("获取一言失败，API 返回：" + str(response.text))
-        except Exception as e:
-            logger.error(f"获取一言失败: {str(e)}")
-        return "API 访问失败，未能获取一言"
-    
+            check_response(page.goto(CONNECT_URL), CONNECT_URL)
+            return read_connect_table(page)
+        finally:
+            page.close()
+
+    @timed("collect_report")
+    def collect_report(self):
+        """浏览结束后取出预取的 Connect 数据和一言"""
+        self.connect_info = self.get_connect_info()
+        self.yiyan = self.prefetch.yiyan()
+
+    def get_stats(self):
+        """汇总本账号的运行结果，多账号模式下由 worker 返回给主进程"""
+        return {
+            "username": self.username or "未知用户",
+            "status": "成功",
+            "browse_count": self.browse_count,
+            "like_count": self.like_count,
+            "skipped_read": self.skipped_read,
+            "login_mode": self.login_mode,
+            "interrupted": self.interrupted,
+            "login_elapsed": self.login_elapsed,
+            "startup_elapsed": self.startup_elapsed,
+            "warm": self.warm,
+            "elapsed": time.time() - self.start_time,
+            "connect_info": self.connect_info,
+            "yiyan": self.yiyan,
+            "prefetch_summary": self.prefetch.summary(),
+            "pool_summary": self.pages.summary(),
+            "retry_summary": self.retry.summary(),
+            "like_summary": self.like_latency(),
+            "tail_summary": self.tail.summary(),
+            "cache_summary": self.assets.summary() if self.assets else None,
+            "credit_summary": self.credit.summary(sum(self.metrics.phases().get("browse_post", []))),
+            "budget_summary": (self.budget.budget, self.budget.factor) if self.budget.enabled else None,
+            "memory_summary": self.memory.summary() + (self.context_recycles,),
+            "wait_summary": self.waiter.summary(),
+            "api_summary": self.api.summary() + (self.navigations_avoided,) if self.api else None,
+            "block_summary": self.blocker.summary(),
+            "phase_table": self.metrics.table(),
+        }
+
+    def like_latency(self):
+        """{后端: (次数, p50 毫秒)}，只包含用到的后端"""
+        phases = self.metrics.phases()
+        return {
+            backend: (len(phases[phase]), percentile(phases[phase], 50) * 1000)
+            for backend, phase in (("接口", "like_api"), ("页面", "like_dom"))
+            if phases.get(phase)
+        }
+
+    @timed("print_connect_info")
     def print_connect_info(self):
         logger.info("获取连接信息")
-        page = self.context.new_page()
-        page.goto("https://connect.linux.do/")
-        rows = page.query_selector_all("table tr")
-
-        info = []
-        for row in rows:
-            cells = row.query_selector_all("td")
-            if len(cells) >= 3:
-                project = cells[0].text_content().strip()
-                current = cells[1].text_content().strip()
-                requirement = cells[2].text_content().strip()
-                info.append([project, current, requirement])
-
-        username = os.environ.get("USERNAME", "未知用户")
-        
-        # 使用更美观的 Markdown 格式输出
-        print("# 🤖 自动浏览报告")
-        print(f"### 👤 执行用户：{username}\n")
-        
+        self.collect_report()
+        print_report([self.get_stats()], time.time() - self.start_time)
+
+    def export_metrics(self):
+        """导出本次运行的分阶段耗时（JSON + Prometheus textfile）"""
+        key = account_key(self.username)
+        self.metrics.export_json(
+            os.path.join(METRICS_DIR, f"run_{key}.json"),
+            {
+                "username": self.username, "browse_count": self.browse_count, "like_count": self.like_count,
+                "tail_artifacts": self.tail.artifacts,
+            },
+        )
+        self.metrics.export_prometheus(
+            os.path.join(METRICS_DIR, f"linuxdo_{key}.prom"),
+            labels={"account": self.username or "default"},
+            gauges={"browse_count": self.browse_count, "like_count": self.like_count},
+        )
+        logger.info(f"运行指标已导出到 {METRICS_DIR}")
+
+    def close(self):
+        """关闭本账号的 context，自行启动的浏览器一并关闭"""
+        try:
+            if self.api:
+                self.api.close()
+            self.index.close()
+            self.prefetch.close()
+            self.pages.close()
+            self.tail.close()
+            self.context.close()
+            if self.owns_browser:
+                self.browser.close()
+                self.pw.stop()
+        except Exception as e:
+            logger.debug(f"关闭浏览器失败: {str(e)}")
+
+
+def format_duration(elapsed_time):
+    hours = int(elapsed_time // 3600)
+    minutes = int((elapsed_time % 3600) // 60)
+    seconds = int(elapsed_time % 60)
+    return f"{hours}小时{minutes}分{seconds}秒"
+
+
+def print_report(results, elapsed_time):
+    """
+    输出 Markdown 格式的运行报告
+    :param results: 每个账号的 get_stats() 结果
+    :param elapsed_time: 整体运行用时（多账号时为总墙钟时间）
+    """
+    # 使用更美观的 Markdown 格式输出
+    print("# 🤖 自动浏览报告")
+
+    for result in results:
+        print(f"### 👤 执行用户：{result['username']}\n")
+
+        if result["status"] != "成功":
+            print(f"❌ {result['status']}\n")
+            continue
+        if result.get("interrupted"):
+            print("⚠️ 运行被中断，以下为部分结果，下次运行将从断点继续\n")
+
         # Connect 信息部分
         print("### 📊 Connect 数据")
-        table_str = tabulate(info, headers=["项目", "当前", "要求"], tablefmt="github")
+        table_str = tabulate(result["connect_info"], headers=["项目", "当前", "要求"], tablefmt="github")
         print(table_str + "\n")
 
         # 运行统计部分
         print("### 📈 运行统计")
         print("```")  # 使用代码块使统计信息更醒目
-        print(f"📖 浏览帖子：{self.browse_count} 篇")
-        print(f"👍 点赞帖子：{self.like_count} 篇")
-        
-        # 计算运行时间
-        elapsed_time = time.time() - self.start_time
-        hours = int(elapsed_time // 3600)
-        minutes = int((elapsed_time % 3600) // 60)
-        seconds = int(elapsed_time % 60)
-        print(f"⏱️ 运行用时：{hours}小时{minutes}分{seconds}秒")
+        print(f"📖 浏览帖子：{result['browse_count']} 篇")
+        if result.get("skipped_read"):
+            print(f"⏭️ 跳过已读：{result['skipped_read']} 篇")
+        print(f"👍 点赞帖子：{result['like_count']} 篇")
+        login_mode_text = "复用会话" if result["login_mode"] == "session" else "账号密码登录"
+        print(f"🔐 登录方式：{login_mode_text}（耗时 {result['login_elapsed']:.1f} 秒）")
+        if result.get("startup_elapsed") is not None:
+            startup_text = "热启动" if result.get("warm") else "冷启动"
+            print(f"🚀 启动耗时：{result['startup_elapsed']:.1f} 秒（{startup_text}）")
+        if result.get("wait_summary"):
+            count, total, timeouts = result["wait_summary"]
+            print(f"⏳ 条件等待：{count} 次，累计 {total:.1f} 秒，超时 {timeouts} 次")
+        if result.get("api_summary"):
+            requests_count, failures, average, avoided = result["api_summary"]
+            print(f"🌐 接口读取：{requests_count} 次请求（失败 {failures} 次），平均 {average:.0f} 毫秒，少打开 {avoided} 个页面")
+        if result.get("block_summary"):
+            profile, allowed, allowed_bytes, blocked, blocked_bytes, average_load = result["block_summary"]
+            print(
+                f"🛡️ 资源拦截（{profile}）：放行 {allowed} 个 / {allowed_bytes / 1024 / 1024:.1f} MB，"
+                f"屏蔽 {blocked} 个 / 约 {blocked_bytes / 1024 / 1024:.1f} MB，帖子平均加载 {average_load:.1f} 秒"
+            )
+        if result.get("prefetch_summary"):
+            background, waited = result["prefetch_summary"]
+            print(f"📦 报告预取：后台完成 {background:.1f} 秒，收尾等待 {waited:.1f} 秒，节省约 {max(0, background - waited):.1f} 秒")
+        if result.get("pool_summary"):
+            created, reused, saved = result["pool_summary"]
+            print(f"🗂️ 标签页：新建 {created} 个，复用 {reused} 次，省下约 {saved:.1f} 秒")
+        if result.get("memory_summary"):
+            peak_total, peak_python, peak_browser, recycles = result["memory_summary"]
+            print(
+                f"🧠 内存峰值：{peak_total:.0f} MB（Python {peak_python:.0f} MB，浏览器 {peak_browser:.0f} MB），"
+                f"重建 context {recycles} 次"
+            )
+        if result.get("cache_summary"):
+            hits, misses, hit_bytes, size, warm, first_paint, cold_paint, warm_paint = result["cache_summary"]
+            hit_rate = hits / (hits + misses) if hits + misses else 0
+            print(
+                f"💾 资源缓存：命中 {hits}/{hits + misses}（{hit_rate:.0%}），省下 {hit_bytes / 1024 / 1024:.1f} MB，"
+                f"缓存占用 {size / 1024 / 1024:.1f} MB"
+            )
+            if first_paint is not None:
+                history = "，".join(
+                    f"{name}平均 {value:.2f} 秒" for name, value in (("冷缓存", cold_paint), ("热缓存", warm_paint))
+                    if value is not None
+                )
+                print(f"🎨 首页首次绘制：{first_paint:.2f} 秒（{'热' if warm else '冷'}缓存）" + (f"，{history}" if history else ""))
+        if result.get("tail_summary"):
+            windows, artifacts = result["tail_summary"]
+            if artifacts:
+                print(f"🔬 尾部采样：{windows} 个窗口，保留 {len(artifacts)} 个")
+                for item in artifacts:
+                    files = "，".join(f for f in (item["trace"], item["profile"]) if f) or "无文件"
+                    print(f"   - {item['phase']} {item['url'] or ''}：{item['reason']} → {files}")
+        if result.get("credit_summary"):
+            credited, browse_seconds, rate, early_stops = result["credit_summary"]
+            print(
+                f"📝 阅读确认：服务器确认 {credited} 层，浏览 {browse_seconds:.0f} 秒，每秒 {rate:.2f} 层，"
+                f"{early_stops} 个帖子提前结束停留"
+            )
+        if result.get("like_summary"):
+            like_text = "，".join(
+                f"{backend} {count} 次 p50 {p50:.0f} 毫秒" for backend, (count, p50) in result["like_summary"].items()
+            )
+            print(f"💗 点赞耗时：{like_text}")
+        if result.get("retry_summary"):
+            retries, retry_seconds, errors, open_reason = result["retry_summary"]
+            if retries or errors:
+                error_text = "，".join(f"{ERROR_NAMES[k]} {v} 次" for k, v in errors.items()) or "无"
+                print(f"🔁 重试：{retries} 次，等待 {retry_seconds:.1f} 秒（{error_text}）")
+            if open_reason:
+                print(f"🚨 站点异常，提前结束：{open_reason}")
+        if result.get("budget_summary"):
+            budget, factor = result["budget_summary"]
+            print(f"⌛ 时间预算：{format_duration(budget)}，停留时间为配置值的 {factor:.0%}")
+        print(f"⏱️ 运行用时：{format_duration(result['elapsed'])}")
         print("```\n")
-        
-        # 底部信息
-        print("---")  # 分隔线
-        
-        # 获取北京时间
-        beijing_tz = pytz.timezone('Asia/Shanghai')
-        beijing_time = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n⏰ 执行时间：`{beijing_time}`")
-        
-        # 添加一言
-        yiyan = self.get_yiyan()
-        print("\n### 📝 今日一言")
-        print(f"> {yiyan}")
 
-        page.close()
+        # 分阶段耗时
+        if result.get("phase_table"):
+            print("### ⏱️ 阶段耗时")
+            table_str = tabulate(
+                result["phase_table"], headers=["阶段", "次数", "合计(秒)", "p50", "p95", "最大"], tablefmt="github"
+            )
+            print(table_str + "\n")
+
+    # 多账号汇总
+    if len(results) > 1:
+        succeeded = [r for r in results if r["status"] == "成功"]
+        print("### 📦 汇总")
+        print("```")
+        print(f"👥 账号：{len(succeeded)}/{len(results)} 成功")
+        print(f"📖 浏览帖子：{sum(r['browse_count'] for r in succeeded)} 篇")
+        print(f"👍 点赞帖子：{sum(r['like_count'] for r in succeeded)} 篇")
+        print(f"⏱️ 总用时：{format_duration(elapsed_time)}")
+        print("```\n")
+
+    # 底部信息
+    print("---")  # 分隔线
+
+    # 获取北京时间
+    beijing_tz = pytz.timezone('Asia/Shanghai')
+    beijing_time = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+    print(f"\n⏰ 执行时间：`{beijing_time}`")
+
+    # 添加一言，优先使用预取的结果
+    yiyan = next((r["yiyan"] for r in results if r.get("yiyan")), None) or get_yiyan()
+    print("\n### 📝 今日一言")
+    print(f"> {yiyan}")
+
+
+def load_accounts(path):
+    """
+    读取多账号文件，每行一个 用户名:密码，# 开头为注释
+    :return: [(username, password), ...]
+    """
+    accounts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            username, sep, password = line.partition(":")
+            if not sep or not username or not password:
+                # 不输出行内容，格式错误的行可能只有密码
+                logger.warning(f"忽略格式错误的账号行: 第 {line_number} 行")
+                continue
+            accounts.append((username.strip(), password.strip()))
+    return accounts
+
+
+# 每个 worker 进程只启动一次浏览器，处理分到的所有账号
+_worker_pw = None
+_worker_browser = None
+
+
+def _close_worker_browser():
+    try:
+        _worker_browser.close()
+        _worker_pw.stop()
+    except Exception:
+        pass
+
+
+def _init_worker():
+    global _worker_pw, _worker_browser
+    _worker_pw = sync_playwright().start()
+    _worker_browser = launch_browser(_worker_pw)
+    Finalize(None, _close_worker_browser, exitpriority=10)
+
+
+def _run_account(account):
+    username, password = account
+    l = None
+    try:
+        l = LinuxDoBrowser(username, password, browser=_worker_browser)
+        if not l.ensure_login():
+            logger.error(f"账号 {username} 登录失败")
+            return {"username": username, "status": "登录失败"}
+        l.click_topic()
+        l.collect_report()
+        l.export_metrics()
+        return l.get_stats()
+    except Exception as e:
+        logger.error(f"账号 {username} 运行出错: {str(e)}")
+        return {"username": username, "status": f"运行出错: {str(e)}"}
+    finally:
+        if l:
+            l.close()
+
+
+def run_multi_account(path, workers=WORKERS):
+    """多账号模式：账号分散到多个进程，每个进程共用一个浏览器"""
+    start_time = time.time()
+    accounts = load_accounts(path)
+    if not accounts:
+        logger.error(f"账号文件 {path} 中没有可用账号")
+        sys.exit(1)
+    workers = max(1, min(workers, len(accounts)))
+    logger.info(f"多账号模式：{len(accounts)} 个账号，{workers} 个进程")
+
+    # chunksize=1 让空闲的进程立即领取下一个账号
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        results = list(pool.imap(_run_account, accounts, chunksize=1))
+        pool.close()
+        pool.join()
+
+    print_report(results, time.time() - start_time)
+    if not any(r["status"] == "成功" for r in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
+    if ACCOUNTS_FILE:
+        run_multi_account(ACCOUNTS_FILE)
+        sys.exit(0)
     if not USERNAME or not PASSWORD:
         print("Please set USERNAME and PASSWORD")
         exit(1)
+    if ENGINE == "async":
+        import asyncio
+        from async_browser import AsyncLinuxDoBrowser
+
+        stats = asyncio.run(AsyncLinuxDoBrowser().run())
+        if not stats:
+            sys.exit(1)
+        print_report([stats], stats["elapsed"])
+        sys.exit(0)
     l = LinuxDoBrowser()
     l.run()
@@ -0,0 +1,216 @@
+"""
+分阶段计时：记录浏览器启动、登录、每个帖子、滚动、点赞、报告等阶段的耗时，
+运行结束时导出 JSON 和 Prometheus textfile collector 格式的文件
+"""
+import os
+import json
+import math
+import time
+import tempfile
+import functools
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+def percentile(values, p):
+    """最近秩法计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def escape_label(value):
+    """按 Prometheus 文本格式转义标签值中的反斜杠、双引号和换行"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def process_tree_rss(pid=None):
+    """
+    进程及其所有子进程（Playwright 驱动、浏览器）的常驻内存，单位 MB
+    通过 /proc 统计，非 Linux 系统返回 0
+    """
+    pid = pid or os.getpid()
+    children = {}  # 父进程 -> [子进程]
+    rss_pages = {}
+    try:
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    # 进程名可能含空格，从最后一个右括号之后开始解析
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total * page_size / 1024 / 1024
+
+
+def process_rss(pid=None):
+    """单个进程的常驻内存，单位 MB，非 Linux 系统返回 0"""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class MemorySampler:
+    """采样 Python 进程和浏览器（子进程）的内存，记录峰值"""
+
+    def __init__(self) -> None:
+        self.peak_total = 0.0
+        self.peak_python = 0.0
+        self.peak_browser = 0.0
+
+    def sample(self):
+        """:return: 进程树总内存（MB）"""
+        total = process_tree_rss()
+        python = process_rss()
+        self.peak_total = max(self.peak_total, total)
+        self.peak_python = max(self.peak_python, python)
+        self.peak_browser = max(self.peak_browser, total - python)
+        return total
+
+    def summary(self):
+        """(总峰值, Python 峰值, 浏览器峰值)，单位 MB"""
+        return self.peak_total, self.peak_python, self.peak_browser
+
+
+def timed(name, detail_arg=None):
+    """
+    方法装饰器，用 self.metrics 记录方法耗时
+    :param detail_arg: 作为明细记录的位置参数下标（例如帖子 URL）
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            detail = args[detail_arg] if detail_arg is not None and len(args) > detail_arg else None
+            with self.metrics.span(name, detail):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.spans = []  # [{"phase", "seconds", "detail", "ok", "start"}]
+        self.start_time = time.time()
+
+    @contextmanager
+    def span(self, name, detail=None):
+        """记录一段代码的耗时，异常会继续抛出并标记为失败"""
+        started = time.time()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(name, time.time() - started, detail, ok, started)
+
+    def record(self, name, seconds, detail=None, ok=True, started=None):
+        self.spans.append({
+            "phase": name,
+            "seconds": round(seconds, 4),
+            "detail": detail,
+            "ok": ok,
+            "start": round((started or time.time()) - self.start_time, 3),
+        })
+
+    def phases(self):
+        """阶段名 -> 耗时列表，按第一次出现的顺序"""
+        result = {}
+        for span in self.spans:
+            result.setdefault(span["phase"], []).append(span["seconds"])
+        return result
+
+    def table(self):
+        """[[阶段, 次数, 合计, p50, p95, 最大]]，用于 Markdown 报告"""
+        rows = []
+        for phase, values in self.phases().items():
+            rows.append([
+                phase, len(values), round(sum(values), 1),
+                round(percentile(values, 50), 2), round(percentile(values, 95), 2), round(max(values), 2),
+            ])
+        return rows
+
+    def export_json(self, path, extra=None):
+        """导出所有阶段明细和汇总"""
+        data = {
+            "start_time": self.start_time,
+            "elapsed": time.time() - self.start_time,
+            "phases": {
+                phase: {
+                    "count": len(values), "total": sum(values),
+                    "p50": percentile(values, 50), "p95": percentile(values, 95), "max": max(values),
+                }
+                for phase, values in self.phases().items()
+            },
+            "spans": self.spans,
+        }
+        data.update(extra or {})
+        self._write(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+    def export_prometheus(self, path, labels=None, gauges=None):
+        """
+        导出 Prometheus textfile collector 格式
+        :param labels: 附加到每个指标上的标签，例如 {"account": "xxx"}
+        :param gauges: 额外的数值指标，例如 {"browse_count": 10}
+        """
+        def label_str(extra=None):
+            items = dict(labels or {})
+            items.update(extra or {})
+            body = ",".join(f'{k}="{escape_label(v)}"' for k, v in items.items())
+            return "{" + body + "}" if body else ""
+
+        lines = [
+            "# HELP linuxdo_phase_duration_seconds Duration of each run phase.",
+            "# TYPE linuxdo_phase_duration_seconds summary",
+        ]
+        for phase, values in self.phases().items():
+            for quantile in (0.5, 0.95):
+                lines.append(
+                    f"linuxdo_phase_duration_seconds{label_str({'phase': phase, 'quantile': quantile})} "
+                    f"{percentile(values, quantile * 100):.4f}"
+                )
+            lines.append(f"linuxdo_phase_duration_seconds_sum{label_str({'phase': phase})} {sum(values):.4f}")
+            lines.append(f"linuxdo_phase_duration_seconds_count{label_str({'phase': phase})} {len(values)}")
+
+        gauges = dict(gauges or {})
+        gauges["run_elapsed_seconds"] = time.time() - self.start_time
+        gauges["last_run_timestamp_seconds"] = time.time()
+        for name, value in gauges.items():
+            lines.append(f"# TYPE linuxdo_{name} gauge")
+            lines.append(f"linuxdo_{name}{label_str()} {value}")
+        self._write(path, "\n".join(lines) + "\n")
+
+    def _write(self, path, content):
+        """先写临时文件再替换，textfile collector 不会读到写了一半的文件"""
+        try:
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # 临时文件名唯一，同时运行的多个进程不会互相覆盖
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                f.write(content)
+            os.chmod(f.name, 0o644)  # 临时文件默认只有本用户可读，textfile collector 通常以其他用户运行
+            os.replace(f.name, path)
+        except Exception as e:
+            logger.warning(f"导出运行指标失败: {str(e)}")
@@ -0,0 +1,76 @@
+"""
+标签页池：帖子之间复用少量固定的标签页，归还时清空 sessionStorage 并跳转到 about:blank，
+代替每个帖子都 new_page() / close()，减少创建标签页的耗时和长时间运行时的内存增长
+"""
+import time
+
+from loguru import logger
+
+RESET_JS = "() => { try { sessionStorage.clear(); } catch (e) {} }"
+
+
+class PagePool:
+    def __init__(self, context, size=2) -> None:
+        """
+        :param context: 浏览器 context
+        :param size: 保留的空闲标签页数量，0 表示不复用（每次新建、用完关闭）
+        """
+        self.context = context
+        self.size = max(0, size)
+        self.idle = []  # 空闲的标签页
+        self.created = 0  # 新建标签页次数
+        self.reused = 0  # 复用标签页次数
+        self.create_seconds = 0.0  # 新建标签页累计耗时
+
+    def acquire(self):
+        """取一个空闲标签页，没有时新建"""
+        while self.idle:
+            page = self.idle.pop()
+            if not page.is_closed():
+                self.reused += 1
+                return page
+        started = time.time()
+        page = self.context.new_page()
+        self.create_seconds += time.time() - started
+        self.created += 1
+        return page
+
+    def release(self, page):
+        """归还标签页：清空状态后放回池中，池已满或清理失败时关闭"""
+        if page.is_closed():
+            return
+        if len(self.idle) < self.size:
+            try:
+                page.evaluate(RESET_JS)
+                page.goto("about:blank")
+                self.idle.append(page)
+                return
+            except Exception as e:
+                logger.debug(f"重置标签页失败: {str(e)}")
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def reset_stats(self):
+        self.created = 0
+        self.reused = 0
+        self.create_seconds = 0.0
+
+    def rebind(self, context):
+        """context 重建后关闭旧的空闲标签页，之后从新 context 创建"""
+        self.close()
+        self.context = context
+
+    def close(self):
+        for page in self.idle:
+            try:
+                page.close()
+            except Exception:
+                pass
+        self.idle = []
+
+    def summary(self):
+        """(新建数, 复用数, 省下的创建耗时秒数)"""
+        average = self.create_seconds / self.created if self.created else 0
+        return self.created, self.reused, self.reused * average
@@ -0,0 +1,177 @@
+"""
+报告数据预取：登录后立即在后台打开 connect.linux.do、请求一言，浏览帖子期间这些请求同时进行，
+生成报告时直接取结果，不再在运行末尾排队等待
+
+一言带超时，成功的结果缓存到 DATA_DIR，请求失败或超时时使用上次的缓存
+"""
+import os
+import json
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+from loguru import logger
+
+from config import DATA_DIR
+from linuxdo import CONNECT_URL
+from probe import read_connect_table
+from retry import HttpStatusError
+
+YIYAN_URL = "https://v2.xxapi.cn/api/yiyan?type=hitokoto"
+YIYAN_TIMEOUT = 5  # 一言请求超时（秒）
+YIYAN_CACHE = os.path.join(DATA_DIR, "yiyan.json")
+YIYAN_FALLBACK = "API 访问失败，未能获取一言"
+
+# 页面自己记录的加载耗时（毫秒），用来计算后台完成了多少工作
+LOAD_DURATION_JS = """
+() => {
+    const [entry] = performance.getEntriesByType('navigation');
+    return entry ? entry.loadEventEnd || entry.duration : 0;
+}
+"""
+
+
+def load_cached_yiyan():
+    try:
+        with open(YIYAN_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f).get("text")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"读取一言缓存失败: {str(e)}")
+        return None
+
+
+def save_cached_yiyan(text):
+    try:
+        directory = os.path.dirname(YIYAN_CACHE) or "."
+        os.makedirs(directory, exist_ok=True)
+        # 多个账号进程共用这个文件，临时文件名要唯一
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump({"text": text, "time": time.time()}, f, ensure_ascii=False)
+        os.replace(f.name, YIYAN_CACHE)
+    except Exception as e:
+        logger.debug(f"保存一言缓存失败: {str(e)}")
+
+
+def fetch_yiyan(timeout=YIYAN_TIMEOUT):
+    """请求一言，失败时抛出异常"""
+    headers = {
+        'User-Agent': 'xiaoxiaoapi/1.0.0 (https://xxapi.cn)'
+    }
+    response = requests.get(YIYAN_URL, headers=headers, timeout=timeout)
+    if response.status_code != 200:
+        raise HttpStatusError(response.status_code, YIYAN_URL)
+    result = response.json()
+    if result.get("code") != 200:  # 修改这里：使用数字而不是字符串
+        raise ValueError("API 返回：" + str(response.text))
+    save_cached_yiyan(result.get("data"))
+    return result.get("data")
+
+
+def get_yiyan(timeout=YIYAN_TIMEOUT, retry=None):
+    """
+    获取一言，失败或超时时使用上次缓存的结果
+    :param retry: RetryEngine，按重试策略请求（第三方接口，不计入熔断）
+    """
+    try:
+        if retry:
+            text = retry.call("获取一言", fetch_yiyan, timeout, attempts=2, breaker=False)
+        else:
+            text = fetch_yiyan(timeout)
+        if text:
+            return text
+    except Exception as e:
+        logger.error(f"获取一言失败: {str(e)}")
+    return load_cached_yiyan() or YIYAN_FALLBACK
+
+
+class ReportPrefetch:
+    def __init__(self, retry=None, offline=False) -> None:
+        """
+        :param retry: RetryEngine，一言请求按重试策略执行
+        :param offline: 不请求一言，直接使用缓存（HAR 录制 / 回放）
+        """
+        self.retry = retry
+        self.offline = offline
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.yiyan_future = None
+        self.yiyan_seconds = 0  # 一言请求在后台的耗时
+        self.connect_page = None
+        self.connect_seconds = 0  # Connect 页面在后台的加载耗时
+        self.waited = 0  # 取结果时实际等待的时间
+
+    def start(self, context):
+        """
+        登录成功后调用：后台请求一言，并在新标签页打开 Connect 页面（收到响应即返回，页面继续加载）
+        """
+        self.close_page()
+        self.waited = 0
+        self.yiyan_future = self.executor.submit(self._fetch_yiyan)
+        try:
+            self.connect_page = context.new_page()
+            self.connect_page.goto(CONNECT_URL, wait_until="commit")
+        except Exception as e:
+            logger.warning(f"预取 Connect 数据失败: {str(e)}")
+            self.close_page()
+
+    def _fetch_yiyan(self):
+        if self.offline:
+            return load_cached_yiyan() or YIYAN_FALLBACK
+        started = time.time()
+        try:
+            return get_yiyan(retry=self.retry)
+        finally:
+            self.yiyan_seconds = time.time() - started
+
+    def connect_info(self):
+        """
+        取出预取的 Connect 数据，页面还没加载完时等待
+        :return: [[项目, 当前, 要求]]，没有预取时返回 None
+        """
+        if self.connect_page is None:
+            return None
+        started = time.time()
+        try:
+            self.connect_page.wait_for_load_state("load", timeout=30000)
+            self.connect_seconds = self.connect_page.evaluate(LOAD_DURATION_JS) / 1000
+            return read_connect_table(self.connect_page)
+        except Exception as e:
+            logger.warning(f"读取预取的 Connect 数据失败: {str(e)}")
+            return None
+        finally:
+            self.waited += time.time() - started
+            self.close_page()
+
+    def yiyan(self, timeout=YIYAN_TIMEOUT + 1):
+        """
+        取出预取的一言，没有预取时返回 None
+        :param timeout: 最多等待的秒数，超时使用缓存
+        """
+        if self.yiyan_future is None:
+            return None
+        started = time.time()
+        try:
+            return self.yiyan_future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return load_cached_yiyan() or YIYAN_FALLBACK
+        finally:
+            self.waited += time.time() - started
+            self.yiyan_future = None
+
+    def summary(self):
+        """(后台耗时, 收尾实际等待)，两者之差就是从运行末尾省掉的时间"""
+        return self.connect_seconds + self.yiyan_seconds, self.waited
+
+    def close_page(self):
+        if self.connect_page is not None:
+            try:
+                self.connect_page.close()
+            except Exception:
+                pass
+            self.connect_page = None
+
+    def close(self):
+        self.close_page()
+        self.executor.shutdown(wait=False)
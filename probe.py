@@ -0,0 +1,201 @@
+"""
+帖子页面探测：一次 page.evaluate 同时取出标题、分类、标签、点赞状态、点赞按钮、点赞数和楼层号，
+代替逐个选择器 count() / is_visible() / inner_text() 的多次 IPC 往返
+
+每组选择器上次命中的那个会被记录下来，下次优先尝试；兜底的通用选择器不提前
+"""
+import os
+import json
+import tempfile
+
+from loguru import logger
+
+from linuxdo import (
+    parse_count, TITLE_SELECTORS, ALREADY_LIKED_SELECTORS, LIKE_BUTTON_SELECTORS, COUNTER_SELECTORS, FLOOR_SELECTORS,
+    RATE_LIMIT_DIALOGS,
+)
+
+# 需要探测的选择器分组，title 组只要求有有效文本，其余组要求元素可见
+PROBE_GROUPS = {
+    "title": TITLE_SELECTORS,
+    "liked": ALREADY_LIKED_SELECTORS,
+    "like_button": LIKE_BUTTON_SELECTORS,
+    "counter": COUNTER_SELECTORS,
+    "floor": FLOOR_SELECTORS,
+}
+
+PROBE_JS = """
+(groups) => {
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const text = (el) => (el.innerText || el.textContent || '').trim();
+    const validTitle = (t) => !!t && !t.startsWith('此话题');
+
+    const match = (group, selectors) => {
+        for (const selector of selectors) {
+            let elements;
+            try {
+                elements = document.querySelectorAll(selector);
+            } catch (e) {
+                continue;
+            }
+            for (const el of elements) {
+                if (group === 'title') {
+                    if (validTitle(text(el))) return {selector, text: text(el)};
+                } else if (visible(el)) {
+                    if (group === 'counter' && !text(el)) continue;
+                    return {selector, text: text(el)};
+                }
+            }
+        }
+        return null;
+    };
+
+    const result = {};
+    for (const [group, selectors] of Object.entries(groups)) {
+        result[group] = match(group, selectors);
+    }
+
+    // 标题兜底：带 data-topic-id 的链接
+    if (!result.title) {
+        const link = document.querySelector('a[data-topic-id]');
+        if (link && text(link)) result.title = {selector: 'a[data-topic-id]', text: text(link)};
+    }
+
+    const category = document.querySelector('.title-wrapper .badge-category__name');
+    const topic = document.querySelector('#topic[data-topic-id]');
+    const firstPost = document.querySelector('article[data-post-id]');
+    result.category = category ? text(category) : null;
+    result.tags = Array.from(document.querySelectorAll('.discourse-tags .discourse-tag')).map(text);
+    result.topic_id = topic ? parseInt(topic.dataset.topicId) : null;
+    result.post_id = firstPost ? parseInt(firstPost.dataset.postId) : null;
+    return result;
+}
+"""
+
+# 兜底的通用选择器：范围宽，命中时不记录，否则之后每个页面都会先用它，可能匹配到错误的元素
+FALLBACK_SELECTORS = {
+    "title": {"#main-outlet h1", ".topic-title", "h1.topic-title"},
+    "counter": {".reactions-counter"},
+}
+
+# connect.linux.do 的信任等级表格，只取有至少三个单元格的行（跳过表头）
+CONNECT_TABLE_JS = """
+() => Array.from(document.querySelectorAll('table tr'))
+    .map((row) => Array.from(row.querySelectorAll('td')).map((cell) => (cell.textContent || '').trim()))
+    .filter((cells) => cells.length >= 3)
+    .map((cells) => cells.slice(0, 3))
+"""
+
+
+class SelectorCache:
+    """记录每组选择器上次命中的结果，持久化到 JSON 文件"""
+
+    def __init__(self, path, fallbacks=None) -> None:
+        """
+        :param fallbacks: group -> 兜底选择器集合，命中时不记录，排序时不提前
+        """
+        self.path = path
+        self.fallbacks = fallbacks or {}
+        self.hits = {}  # group -> 上次命中的选择器
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.hits = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"读取选择器缓存失败: {str(e)}")
+
+    def order(self, group, selectors):
+        """上次命中的选择器排在最前，其余保持原顺序"""
+        last = self.hits.get(group)
+        if last in selectors and last not in self.fallbacks.get(group, ()):
+            return [last] + [s for s in selectors if s != last]
+        return list(selectors)
+
+    def hit(self, group, selector):
+        if selector in self.fallbacks.get(group, ()):
+            return
+        if self.hits.get(group) != selector:
+            self.hits[group] = selector
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # 临时文件名唯一，多个进程同时保存时不会写到同一个临时文件
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump(self.hits, f, ensure_ascii=False, indent=2)
+            os.replace(f.name, self.path)
+            self.dirty = False
+        except Exception as e:
+            logger.debug(f"保存选择器缓存失败: {str(e)}")
+
+
+class PageProbe:
+    def __init__(self, cache_path) -> None:
+        self.cache = SelectorCache(cache_path, FALLBACK_SELECTORS)
+        self.calls = 0  # evaluate 调用次数
+
+    def args(self):
+        """按缓存排好序的选择器分组，作为 PROBE_JS 的参数"""
+        return {group: self.cache.order(group, selectors) for group, selectors in PROBE_GROUPS.items()}
+
+    def parse(self, raw):
+        """
+        整理 PROBE_JS 的返回值，并记录各组命中的选择器
+        :return: dict，字段见下方
+        """
+        self.calls += 1
+        raw = raw or {}
+        for group in PROBE_GROUPS:
+            if raw.get(group):
+                self.cache.hit(group, raw[group]["selector"])
+
+        def text_of(group):
+            return raw[group]["text"] if raw.get(group) else None
+
+        def selector_of(group):
+            return raw[group]["selector"] if raw.get(group) else None
+
+        counter_text = text_of("counter")
+        floor_text = text_of("floor")
+        return {
+            "title": text_of("title"),
+            "category": raw.get("category"),
+            "tags": raw.get("tags") or [],
+            "topic_id": raw.get("topic_id"),
+            "post_id": raw.get("post_id"),
+            "liked": raw.get("liked") is not None,
+            "liked_selector": selector_of("liked"),
+            "like_button": selector_of("like_button"),
+            "likes": parse_count(counter_text) if counter_text else 0,
+            "floor": floor_text.strip('#') if floor_text else None,
+        }
+
+    def probe(self, page):
+        """同步 page 上执行一次探测"""
+        return self.parse(page.evaluate(PROBE_JS, self.args()))
+
+
+def read_limit_dialog(page):
+    """
+    检查点赞后出现的限制弹窗
+    :return: (RATE_LIMIT_DIALOGS 中对应的项, 弹窗文本)，没有弹窗时返回 (None, None)
+    """
+    for dialog in RATE_LIMIT_DIALOGS:
+        limit_dialog = page.locator(dialog['selector']).first
+        if limit_dialog.is_visible():
+            return dialog, limit_dialog.inner_text()
+    return None, None
+
+
+def read_connect_table(page):
+    """
+    读取 connect.linux.do 的信任等级表格，一次 evaluate 取出所有行
+    :return: [[项目, 当前, 要求]]
+    """
+    return page.evaluate(CONNECT_TABLE_JS)
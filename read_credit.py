@@ -0,0 +1,124 @@
+"""
+阅读记录确认：监听页面发出的 POST /topics/timings 及其响应，记下服务器已经确认阅读的楼层，
+一个帖子的楼层全部确认后就结束停留，不再按固定的步数和时间滚动
+
+Discourse 默认每隔一段时间才提交一次阅读时间，停留期间定期调用页面的 screen-track 服务立即提交，
+离开帖子前再提交一次，已经累计的阅读时间不会因为直接跳转而丢失
+"""
+import re
+import time
+from urllib.parse import parse_qs
+
+from loguru import logger
+
+TIMINGS_PATH = "/topics/timings"
+TIMING_KEY = re.compile(r"timings\[(\d+)\]")
+
+# 让 Discourse 立即提交已累计的阅读时间，返回是否有待提交的数据；页面上没有 screen-track 服务时返回 false
+FLUSH_JS = """
+() => {
+    try {
+        const tracker = window.Discourse && Discourse.__container__.lookup('service:screen-track');
+        if (!tracker || !tracker.flush) return false;
+        const known = '_timings' in tracker || '_consolidatedTimings' in tracker;
+        const pending = Object.keys(tracker._timings || {}).length + (tracker._consolidatedTimings || []).length;
+        tracker.flush();
+        return !known || pending > 0;
+    } catch (e) {
+        return false;
+    }
+}
+"""
+
+
+class ReadCredit:
+    def __init__(self, flush_interval=5) -> None:
+        """
+        :param flush_interval: 停留期间每隔多少秒让页面提交一次阅读时间
+        """
+        self.flush_interval = flush_interval
+        self.credited = {}  # topic_id -> 已确认的楼层号
+        self.requests = 0  # 提交次数
+        self.failures = 0  # 提交失败次数
+        self.early_stops = 0  # 因全部确认而提前结束停留的帖子数
+        self.last_flush = 0.0
+
+    def install(self, context):
+        """在 context 上监听响应，之后打开的页面都会记录"""
+        context.on("response", self.on_response)
+
+    def reset_stats(self):
+        self.credited = {}
+        self.requests = 0
+        self.failures = 0
+        self.early_stops = 0
+
+    def on_response(self, response):
+        if TIMINGS_PATH not in response.url or response.request.method != "POST":
+            return
+        try:
+            form = parse_qs(response.request.post_data or "")
+            topic_id = int(form.get("topic_id", ["0"])[0])
+        except (ValueError, TypeError):
+            return
+        posts = {int(match.group(1)) for match in map(TIMING_KEY.fullmatch, form) if match}
+        self.requests += 1
+        if not response.ok:
+            self.failures += 1
+            logger.debug(f"阅读时间提交失败: HTTP {response.status}")
+            return
+        self.credited.setdefault(topic_id, set()).update(posts)
+        logger.debug(f"服务器确认阅读: 帖子 {topic_id} 楼层 {sorted(posts)}")
+
+    def count(self, topic_id):
+        return len(self.credited.get(topic_id, ()))
+
+    def highest(self, topic_id):
+        """已确认的最大楼层号"""
+        return max(self.credited.get(topic_id, ()), default=0)
+
+    def complete(self, topic_id, posts_count):
+        """帖子的所有楼层是否都已确认，楼层数未知时返回 False"""
+        return bool(topic_id and posts_count) and self.count(topic_id) >= posts_count
+
+    def flush(self, page):
+        """让页面立即提交阅读时间，:return: 是否提交了数据"""
+        self.last_flush = time.time()
+        try:
+            return page.evaluate(FLUSH_JS)
+        except Exception as e:
+            logger.debug(f"提交阅读时间失败: {str(e)}")
+            return False
+
+    def watcher(self, page, topic_id, posts_count):
+        """
+        停留期间定期调用的检查函数：按间隔提交阅读时间，全部楼层确认后返回 True
+        """
+        def check():
+            if self.complete(topic_id, posts_count):
+                return True
+            if time.time() - self.last_flush >= self.flush_interval:
+                self.flush(page)
+            return False
+
+        self.last_flush = time.time()
+        return check
+
+    def settle(self, page, topic_id, timeout=5):
+        """
+        离开帖子前提交最后一次阅读时间，并在 timeout 秒内等待服务器确认
+        :return: 本帖已确认的楼层数
+        """
+        before = self.requests
+        if self.flush(page) and topic_id:
+            deadline = time.time() + timeout
+            # page.wait_for_timeout 期间 Playwright 才会分发响应事件
+            while self.requests == before and time.time() < deadline:
+                page.wait_for_timeout(250)
+        return self.count(topic_id)
+
+    def summary(self, browse_seconds):
+        """(确认楼层数, 浏览总秒数, 每秒确认楼层数, 提前结束的帖子数)"""
+        total = sum(len(posts) for posts in self.credited.values())
+        rate = total / browse_seconds if browse_seconds else 0
+        return total, browse_seconds, rate, self.early_stops
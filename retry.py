@@ -0,0 +1,255 @@
+"""
+统一的重试策略：按错误类型决定是否重试，指数退避加随机抖动，站点连续失败时熔断，提前结束运行
+
+错误类型：
+- navigation：页面加载 / 网络超时、连接失败
+- http：HTTP 429 或 5xx
+- forbidden：HTTP 403（Cloudflare 验证或无权访问的帖子，不重试，只跳过当前操作；连续多次时复查会话后熔断）
+- selector：找不到页面元素（重试通常没有用，不重试）
+- auth：登录失效、401、会话复查失败（不重试，直接熔断）
+- other：其他错误
+"""
+import time
+import random
+import asyncio
+import functools
+import threading
+
+import requests
+from loguru import logger
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+NAVIGATION = "navigation"
+HTTP = "http"
+FORBIDDEN = "forbidden"
+SELECTOR = "selector"
+AUTH = "auth"
+OTHER = "other"
+
+RETRYABLE = {NAVIGATION, HTTP, OTHER}
+UNHEALTHY = {NAVIGATION, HTTP}  # 计入熔断的错误类型
+ERROR_NAMES = {
+    NAVIGATION: "加载超时",
+    HTTP: "HTTP 429/5xx",
+    FORBIDDEN: "HTTP 403",
+    SELECTOR: "找不到元素",
+    AUTH: "登录失效",
+    OTHER: "其他错误",
+}
+
+
+class HttpStatusError(Exception):
+    def __init__(self, status, url=None) -> None:
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+
+
+class SelectorMissing(Exception):
+    """页面上找不到需要的元素"""
+
+
+class AuthError(Exception):
+    """登录失效或账号被拒绝"""
+
+
+class SiteUnhealthy(Exception):
+    """熔断：站点连续失败或登录失效，不再继续"""
+
+
+def check_response(response, url=None):
+    """页面导航或接口返回 401/403/429/5xx 时抛出 HttpStatusError"""
+    if response is not None and (response.status in (401, 403, 429) or response.status >= 500):
+        raise HttpStatusError(response.status, url or response.url)
+    return response
+
+
+def classify(error):
+    """把异常归为上面的错误类型之一"""
+    if isinstance(error, AuthError):
+        return AUTH
+    if isinstance(error, HttpStatusError):
+        if error.status == 401:
+            return AUTH
+        if error.status == 403:
+            return FORBIDDEN
+        return HTTP if error.status == 429 or error.status >= 500 else OTHER
+    if isinstance(error, SelectorMissing):
+        return SELECTOR
+    message = str(error)
+    if isinstance(error, (PlaywrightTimeoutError, requests.Timeout)) or "Timeout" in message:
+        if "waiting for locator" in message or "waiting for selector" in message:
+            return SELECTOR
+        return NAVIGATION
+    if isinstance(error, requests.ConnectionError) or "NS_ERROR" in message or "net::ERR" in message:
+        return NAVIGATION
+    return OTHER
+
+
+class RetryEngine:
+    def __init__(self, base_delay=1.0, max_delay=30.0, breaker_threshold=6, forbidden_threshold=3, session_check=None) -> None:
+        """
+        :param base_delay: 第一次重试前的等待秒数，之后每次翻倍
+        :param max_delay: 单次等待的上限
+        :param breaker_threshold: 连续多少次加载超时 / HTTP 错误后熔断，0 表示不熔断
+        :param forbidden_threshold: 连续多少次 403 后熔断，0 表示不熔断
+        :param session_check: 返回会话是否仍然有效的函数，连续 403 时用来区分登录失效和站点拦截
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.forbidden_threshold = forbidden_threshold
+        self.session_check = session_check
+        self.errors = {}  # 错误类型 -> 次数
+        self.retries = 0  # 重试次数
+        self.retry_seconds = 0.0  # 重试前等待的累计时间
+        self.consecutive = 0  # 连续的站点错误次数
+        self.forbidden = 0  # 连续的 403 次数
+        self.open_reason = None  # 熔断原因，None 表示正常
+        self.lock = threading.Lock()  # 一言在后台线程中请求
+        self.sleep = None  # 创建线程中的等待函数（秒），例如 page.wait_for_timeout，等待期间浏览器事件照常分发
+        self.owner = threading.get_ident()
+
+    @property
+    def healthy(self):
+        return self.open_reason is None
+
+    def check(self):
+        if self.open_reason:
+            raise SiteUnhealthy(self.open_reason)
+
+    def delay(self, attempt, error_class):
+        """指数退避，在 [delay/2, delay] 之间随机；429/5xx 从更长的等待开始"""
+        base = self.base_delay * (4 if error_class == HTTP else 1)
+        delay = min(self.max_delay, base * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def record(self, error_class, breaker=True):
+        """记录一次失败，站点错误累计到阈值或登录失效时熔断"""
+        forbidden = 0
+        with self.lock:
+            self.errors[error_class] = self.errors.get(error_class, 0) + 1
+            if not breaker:
+                return
+            if error_class == AUTH:
+                self.open_reason = ERROR_NAMES[AUTH]
+            elif error_class == FORBIDDEN:
+                self.forbidden += 1
+                if self.forbidden_threshold and self.forbidden >= self.forbidden_threshold:
+                    forbidden = self.forbidden
+            elif error_class in UNHEALTHY:
+                self.consecutive += 1
+                if self.breaker_threshold and self.consecutive >= self.breaker_threshold:
+                    self.open_reason = f"连续 {self.consecutive} 次{ERROR_NAMES[error_class]}"
+        if forbidden:
+            # 会话复查在锁外进行，需要访问网络
+            if self.session_check is not None and not self.session_check():
+                self.open_reason = ERROR_NAMES[AUTH]
+            else:
+                self.open_reason = f"连续 {forbidden} 次{ERROR_NAMES[FORBIDDEN]}"
+        if self.open_reason:
+            logger.error(f"站点异常，停止运行：{self.open_reason}")
+
+    def success(self, breaker=True):
+        if breaker:
+            with self.lock:
+                self.consecutive = 0
+                self.forbidden = 0
+
+    def backoff(self, name, attempt, error_class):
+        """计算重试前的等待秒数并计入统计"""
+        seconds = self.delay(attempt, error_class)
+        logger.info(f"{name} 第 {attempt} 次失败（{ERROR_NAMES[error_class]}），{seconds:.1f} 秒后重试")
+        with self.lock:
+            self.retries += 1
+            self.retry_seconds += seconds
+        return seconds
+
+    def wait(self, name, attempt, error_class):
+        """重试前按策略等待并计入统计"""
+        seconds = self.backoff(name, attempt, error_class)
+        if self.sleep is not None and threading.get_ident() == self.owner:
+            self.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def failure(self, name, error, attempt, attempts, breaker=True):
+        """
+        记录 func 的一次失败
+        :return: 可以重试时返回 error 的类型，不再重试时返回 None
+        """
+        error_class = classify(error)
+        self.record(error_class, breaker)
+        if breaker:
+            self.check()
+        if error_class not in RETRYABLE or attempt == attempts:
+            logger.error(f"{name} 最终执行失败（{ERROR_NAMES[error_class]}）: {str(error)}")
+            return None
+        return error_class
+
+    def call(self, name, func, *args, attempts=3, breaker=True, **kwargs):
+        """
+        按策略执行 func，可重试的错误退避后重试
+        :param breaker: 是否计入熔断（第三方接口不计入）
+        :return: func 的返回值，最终失败时返回 None
+        """
+        for attempt in range(1, attempts + 1):
+            if breaker:
+                self.check()
+            try:
+                result = func(*args, **kwargs)
+                self.success(breaker)
+                return result
+            except SiteUnhealthy:
+                raise
+            except Exception as e:
+                error_class = self.failure(name, e, attempt, attempts, breaker)
+                if error_class is None:
+                    return None
+                self.wait(name, attempt, error_class)
+        return None
+
+    async def call_async(self, name, func, *args, attempts=3, breaker=True, **kwargs):
+        """call 的协程版本，func 是协程函数，退避期间用 asyncio.sleep 让出事件循环"""
+        for attempt in range(1, attempts + 1):
+            if breaker:
+                self.check()
+            try:
+                result = await func(*args, **kwargs)
+                self.success(breaker)
+                return result
+            except SiteUnhealthy:
+                raise
+            except Exception as e:
+                error_class = self.failure(name, e, attempt, attempts, breaker)
+                if error_class is None:
+                    return None
+                await asyncio.sleep(self.backoff(name, attempt, error_class))
+        return None
+
+    def summary(self):
+        """(重试次数, 重试等待秒数, {错误类型: 次数}, 熔断原因)"""
+        return self.retries, self.retry_seconds, dict(self.errors), self.open_reason
+
+
+def retrying(name, attempts=3):
+    """方法装饰器，用 self.retry（RetryEngine）执行"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return self.retry.call(name, func, self, *args, attempts=attempts, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def async_retrying(name, attempts=3):
+    """retrying 的协程版本，用 self.retry（RetryEngine）执行协程方法"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            return await self.retry.call_async(name, func, self, *args, attempts=attempts, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,158 @@
+"""
+浏览器 context 的请求拦截：按配置档位屏蔽用不到的资源（头像、表情、图片、字体、第三方脚本），
+并统计放行/屏蔽的请求数和流量
+
+档位：
+- full：不拦截，只统计
+- lean：屏蔽图片、音视频、字体
+- minimal：在 lean 的基础上屏蔽白名单以外的第三方域名
+
+lean 只拦截带图片、字体、音视频扩展名的 URL，脚本、样式和接口请求不经过 Python 的路由处理函数。
+注意只要 context 上注册了任何路由，浏览器就不再使用 HTTP 缓存（与匹配范围无关），
+full 档位且关闭 ASSET_CACHE 时不注册路由，浏览器缓存照常生效
+"""
+import os
+import re
+import json
+import tempfile
+from urllib.parse import urlparse
+
+from loguru import logger
+
+PROFILES = {
+    "full": {"resource_types": set(), "third_party": False},
+    "lean": {"resource_types": {"image", "media", "font"}, "third_party": False},
+    "minimal": {"resource_types": {"image", "media", "font"}, "third_party": True},
+}
+
+# lean 档位拦截的 URL：图片、字体、音视频扩展名（头像、表情、上传图片都带扩展名）
+MEDIA_URL = re.compile(r"\.(png|jpe?g|gif|webp|avif|svg|ico|bmp|woff2?|ttf|otf|eot|mp4|webm|mp3|ogg|wav)(\?|$)", re.I)
+
+# 第一方域名（含子域名），登录和回应接口都在这里
+FIRST_PARTY_DOMAINS = ["linux.do"]
+# 登录需要的第三方域名（Cloudflare 人机验证），任何档位都放行
+ALWAYS_ALLOW_HOSTS = ["challenges.cloudflare.com"]
+
+
+class ResourceBlocker:
+    def __init__(self, profile="lean", stats_path=None, allow_hosts=None) -> None:
+        """
+        :param profile: full / lean / minimal
+        :param stats_path: 保存各类资源平均大小的文件，用于估算被屏蔽的流量
+        :param allow_hosts: 额外放行的第三方域名
+        """
+        if profile not in PROFILES:
+            logger.warning(f"未知的拦截档位 {profile}，改用 lean")
+            profile = "lean"
+        self.profile = profile
+        self.rules = PROFILES[profile]
+        self.allow_hosts = ALWAYS_ALLOW_HOSTS + list(allow_hosts or [])
+        self.stats_path = stats_path
+
+        self.allowed = 0  # 放行请求数
+        self.allowed_bytes = 0  # 放行流量（按 content-length 统计）
+        self.blocked = {}  # 屏蔽原因（资源类型或 third_party） -> 屏蔽数
+        self.blocked_types = {}  # 被屏蔽请求的资源类型 -> 数量，用于估算流量
+        self.type_bytes = {}  # 资源类型 -> [累计字节, 次数]，放行时记录
+        self.load_times = []  # 帖子页面加载耗时
+        self.history = {}  # 历史各类资源平均大小
+        if stats_path:
+            try:
+                with open(stats_path, "r", encoding="utf-8") as f:
+                    self.history = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.debug(f"读取资源统计失败: {str(e)}")
+
+    def reset_stats(self):
+        """守护模式下每轮重新统计，历史平均大小保留"""
+        self.allowed = 0
+        self.allowed_bytes = 0
+        self.blocked = {}
+        self.blocked_types = {}
+        self.type_bytes = {}
+        self.load_times = []
+
+    def is_first_party(self, host):
+        return any(host == d or host.endswith("." + d) for d in FIRST_PARTY_DOMAINS)
+
+    def block_reason(self, request):
+        """返回屏蔽原因（资源类型），放行时返回 None"""
+        host = urlparse(request.url).hostname or ""
+        if host in self.allow_hosts:
+            return None
+        if request.resource_type in self.rules["resource_types"]:
+            return request.resource_type
+        if self.rules["third_party"] and not self.is_first_party(host):
+            return "third_party"
+        return None
+
+    def handle(self, route, request):
+        reason = self.block_reason(request)
+        if reason:
+            self.blocked[reason] = self.blocked.get(reason, 0) + 1
+            self.blocked_types[request.resource_type] = self.blocked_types.get(request.resource_type, 0) + 1
+            route.abort()
+        else:
+            route.fallback()
+
+    def on_response(self, response):
+        self.allowed += 1
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+        self.allowed_bytes += size
+        if size:
+            item = self.type_bytes.setdefault(response.request.resource_type, [0, 0])
+            item[0] += size
+            item[1] += 1
+
+    def install(self, context):
+        """在 context 上安装拦截，full 档位只统计不拦截"""
+        if self.rules["third_party"]:
+            context.route("**/*", self.handle)  # 第三方域名要检查所有请求
+        elif self.rules["resource_types"]:
+            context.route(MEDIA_URL, self.handle)
+        context.on("response", self.on_response)
+        logger.info(f"资源拦截档位：{self.profile}")
+
+    def record_load(self, seconds):
+        self.load_times.append(seconds)
+
+    def average_size(self, resource_type):
+        item = self.type_bytes.get(resource_type)
+        if item and item[1]:
+            return item[0] / item[1]
+        return self.history.get(resource_type, 0)
+
+    def blocked_count(self):
+        return sum(self.blocked.values())
+
+    def estimated_blocked_bytes(self):
+        """按各类资源的平均大小估算被屏蔽的流量"""
+        return sum(count * self.average_size(t) for t, count in self.blocked_types.items())
+
+    def save(self):
+        """把本次放行资源的平均大小合并进历史记录"""
+        if not self.stats_path or not self.type_bytes:
+            return
+        for resource_type, (total, count) in self.type_bytes.items():
+            self.history[resource_type] = total / count
+        try:
+            directory = os.path.dirname(self.stats_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump(self.history, f, indent=2)
+            os.replace(f.name, self.stats_path)
+        except Exception as e:
+            logger.debug(f"保存资源统计失败: {str(e)}")
+
+    def summary(self):
+        """(档位, 放行数, 放行字节, 屏蔽数, 估算屏蔽字节, 平均页面加载秒数)"""
+        average_load = sum(self.load_times) / len(self.load_times) if self.load_times else 0
+        return (
+            self.profile, self.allowed, self.allowed_bytes,
+            self.blocked_count(), self.estimated_blocked_bytes(), average_load,
+        )
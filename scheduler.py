@@ -0,0 +1,107 @@
+"""
+帖子调度：从多个列表（/latest、/new、/unread、/top）及其后续页面收集候选帖子，去重后按
+“每秒能带来多少有效阅读”排序，click_topic 按顺序取帖子，直到达到目标帖子数或阅读时间
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from topic_index import PRIORITY_PARTIAL, PRIORITY_DONE
+
+MAX_STEPS = 10  # browse_post 最多滚动次数
+POSTS_PER_STEP = 2  # 每次滚动大约能看到的楼层数
+LOAD_SECONDS = 3  # 打开一个帖子的固定开销
+NEW_TOPIC_BONUS = 5  # 没进过的帖子额外价值（“浏览的话题”计数）
+
+
+class TopicScheduler:
+    def __init__(self, api, index=None, dwell_seconds=3.0) -> None:
+        """
+        :param api: DiscourseApi
+        :param index: TopicIndex，用于识别已读帖子
+        :param dwell_seconds: 每次滚动后的平均停留时间
+        """
+        self.api = api
+        self.index = index
+        self.dwell_seconds = dwell_seconds
+
+    def gather(self, feeds, pages=1):
+        """
+        并发获取多个列表的前几页，按帖子 id 去重
+        :return: [topic]（列表接口返回的帖子对象）
+        """
+        jobs = [(feed, page) for feed in feeds for page in range(pages)]
+        with ThreadPoolExecutor(max_workers=self.api.concurrency) as executor:
+            results = list(executor.map(lambda job: self.api.latest_topics(*job), jobs))
+
+        candidates = {}
+        for (feed, page), topics in zip(jobs, results):
+            if topics is None:
+                logger.debug(f"获取列表 {feed} 第 {page} 页失败")
+                continue
+            for topic in topics:
+                candidates.setdefault(topic["id"], topic)
+        logger.info(f"从 {len(jobs)} 个列表页收集到 {len(candidates)} 个候选帖子")
+        return list(candidates.values())
+
+    def unread_posts(self, topic):
+        """还没读过的楼层数"""
+        highest = topic.get("highest_post_number") or topic.get("posts_count") or 1
+        last_read = topic.get("last_read_post_number") or 0
+        return max(0, highest - last_read)
+
+    def estimate(self, topic):
+        """
+        估算读这个帖子的 (价值, 耗时秒数)
+        价值 = 本次能读到的新楼层数 + 没进过的帖子额外价值
+        """
+        unread = self.unread_posts(topic)
+        steps = min(MAX_STEPS, max(1, -(-unread // POSTS_PER_STEP)))
+        seconds = LOAD_SECONDS + steps * self.dwell_seconds
+        value = min(unread, steps * POSTS_PER_STEP)
+        if not topic.get("last_read_post_number"):
+            value += NEW_TOPIC_BONUS
+
+        if self.index:
+            priority = self.index.priority(topic["id"], topic.get("posts_count"))
+            if priority == PRIORITY_PARTIAL:
+                value *= 0.5
+            elif priority == PRIORITY_DONE:
+                value = 0
+        return value, seconds
+
+    def rank(self, topics):
+        """
+        按每秒价值从高到低排序，跳过已关闭/归档、没有价值的帖子
+        :return: [(topic, 价值, 预计秒数)]
+        """
+        ranked = []
+        for topic in topics:
+            if topic.get("closed") or topic.get("archived"):
+                continue
+            value, seconds = self.estimate(topic)
+            if value <= 0:
+                continue
+            ranked.append((topic, value, seconds))
+        ranked.sort(key=lambda item: item[1] / item[2], reverse=True)
+        return ranked
+
+    def plan(self, feeds, pages=1, target_topics=0, target_seconds=0):
+        """
+        生成本次要读的帖子队列
+        :param target_topics: 帖子数上限，0 表示不限
+        :param target_seconds: 预计阅读时间上限，0 表示不限
+        :return: [topic]
+        """
+        ranked = self.rank(self.gather(feeds, pages))
+        queue = []
+        planned_seconds = 0
+        for topic, value, seconds in ranked:
+            if target_topics and len(queue) >= target_topics:
+                break
+            if target_seconds and queue and planned_seconds + seconds > target_seconds:
+                break
+            queue.append(topic)
+            planned_seconds += seconds
+        logger.info(f"计划阅读 {len(queue)} 个帖子，预计 {planned_seconds:.0f} 秒")
+        return queue
@@ -0,0 +1,193 @@
+"""
+页面内滚动：把 browse_post 的随机滚动和停留整个交给页面里的一段脚本执行，
+进度（滚动距离、已加载楼层数、URL / 楼层变化、到达底部）通过 expose_binding 回报，
+Python 这边只等待完成或超时，不再每一步都 evaluate 两次、读 URL、sleep
+"""
+import time
+import itertools
+
+from loguru import logger
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from linuxdo import post_number_from_url
+
+BINDING_NAME = "__linuxdoScroll"
+
+# 启动滚动后立即返回，滚动在页面里异步进行
+SCROLL_JS = """
+({token, steps, minDistance, maxDistance, dwellMin, dwellMax, exitChance}) => {
+    const report = (event) => {
+        try {
+            const pending = window.__linuxdoScroll(Object.assign({token}, event));
+            if (pending && pending.catch) pending.catch(() => {});
+        } catch (e) {}
+    };
+    const state = window.__linuxdoScrollState = {token, stop: false, result: null};
+    const random = (min, max) => min + Math.random() * (max - min);
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const posts = () => document.querySelectorAll('article[data-post-id]').length;
+    const finish = (reason, step) => {
+        state.result = {reason, steps: step, url: location.href, posts: posts()};
+        report(Object.assign({type: 'done'}, state.result));
+    };
+
+    (async () => {
+        let prevUrl = null;
+        for (let step = 1; step <= steps; step++) {
+            if (state.stop) return finish('deadline', step - 1);
+            const distance = Math.round(random(minDistance, maxDistance));
+            window.scrollBy(0, distance);
+            const url = location.href;
+            report({type: 'step', step, distance, url, posts: posts()});
+            if (Math.random() < exitChance) return finish('random', step);
+            const atBottom = window.scrollY + window.innerHeight >= document.body.scrollHeight;
+            if (url !== prevUrl) {
+                prevUrl = url;
+            } else if (atBottom) {
+                return finish('bottom', step);
+            }
+            await sleep(random(dwellMin, dwellMax) * 1000);
+        }
+        finish('steps', steps);
+    })();
+}
+"""
+
+DONE_JS = """
+(token) => {
+    const state = window.__linuxdoScrollState;
+    return state && state.token === token && state.result;
+}
+"""
+
+STOP_JS = """
+(token) => {
+    const state = window.__linuxdoScrollState;
+    if (state && state.token === token) state.stop = true;
+}
+"""
+
+# 结束原因对应的日志
+REASON_MESSAGES = {
+    "bottom": "已到达页面底部，退出浏览",
+    "random": "随机退出浏览",
+    "steps": "已滚动到最大次数",
+    "deadline": "滚动超时，停止浏览",
+    "credited": "服务器已确认全部楼层的阅读，结束停留",
+}
+
+
+class ScrollDriver:
+    def __init__(self, steps=10, dwell_min=2, dwell_max=4, exit_chance=0.03,
+                 min_distance=550, max_distance=650) -> None:
+        """
+        :param steps: 最多滚动次数
+        :param dwell_min: 每次滚动后最短停留秒数
+        :param dwell_max: 每次滚动后最长停留秒数
+        :param exit_chance: 每次滚动后随机退出的概率
+        """
+        self.options = {
+            "steps": steps, "minDistance": min_distance, "maxDistance": max_distance,
+            "dwellMin": dwell_min, "dwellMax": dwell_max, "exitChance": exit_chance,
+        }
+        self.progress = {}  # token -> 进度，回报事件写入
+        self.tokens = itertools.count(1)
+
+    def set_dwell(self, dwell_min, dwell_max):
+        """调整之后每次滚动的停留时间（时间预算不足时缩短）"""
+        self.options["dwellMin"] = dwell_min
+        self.options["dwellMax"] = dwell_max
+
+    def install(self, context):
+        """在 context 上注册回报进度的函数，之后打开的页面都可以使用"""
+        context.expose_binding(BINDING_NAME, self.on_event)
+
+    async def install_async(self, context):
+        await context.expose_binding(BINDING_NAME, self.on_event)
+
+    def on_event(self, source, event):
+        """页面回报的进度，同步和异步引擎共用"""
+        progress = self.progress.get(event.get("token"))
+        if progress is None:
+            return
+        if event["type"] == "step":
+            progress["steps"] = event["step"]
+            progress["distance"] += event["distance"]
+            progress["posts"] = max(progress["posts"], event["posts"])
+            post_number = post_number_from_url(event["url"])
+            if post_number != progress["post_number"]:
+                progress["post_number"] = post_number
+                progress["post_changes"] += 1
+            progress["url"] = event["url"]
+            logger.debug(f"向下滚动 {event['distance']} 像素 | 已加载 {event['posts']} 层 | 当前楼层 {post_number}")
+        elif event["type"] == "done":
+            progress.update(reason=event["reason"], steps=event["steps"], url=event["url"])
+            progress["posts"] = max(progress["posts"], event["posts"])
+
+    def start_args(self):
+        token = f"scroll-{next(self.tokens)}"
+        self.progress[token] = {
+            "reason": None, "steps": 0, "distance": 0, "posts": 0,
+            "url": None, "post_number": None, "post_changes": 0,
+        }
+        return dict(self.options, token=token)
+
+    def deadline_ms(self):
+        """滚动的超时时间：全部步数按最长停留计算，再留 15 秒余量"""
+        return int((self.options["steps"] * self.options["dwellMax"] + 15) * 1000)
+
+    def finish(self, token, result, url, reason=None):
+        progress = self.progress.pop(token)
+        if result:
+            progress.update(reason=result["reason"], steps=result["steps"], url=result["url"])
+            progress["posts"] = max(progress["posts"], result["posts"])
+        progress["reason"] = reason or progress["reason"] or "deadline"
+        progress["url"] = progress["url"] or url
+        progress["post_number"] = post_number_from_url(progress["url"])
+        message = REASON_MESSAGES.get(progress["reason"])
+        if progress["reason"] in ("bottom", "random", "credited"):
+            logger.success(message)
+        elif message:
+            logger.info(message)
+        return progress
+
+    def run(self, page, until=None):
+        """
+        同步 page 上执行一次滚动，等待完成或超时
+        :param until: 每秒调用一次的检查函数，返回 True 时提前结束（结束原因为 credited）
+        :return: dict，reason / steps / distance / posts / url / post_number / post_changes
+        """
+        args = self.start_args()
+        token = args["token"]
+        result = None
+        reason = None
+        page.evaluate(SCROLL_JS, args)
+        deadline = time.time() + self.deadline_ms() / 1000
+        while True:
+            # 有检查函数时分段等待，两段之间检查是否可以提前结束
+            timeout = min(1000, self.deadline_ms()) if until else self.deadline_ms()
+            try:
+                handle = page.wait_for_function(DONE_JS, arg=token, timeout=timeout, polling=500)
+                result = handle.json_value()
+                break
+            except PlaywrightTimeoutError:
+                if until and until():
+                    reason = "credited"
+                elif until and time.time() < deadline:
+                    continue
+                page.evaluate(STOP_JS, token)
+                break
+        return self.finish(token, result, page.url, reason)
+
+    async def run_async(self, page):
+        """异步 page 上执行一次滚动，返回值同 run"""
+        args = self.start_args()
+        token = args["token"]
+        result = None
+        await page.evaluate(SCROLL_JS, args)
+        try:
+            handle = await page.wait_for_function(DONE_JS, arg=token, timeout=self.deadline_ms(), polling=500)
+            result = await handle.json_value()
+        except PlaywrightTimeoutError:
+            await page.evaluate(STOP_JS, token)
+        return self.finish(token, result, page.url)
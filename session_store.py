@@ -0,0 +1,66 @@
+import os
+import re
+import json
+import tempfile
+
+from loguru import logger
+
+
+def account_key(username):
+    """把账号转换成可以用作文件名的字符串"""
+    return re.sub(r"[^\w.-]", "_", username or "default")
+
+
+class SessionStore:
+    """
+    登录会话持久化：保存浏览器上下文的 storage_state（cookies + localStorage），
+    下次运行时直接复用，避免每次都走完整的登录表单流程
+    """
+
+    def __init__(self, directory, username=None) -> None:
+        self.directory = directory
+        # 按账号区分文件，避免多账号互相覆盖
+        self.path = os.path.join(directory, f"{account_key(username)}.json")
+
+    def load(self):
+        """
+        读取已保存的会话
+        :return: storage_state 字典，不存在或损坏时返回 None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if not state.get("cookies"):
+                return None
+            return state
+        except Exception as e:
+            logger.warning(f"读取会话文件失败，将重新登录: {str(e)}")
+            return None
+
+    def save(self, context):
+        """保存当前（同步）上下文的会话"""
+        try:
+            self.save_state(context.storage_state())
+        except Exception as e:
+            logger.warning(f"保存会话失败: {str(e)}")
+
+    def save_state(self, state):
+        """写入 storage_state，先写临时文件再替换，避免中途被杀导致文件损坏"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 临时文件名唯一，同一账号同时运行的进程不会互相覆盖；权限只允许本用户读取
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False) as f:
+                json.dump(state, f)
+            os.replace(f.name, self.path)
+            logger.info(f"会话已保存: {self.path}")
+        except Exception as e:
+            logger.warning(f"保存会话失败: {str(e)}")
+
+    def clear(self):
+        """删除已失效的会话文件"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
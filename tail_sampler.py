@@ -0,0 +1,279 @@
+"""
+尾部采样：每个帖子、登录、点赞都在一个滚动窗口内记录 Playwright trace（context.tracing 的 chunk），
+可选地同时用采样分析器记录 Python 调用栈；窗口耗时超过阈值或出错时保存 trace zip 和调用栈，否则直接丢弃
+
+窗口可以嵌套（帖子里的点赞），trace chunk 和采样器由最外层窗口持有，内层窗口触发时保存整个外层窗口。
+trace 用 playwright show-trace <文件> 查看；调用栈为 collapsed 格式，可以交给 flamegraph.pl 或 speedscope 生成火焰图
+
+trace 中不记录 DOM 快照，登录窗口不记录 trace（请求体里有明文密码）；保存时删除网络请求的请求体、响应体和
+cookies、CSRF token 等请求头，只保留 URL、状态码、耗时和截图
+"""
+import os
+import re
+import sys
+import json
+import time
+import zipfile
+import functools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from loguru import logger
+
+UNTRACED_PHASES = {"login"}  # 不记录 trace 的阶段
+SENSITIVE_HEADERS = {"cookie", "set-cookie", "authorization", "x-csrf-token", "discourse-logged-in"}
+
+
+def scrub_trace(path):
+    """删除 trace zip 中网络请求的请求体、响应体、cookies 和敏感请求头"""
+    dropped = set()
+
+    def scrub_message(message):
+        if message is None:
+            return
+        message["headers"] = [
+            header for header in message.get("headers") or []
+            if header.get("name", "").lower() not in SENSITIVE_HEADERS
+        ]
+        message["cookies"] = []
+        for key in ("postData", "content"):
+            body = message.get(key)
+            if isinstance(body, dict):
+                for ref in ("_sha1", "_file"):
+                    if body.get(ref):
+                        dropped.add("resources/" + body[ref])
+                message[key] = {"size": body.get("size", -1), "mimeType": body.get("mimeType", "")}
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(path) as source:
+        entries = {}
+        for name in source.namelist():
+            data = source.read(name)
+            if name.endswith(".network"):
+                lines = []
+                for line in data.decode("utf-8").splitlines():
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    snapshot = event.get("snapshot") or {}
+                    scrub_message(snapshot.get("request"))
+                    scrub_message(snapshot.get("response"))
+                    lines.append(json.dumps(event, ensure_ascii=False))
+                data = "\n".join(lines).encode("utf-8")
+            entries[name] = data
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as target:
+        for name, data in entries.items():
+            if name not in dropped:
+                target.writestr(name, data)
+    os.replace(tmp_path, path)
+
+
+class StackSampler:
+    """采样分析器：后台线程每隔 interval 秒读取一次目标线程的调用栈并累计"""
+
+    def __init__(self, interval=0.01) -> None:
+        self.interval = interval
+        self.stacks = Counter()  # "外层;...;内层" -> 采样次数
+        self.stopping = threading.Event()
+        self.thread = None
+        self.thread_id = None
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        return self.stacks
+
+    @staticmethod
+    def write(stacks, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class TailSampler:
+    def __init__(self, out_dir, thresholds, trace=True, profile=False, max_artifacts=5) -> None:
+        """
+        :param out_dir: 保留的 trace 和调用栈的保存目录
+        :param thresholds: 阶段 -> 耗时阈值（秒），超过时保留，没有阈值的阶段只在出错时保留
+        :param trace: 是否记录 Playwright trace
+        :param profile: 是否同时采样 Python 调用栈
+        :param max_artifacts: 每次运行最多保留的窗口数
+        """
+        self.out_dir = out_dir
+        self.thresholds = thresholds
+        self.trace = trace
+        self.profile = profile
+        self.max_artifacts = max_artifacts
+        self.context = None
+        self.tracing = False  # 当前 context 是否已开始 tracing
+        self.chunk = False  # 当前窗口是否在记录 trace chunk
+        self.active = []  # 正在进行的窗口，最外层在前
+        self.sampler = None
+        self.windows = 0  # 结束的最外层窗口数
+        self.artifacts = []  # 保留的窗口
+
+    @property
+    def enabled(self):
+        return self.trace or self.profile
+
+    def install(self, context):
+        """新 context 上开始 tracing，之后每个窗口是一个 chunk"""
+        self.context = context
+        self.tracing = False
+        if not self.trace:
+            return
+        try:
+            context.tracing.start(screenshots=True, snapshots=False)
+            self.tracing = True
+        except Exception as e:
+            logger.warning(f"开启 Playwright tracing 失败: {str(e)}")
+
+    def reset_stats(self):
+        self.windows = 0
+        self.artifacts = []
+
+    @contextmanager
+    def window(self, phase, url=None):
+        """
+        记录一个阶段，结束时按耗时和是否出错决定保留还是丢弃
+        :param url: 触发时写入报告的 URL
+        """
+        window = {"phase": phase, "url": url, "started": time.time(), "error": None, "triggers": []}
+        outer = not self.active
+        if outer and self.enabled:
+            self.begin(phase)
+        self.active.append(window)
+        try:
+            yield window
+        except Exception as e:
+            window["error"] = window["error"] or str(e).splitlines()[0]
+            raise
+        finally:
+            self.active.pop()
+            seconds = time.time() - window["started"]
+            reason = self.check(window, seconds)
+            if reason:
+                # 内层窗口触发时由最外层窗口保存
+                (self.active[0] if self.active else window)["triggers"].append(
+                    {"phase": phase, "url": url, "seconds": seconds, "reason": reason}
+                )
+            if outer and self.enabled:
+                self.end(window)
+
+    def fail(self, message):
+        """把当前窗口标记为出错（错误已在内部处理、没有抛出时调用）"""
+        if self.active and not self.active[-1]["error"]:
+            self.active[-1]["error"] = message
+
+    def check(self, window, seconds):
+        """:return: 触发保留的原因，不触发时返回 None"""
+        if window["error"]:
+            return f"出错：{window['error']}"
+        threshold = self.thresholds.get(window["phase"])
+        if threshold and seconds > threshold:
+            return f"耗时 {seconds:.1f} 秒，超过 {threshold:g} 秒"
+        return None
+
+    def begin(self, phase):
+        if self.tracing and phase not in UNTRACED_PHASES:
+            try:
+                self.context.tracing.start_chunk(title=phase)
+                self.chunk = True
+            except Exception as e:
+                logger.debug(f"开始 trace chunk 失败: {str(e)}")
+        if self.profile:
+            self.sampler = StackSampler()
+            self.sampler.start()
+
+    def end(self, window):
+        self.windows += 1
+        stacks = self.sampler.stop() if self.sampler else None
+        self.sampler = None
+        keep = window["triggers"] and len(self.artifacts) < self.max_artifacts
+        if not keep:
+            self.stop_chunk(None)
+            return
+
+        trigger = window["triggers"][0]
+        slug = re.sub(r"[^0-9A-Za-z]+", "_", trigger["url"] or "")[-40:].strip("_")
+        base = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_{window['phase']}_{slug}")
+        os.makedirs(self.out_dir, exist_ok=True)
+        trace_path = base + ".zip" if self.stop_chunk(base + ".zip") else None
+        profile_path = None
+        if stacks:
+            profile_path = base + ".folded"
+            StackSampler.write(stacks, profile_path)
+        self.artifacts.append(dict(trigger, window=window["phase"], trace=trace_path, profile=profile_path))
+        logger.warning(f"{trigger['phase']} {trigger['reason']}，已保存 trace: {trace_path} | 调用栈: {profile_path}")
+
+    def stop_chunk(self, path):
+        """结束当前 chunk，path 为 None 时丢弃，:return: 是否写入了文件"""
+        if not self.chunk:
+            return False
+        self.chunk = False
+        try:
+            if path:
+                self.context.tracing.stop_chunk(path=path)
+            else:
+                self.context.tracing.stop_chunk()
+                return False
+        except Exception as e:
+            logger.debug(f"结束 trace chunk 失败: {str(e)}")
+            return False
+        try:
+            scrub_trace(path)
+            return True
+        except Exception as e:
+            # 清理失败时不保留可能含有 cookies 的 trace
+            logger.warning(f"清理 trace 失败，已删除: {str(e)}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+
+    def close(self):
+        """关闭 context 前停止 tracing，不保存"""
+        if self.tracing:
+            try:
+                self.context.tracing.stop()
+            except Exception:
+                pass
+            self.tracing = False
+            self.chunk = False
+
+    def summary(self):
+        """(窗口数, 保留的窗口列表)"""
+        return self.windows, list(self.artifacts)
+
+
+def tail_sampled(phase):
+    """方法装饰器，用 self.tail（TailSampler）记录一个窗口；第一个参数是 page 时记录它的 URL"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            url = getattr(args[0], "url", None) if args else None
+            with self.tail.window(phase, url):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def bare_browser():
+    """不启动浏览器的 LinuxDoBrowser，只带传入的属性"""
+    from main import LinuxDoBrowser
+
+    def factory(**attrs):
+        browser = LinuxDoBrowser.__new__(LinuxDoBrowser)
+        for name, value in attrs.items():
+            setattr(browser, name, value)
+        return browser
+
+    return factory
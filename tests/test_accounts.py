@@ -0,0 +1,17 @@
+from loguru import logger
+
+from main import load_accounts
+
+
+def test_malformed_line_is_logged_without_content(tmp_path):
+    path = tmp_path / "accounts.txt"
+    path.write_text("# 注释\nalice:pw1\nhunter2\n\nbob : pw2\n", encoding="utf-8")
+    messages = []
+    handler = logger.add(messages.append, level="WARNING")
+    try:
+        accounts = load_accounts(str(path))
+    finally:
+        logger.remove(handler)
+    assert accounts == [("alice", "pw1"), ("bob", "pw2")]
+    assert len(messages) == 1
+    assert "第 3 行" in messages[0] and "hunter2" not in messages[0]
@@ -0,0 +1,98 @@
+import pytest
+
+from asset_cache import MIN_MAX_AGE, AssetCache, max_age
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type="script", method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class FakeResponse:
+    def __init__(self, body, cache_control, status=200):
+        self.status = status
+        self.headers = {"cache-control": cache_control, "content-type": "application/javascript", "set-cookie": "_t=1"}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class FakeRoute:
+    def __init__(self, response=None):
+        self.response = response
+        self.fulfilled = None
+        self.fell_back = False
+
+    def fetch(self):
+        return self.response
+
+    def fulfill(self, response=None, status=None, headers=None, body=None):
+        self.fulfilled = {"status": status, "headers": headers, "body": body}
+
+    def fallback(self):
+        self.fell_back = True
+
+
+def load(cache, url, body=b"x", cache_control="public, max-age=86400", resource_type="script"):
+    route = FakeRoute(FakeResponse(body, cache_control))
+    cache.handle(route, FakeRequest(url, resource_type))
+    return route
+
+
+@pytest.mark.parametrize("header, seconds", [
+    ("public, max-age=31536000, immutable", 31536000),
+    ("max-age=60, s-maxage=600", 60),
+    ("private, max-age=3600", 0),
+    ("no-cache", 0),
+    ("", 0),
+    (None, 0),
+])
+def test_max_age(header, seconds):
+    assert max_age(header) == seconds
+
+
+def test_miss_then_hit_from_disk(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    load(cache, "https://linux.do/assets/app.js", b"console.log(1)")
+    assert (cache.misses, cache.stored) == (1, 1)
+
+    # 新的运行（新的 AssetCache）直接用磁盘上的副本应答，不下载
+    cache = AssetCache(str(tmp_path))
+    assert cache.warm
+    route = FakeRoute()
+    cache.handle(route, FakeRequest("https://linux.do/assets/app.js"))
+    assert route.fulfilled["body"] == b"console.log(1)"
+    assert "set-cookie" not in route.fulfilled["headers"]
+    assert (cache.hits, cache.hit_bytes) == (1, 14)
+    assert not any(name.endswith(".tmp") for name in (p.name for p in (tmp_path / "entries").iterdir()))
+
+
+def test_short_lived_and_non_static_responses_are_not_stored(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    load(cache, "https://linux.do/assets/short.js", cache_control=f"max-age={MIN_MAX_AGE - 1}")
+    route = load(cache, "https://linux.do/latest.json", resource_type="fetch")
+    assert route.fell_back
+    assert cache.stored == 0
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("asset_cache.time.time", lambda: now[0])
+    cache = AssetCache(str(tmp_path), limit_mb=1)
+    chunk = b"x" * (400 * 1024)
+    for name in ("a", "b"):
+        load(cache, f"https://linux.do/assets/{name}.js", chunk)
+        now[0] += 1
+    # 读一次 a，b 成为最久没用的
+    cache.handle(FakeRoute(), FakeRequest("https://linux.do/assets/a.js"))
+    now[0] += 1
+    load(cache, "https://linux.do/assets/c.js", chunk)
+    assert cache.evicted == 1
+    assert cache.size() <= cache.limit * 0.9
+
+    route = FakeRoute(FakeResponse(chunk, "max-age=86400"))
+    cache.handle(route, FakeRequest("https://linux.do/assets/b.js"))
+    assert cache.misses == 4  # b 被淘汰，重新下载
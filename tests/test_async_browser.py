@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from async_browser import AsyncLinuxDoBrowser
+
+
+def test_like_is_skipped_while_rate_limited():
+    async def scenario():
+        browser = AsyncLinuxDoBrowser("user", "password")
+        browser.like_lock = asyncio.Lock()
+        browser.like_blocked_until = time.time() + 60
+        # 频率限制期间直接返回，不访问页面，也不占着点赞锁
+        assert await browser.click_like(page=None, probe=None) is True
+        assert not browser.like_lock.locked()
+
+    asyncio.run(scenario())
+
+
+def test_connect_task_is_cancelled_when_browsing_fails(monkeypatch):
+    monkeypatch.setattr("async_browser.get_yiyan", lambda: "一言")
+    state = {}
+
+    async def scenario():
+        browser = AsyncLinuxDoBrowser("user", "password")
+
+        async def noop():
+            return None
+
+        async def ensure_login():
+            return True
+
+        async def get_connect_info():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        async def click_topic():
+            await asyncio.sleep(0)
+            raise RuntimeError("浏览出错")
+
+        browser.start = noop
+        browser.close = noop
+        browser.ensure_login = ensure_login
+        browser.get_connect_info = get_connect_info
+        browser.click_topic = click_topic
+        with pytest.raises(RuntimeError):
+            await browser.run()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert state == {"cancelled": True}
+
+
+def test_locks_are_created_in_the_running_loop(monkeypatch):
+    # main.py 在 asyncio.run() 之前创建对象，锁和信号量要绑定 run() 启动的事件循环
+    browser = AsyncLinuxDoBrowser("user", "password", concurrency=1)
+    assert browser.like_lock is None and browser.tab_semaphore is None
+
+    class Stop(Exception):
+        pass
+
+    async def launch(pw):
+        raise Stop()
+
+    class FakePlaywright:
+        async def start(self):
+            return None
+
+    monkeypatch.setattr("async_browser.async_playwright", FakePlaywright)
+    monkeypatch.setattr("async_browser.launch_browser", launch)
+
+    async def scenario():
+        with pytest.raises(Stop):
+            await browser.start()
+
+        async def hold():
+            async with browser.tab_semaphore:
+                await asyncio.sleep(0)
+
+        # 信号量已满时第二个任务需要等待，绑定到其他循环时这里会抛出 RuntimeError
+        await asyncio.gather(hold(), hold())
+
+    asyncio.run(scenario())
+
+
+def test_topic_page_is_closed_when_loading_fails(monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr("asyncio.sleep", lambda seconds: sleep(0))
+    pages = []
+
+    class FakePage:
+        closed = False
+
+        async def goto(self, url):
+            raise TimeoutError("Timeout 30000ms exceeded")
+
+        async def close(self):
+            self.closed = True
+
+    class FakeContext:
+        async def new_page(self):
+            pages.append(FakePage())
+            return pages[-1]
+
+    async def scenario():
+        browser = AsyncLinuxDoBrowser("user", "password")
+        browser.context = FakeContext()
+        await browser.click_one_topic("t/topic/1", 1, 1)
+
+    asyncio.run(scenario())
+    # 每次重试打开的标签页都已关闭
+    assert len(pages) == 3
+    assert all(page.closed for page in pages)
+
+
+def test_breaker_stops_remaining_topics():
+    opened = []
+
+    async def scenario():
+        browser = AsyncLinuxDoBrowser("user", "password", concurrency=1)
+        browser.tab_semaphore = asyncio.Semaphore(1)
+        browser.retry.open_reason = "连续 6 次加载超时"
+
+        class FakeLocator:
+            async def get_attribute(self, name):
+                return "t/topic/1"
+
+        class FakePage:
+            async def query_selector_all(self, selector):
+                return [FakeLocator(), FakeLocator()]
+
+        async def click_one_topic(*args):
+            opened.append(args)
+
+        browser.page = FakePage()
+        browser.click_one_topic = click_one_topic
+        browser.probe.cache.save = lambda: None
+        await browser.click_topic()
+
+    asyncio.run(scenario())
+    assert opened == []
@@ -0,0 +1,40 @@
+import json
+import time
+
+from budget import DEFAULT_OVERHEAD, DEFAULT_STEPS, MIN_DWELL_FACTOR, SMOOTHING, TimeBudget
+
+
+def test_record_updates_moving_average():
+    budget = TimeBudget(600, 2, 4)
+    budget.record(seconds=DEFAULT_OVERHEAD + 10 * 3 + 4, steps=10)
+    assert budget.steps == DEFAULT_STEPS + SMOOTHING * (10 - DEFAULT_STEPS)
+    assert budget.overhead == DEFAULT_OVERHEAD + SMOOTHING * 4
+
+
+def test_history_round_trip(tmp_path):
+    path = tmp_path / "topic_costs.json"
+    budget = TimeBudget(600, 2, 4, history_path=str(path))
+    budget.save()  # 没有记录时不写文件
+    assert not path.exists()
+    budget.record(seconds=20, steps=4)
+    budget.save()
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    restored = TimeBudget(600, 2, 4, history_path=str(path))
+    assert (restored.overhead, restored.steps) == (saved["overhead"], saved["steps"])
+    assert [p.name for p in tmp_path.iterdir()] == ["topic_costs.json"]
+
+
+def test_adjust_shortens_dwell_but_not_below_half():
+    budget = TimeBudget(600, 2, 4, reserve_seconds=0)
+    assert budget.adjust(1) == (2, 4)  # 时间充足时不延长
+    budget.start_time = time.time() - 590
+    low, high = budget.adjust(10)
+    assert (low, high) == (2 * MIN_DWELL_FACTOR, 4 * MIN_DWELL_FACTOR)
+    assert not budget.can_start()
+
+
+def test_unlimited_budget():
+    budget = TimeBudget(0, 2, 4)
+    assert not budget.enabled
+    assert budget.remaining() == float("inf")
+    assert budget.adjust(5) == (2, 4)
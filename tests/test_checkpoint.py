@@ -0,0 +1,171 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from checkpoint import Checkpoint
+from retry import AUTH, NAVIGATION, RetryEngine, SiteUnhealthy
+from tail_sampler import TailSampler
+
+QUEUE = [{"id": i, "url": f"/t/topic/{i}", "meta": None} for i in range(1, 5)]
+
+
+def noop(*args, **kwargs):
+    return None
+
+
+@pytest.fixture
+def make_browser(tmp_path, bare_browser):
+    """只带 click_topic 用到的属性，不启动浏览器"""
+    def factory(click_one_topic):
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        checkpoint.save({
+            "queue": QUEUE, "position": 0, "scheduled": True, "browse_count": 0, "like_count": 0,
+            "skipped_read": 0, "liked_posts": [], "read_seconds": 0, "elapsed": 0,
+        })
+        return bare_browser(
+            checkpoint=checkpoint,
+            retry=RetryEngine(breaker_threshold=1),
+            tail=TailSampler(str(tmp_path / "traces"), {}, trace=False),
+            budget=SimpleNamespace(enabled=False, record=noop, save=noop),
+            probe=SimpleNamespace(cache=SimpleNamespace(save=noop)),
+            blocker=SimpleNamespace(save=noop),
+            read_start=None,
+            start_time=time.time(),
+            click_one_topic=click_one_topic,
+            drain_likes=noop, check_memory=noop, finish_likes=noop, save_session=noop,
+        )
+
+    return factory
+
+
+def test_checkpoint_is_kept_when_breaker_aborts(make_browser, monkeypatch):
+    monkeypatch.setattr("main.TARGET_READ_MINUTES", 0)
+
+    def click_one_topic(url, index, total, meta):
+        if index == 3:
+            browser.retry.record(NAVIGATION)
+            raise SiteUnhealthy("连续 1 次加载超时")
+        return True
+
+    browser = make_browser(click_one_topic)
+    browser.click_topic()
+
+    with open(browser.checkpoint.path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["position"] == 2  # 第 3 个帖子没有读完，下次从它开始
+    assert [topic["url"] for topic in state["queue"]] == [topic["url"] for topic in QUEUE]
+
+
+def test_checkpoint_is_cleared_after_normal_run(make_browser, monkeypatch):
+    monkeypatch.setattr("main.TARGET_READ_MINUTES", 0)
+    browser = make_browser(lambda *args: True)
+    browser.click_topic()
+    assert not os.path.exists(browser.checkpoint.path)
+
+
+def test_checkpoint_is_kept_when_breaker_opens_on_last_topic(make_browser, monkeypatch):
+    monkeypatch.setattr("main.TARGET_READ_MINUTES", 0)
+
+    def click_one_topic(url, index, total, meta):
+        if index == len(QUEUE):
+            browser.retry.record(AUTH)
+        return True
+
+    browser = make_browser(click_one_topic)
+    browser.click_topic()
+    assert os.path.exists(browser.checkpoint.path)
+
+
+def test_expired_checkpoint_is_discarded(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"), max_age_hours=1)
+    checkpoint.save({"queue": QUEUE, "position": 1})
+    assert checkpoint.load()["position"] == 1
+
+    with open(checkpoint.path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    state["saved_at"] = time.time() - 7200
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    assert checkpoint.load() is None
+    assert not os.path.exists(checkpoint.path)
+
+
+class FakeApi:
+    def __init__(self):
+        self.requested = []
+
+    def topics(self, topic_ids):
+        self.requested.append(list(topic_ids))
+        return {topic_id: {"id": topic_id, "title": f"帖子 {topic_id}", "post_ids": [1, 2, 3]} for topic_id in topic_ids}
+
+
+def test_checkpoint_stores_ids_and_refetches_meta(make_browser, monkeypatch):
+    monkeypatch.setattr("main.API_READ", True)
+    browser = make_browser(lambda *args: True)
+    browser.queue = [{"url": f"/t/topic/{i}", "meta": {"id": i, "post_ids": list(range(100))}} for i in range(1, 4)]
+    browser.position = 1
+    browser.scheduled = True
+    browser.browse_count = browser.like_count = browser.skipped_read = 0
+    browser.liked_posts = []
+    browser.read_seconds = 0
+    browser.save_checkpoint()
+
+    with open(browser.checkpoint.path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["queue"] == [{"id": i, "url": f"/t/topic/{i}"} for i in range(1, 4)]
+
+    browser.api = FakeApi()
+    assert browser.resume()
+    assert browser.api.requested == [[2, 3]]  # 只重新获取没读的帖子
+    assert browser.queue[0]["meta"] is None
+    assert browser.queue[2]["meta"]["title"] == "帖子 3"
+
+
+def test_interrupt_does_not_touch_the_browser(make_browser, monkeypatch):
+    from main import RunInterrupted
+
+    def interrupted():
+        raise RunInterrupted()
+
+    def no_browser(*args):
+        raise AssertionError("中断后不应再访问浏览器")
+
+    monkeypatch.setattr("main.signal.signal", noop)
+    monkeypatch.setattr("main.print_report", noop)
+    browser = make_browser(lambda *args: True)
+    browser.ensure_login = interrupted
+    browser.queue = []
+    browser.position = 0
+    browser.prefetch = SimpleNamespace(yiyan=lambda timeout: "一言")
+    browser.get_stats = dict
+    browser.export_metrics = noop
+    browser.login_mode = "session"
+    browser.session_store = SimpleNamespace(save=no_browser)
+    del browser.save_session  # 使用真正的 save_session，确认中断时没有调用
+    with pytest.raises(SystemExit):
+        browser.run()
+    assert browser.interrupted
+
+
+def test_scheduled_queue_keeps_the_scheduler_order(make_browser, monkeypatch):
+    from topic_index import PRIORITY_DONE, PRIORITY_PARTIAL
+
+    monkeypatch.setattr("main.API_READ", True)
+    monkeypatch.setattr("main.TARGET_READ_MINUTES", 0)
+    opened = []
+    browser = make_browser(lambda url, *args: opened.append(url) or True)
+    browser.checkpoint.clear()
+    topics = [{"url": f"/t/topic/{i}", "meta": {"id": i, "posts_count": 10}} for i in (3, 1, 2)]
+    browser.fetch_topics = lambda: topics
+    # 调度器已经排好序并排除了已读帖子，这里的索引不应再改变顺序或计数
+    priorities = {3: PRIORITY_PARTIAL, 2: PRIORITY_DONE}
+    browser.index = SimpleNamespace(priority=lambda topic_id, posts_count=None: priorities.get(topic_id, 0))
+    browser.browse_count = browser.like_count = browser.skipped_read = 0
+    browser.liked_posts = []
+    browser.read_seconds = 0
+    browser.click_topic()
+    assert opened == ["/t/topic/3", "/t/topic/1", "/t/topic/2"]
+    assert browser.skipped_read == 0
@@ -0,0 +1,24 @@
+import os
+import stat
+
+from daemon import Daemon
+
+
+def test_control_socket_is_private(tmp_path, monkeypatch):
+    path = str(tmp_path / "daemon.sock")
+    monkeypatch.setattr("daemon.DAEMON_SOCKET", path)
+    monkeypatch.setattr("daemon.DAEMON_HTTP_PORT", 0)
+    umask = os.umask(0o022)
+    try:
+        servers = Daemon([]).serve_control()
+    finally:
+        os.umask(umask)
+    try:
+        mode = os.stat(path).st_mode
+        assert stat.S_ISSOCK(mode)
+        assert mode & 0o077 == 0  # 其他用户不能连接
+        assert os.umask(umask) == umask  # 进程的 umask 已恢复
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
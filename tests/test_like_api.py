@@ -0,0 +1,99 @@
+import json
+
+from like_api import ALREADY, DAILY_LIMIT, DENIED, FAILED, LIKED, RATE_LIMITED, LikeApi
+
+
+class FakeResponse:
+    def __init__(self, status, data=None, text=None):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.data = data
+        self.body = text if text is not None else json.dumps(data or {})
+
+    def json(self):
+        if self.data is None:
+            raise ValueError("not json")
+        return self.data
+
+    def text(self):
+        return self.body
+
+
+class FakeRequest:
+    """按顺序返回预设的响应，记录请求的 URL"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url))
+        return FakeResponse(200, {"csrf": "token"})
+
+    def put(self, url, **kwargs):
+        self.calls.append(("PUT", url))
+        return self.responses.pop(0)
+
+
+def make_api(*responses):
+    request = FakeRequest(*responses)
+    api = LikeApi(type("Context", (), {"request": request})())
+    return api, request
+
+
+def liked(count=3):
+    return FakeResponse(200, {"current_user_reaction": {"id": "heart"}, "reaction_users_count": count})
+
+
+def unliked(count=2):
+    return FakeResponse(200, {"current_user_reaction": None, "reaction_users_count": count})
+
+
+def test_like():
+    api, request = make_api(liked())
+    result = api.like(1)
+    assert result["outcome"] == LIKED and result["likes"] == 3
+    assert [method for method, _ in request.calls] == ["GET", "PUT"]
+
+
+def test_already_liked_is_restored():
+    api, request = make_api(unliked(), liked(3))
+    result = api.like(1)
+    assert result["outcome"] == ALREADY and result["likes"] == 3
+    assert len(request.calls) == 3
+
+
+def test_failed_restore_is_reported():
+    api, _ = make_api(unliked(), FakeResponse(429, {"errors": ["slow down"], "extras": {"wait_seconds": 5}}))
+    result = api.like(1)
+    assert result["outcome"] == FAILED
+    assert "429" in result["message"]
+
+
+def test_restore_without_reaction_is_reported():
+    api, _ = make_api(unliked(), unliked())
+    assert api.like(1)["outcome"] == FAILED
+
+
+def test_rate_limit_and_daily_limit():
+    api, _ = make_api(FakeResponse(429, {"errors": ["slow down"], "extras": {"wait_seconds": 30}}))
+    result = api.like(1)
+    assert result["outcome"] == RATE_LIMITED and result["wait"] == 30
+
+    api, _ = make_api(FakeResponse(429, {"errors": ["limit"], "extras": {"wait_seconds": 7200}}))
+    assert api.like(1)["outcome"] == DAILY_LIMIT
+
+
+def test_bad_csrf_refreshes_token_once():
+    api, request = make_api(FakeResponse(403, text='["BAD CSRF"]'), liked())
+    assert api.like(1)["outcome"] == LIKED
+    assert [method for method, _ in request.calls] == ["GET", "PUT", "GET", "PUT"]
+
+
+def test_forbidden_and_server_error():
+    api, _ = make_api(FakeResponse(403, {"errors": ["not allowed"]}))
+    result = api.like(1)
+    assert result["outcome"] == DENIED and result["message"] == "not allowed"
+
+    api, _ = make_api(FakeResponse(502, text="bad gateway"))
+    assert api.like(1)["outcome"] == FAILED
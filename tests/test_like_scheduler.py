@@ -0,0 +1,69 @@
+import pytest
+
+from like_scheduler import MAX_ATTEMPTS, QUOTA_WINDOW, LikeScheduler, TokenBucket
+from topic_index import TopicIndex
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可控的 time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr("like_scheduler.time.time", lambda: now[0])
+    monkeypatch.setattr("topic_index.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TopicIndex(str(tmp_path / "topics.db"))
+    yield index
+    index.close()
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(rate_per_minute=6, burst=2)
+    for _ in range(2):
+        assert bucket.wait_time() == 0
+        bucket.take()
+    assert bucket.wait_time() == pytest.approx(10)
+    clock[0] += 10
+    assert bucket.wait_time() == 0
+
+
+def test_bucket_block_starts_from_empty(clock):
+    bucket = TokenBucket(rate_per_minute=6, burst=2)
+    bucket.block(30)
+    assert bucket.wait_time() == pytest.approx(40)  # 解除后还要等一个令牌
+    clock[0] += 40
+    assert bucket.wait_time() == 0
+
+
+def test_requeue_drops_after_max_attempts(clock, index):
+    likes = LikeScheduler(index)
+    likes.enqueue({"url": "t/topic/1", "post_id": 1})
+    for _ in range(MAX_ATTEMPTS):
+        item = likes.next_ready()
+        assert item is not None
+        likes.requeue(item)
+        clock[0] += 60
+    assert likes.pending() == 0 and likes.dropped == 1
+
+
+def test_daily_limit_learns_quota_and_predicts_reset(clock, index):
+    likes = LikeScheduler(index)
+    for _ in range(3):
+        likes.record_like()
+        clock[0] += 100
+    likes.enqueue({"url": "t/topic/1", "post_id": 1})
+    likes.daily_limit_hit(wait_seconds=600)
+    assert likes.pending() == 0
+    assert likes.learned_limit() == 3
+    assert likes.quota_reset_at() == pytest.approx(clock[0] + 600)
+
+    # 弹窗给出的时间过去后，按点赞流水推算：最早的一次点赞满 24 小时后恢复
+    clock[0] += 601
+    first_like = clock[0] - 601 - 300
+    assert likes.quota_reset_at() == pytest.approx(first_like + QUOTA_WINDOW)
+    clock[0] = first_like + QUOTA_WINDOW + 1
+    assert likes.quota_reset_at() == 0
+
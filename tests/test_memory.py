@@ -0,0 +1,66 @@
+import pytest
+
+
+class FakeSampler:
+    def __init__(self, values):
+        self.values = list(values)
+
+    def sample(self):
+        return self.values.pop(0)
+
+
+@pytest.fixture
+def make_browser(monkeypatch, bare_browser):
+    def factory(values, limit=100, cooldown=2):
+        monkeypatch.setattr("main.CONTEXT_MEMORY_MB", limit)
+        monkeypatch.setattr("main.CONTEXT_RECYCLE_COOLDOWN", cooldown)
+        recycles = []
+        return bare_browser(
+            memory=FakeSampler(values),
+            memory_baseline=None,
+            recycle_cooldown=0,
+            recycle_enabled=bool(limit),
+            recycles=recycles,
+            recycle_context=recycles.append,
+        )
+
+    return factory
+
+
+def test_large_baseline_does_not_recycle(make_browser):
+    browser = make_browser([1500, 1550, 1590])
+    for _ in range(3):
+        browser.check_memory()
+    assert browser.recycles == []
+    assert browser.memory_baseline == 1500
+
+
+def test_growth_recycles_then_cools_down(make_browser):
+    # 基准 500，增长到 700 时重建，重建后回到 520；冷却期内即使增长也不重建
+    browser = make_browser([500, 700, 520, 800, 800, 800, 540])
+    for _ in range(2):
+        browser.check_memory()
+    assert len(browser.recycles) == 1
+    assert browser.recycle_enabled
+    for _ in range(2):
+        browser.check_memory()
+    assert len(browser.recycles) == 1
+    browser.check_memory()
+    assert len(browser.recycles) == 2
+
+
+def test_recycle_that_frees_nothing_is_not_repeated(make_browser):
+    browser = make_browser([500, 700, 690, 900, 900], cooldown=0)
+    for _ in range(2):
+        browser.check_memory()
+    assert len(browser.recycles) == 1
+    assert not browser.recycle_enabled
+    browser.check_memory()
+    assert len(browser.recycles) == 1
+
+
+def test_disabled(make_browser):
+    browser = make_browser([500, 5000], limit=0)
+    browser.check_memory()
+    browser.check_memory()
+    assert browser.recycles == [] and browser.memory_baseline is None
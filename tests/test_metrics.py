@@ -0,0 +1,55 @@
+import json
+import os
+
+from metrics import Metrics, escape_label, percentile
+
+
+def test_label_values_are_escaped():
+    assert escape_label('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+
+
+def test_prometheus_labels_with_special_characters(tmp_path):
+    metrics = Metrics()
+    metrics.record('topic "1"', 1.5)
+    path = tmp_path / "linuxdo.prom"
+    metrics.export_prometheus(str(path), labels={"account": 'user\\"\nname'})
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert 'linuxdo_phase_duration_seconds_count{account="user\\\\\\"\\nname",phase="topic \\"1\\""} 1' in lines
+    # 每个样本占一行，换行没有把指标拆开
+    assert all(line.startswith(("#", "linuxdo_")) for line in lines)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([], 50) == 0.0
+
+
+def test_export_json_summarizes_phases(tmp_path):
+    metrics = Metrics()
+    for seconds in (1, 2, 3):
+        metrics.record("topic", seconds, detail="/t/topic/1")
+    metrics.record("login", 4, ok=False)
+    path = tmp_path / "out" / "metrics.json"
+    metrics.export_json(str(path), extra={"username": "user"})
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["phases"]["topic"] == {"count": 3, "total": 6, "p50": 2, "p95": 3, "max": 3}
+    assert data["username"] == "user"
+    assert [span["ok"] for span in data["spans"]] == [True, True, True, False]
+    assert os.listdir(path.parent) == ["metrics.json"]  # 临时文件已替换
+
+
+def test_export_prometheus_writes_summary_and_gauges(tmp_path):
+    metrics = Metrics()
+    for seconds in (1, 2):
+        metrics.record("topic", seconds)
+    path = tmp_path / "linuxdo.prom"
+    metrics.export_prometheus(str(path), gauges={"browse_count": 2})
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert 'linuxdo_phase_duration_seconds{phase="topic",quantile="0.5"} 1.0000' in lines
+    assert 'linuxdo_phase_duration_seconds_sum{phase="topic"} 3.0000' in lines
+    assert "# TYPE linuxdo_browse_count gauge" in lines
+    assert "linuxdo_browse_count 2" in lines
+    assert os.stat(path).st_mode & 0o044  # textfile collector 可以读取
@@ -0,0 +1,8 @@
+import prefetch
+
+
+def test_yiyan_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(prefetch, "YIYAN_CACHE", str(tmp_path / "yiyan.json"))
+    prefetch.save_cached_yiyan("一言")
+    assert prefetch.load_cached_yiyan() == "一言"
+    assert [p.name for p in tmp_path.iterdir()] == ["yiyan.json"]
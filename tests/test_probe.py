@@ -0,0 +1,38 @@
+import json
+
+from linuxdo import TITLE_SELECTORS
+from probe import PageProbe, SelectorCache
+
+
+def raw_title(selector):
+    return {"title": {"selector": selector, "text": "标题"}}
+
+
+def test_specific_selector_is_promoted(tmp_path):
+    probe = PageProbe(str(tmp_path / "selector_cache.json"))
+    probe.parse(raw_title(".topic-title h1 span"))
+    assert probe.args()["title"][0] == ".topic-title h1 span"
+
+
+def test_fallback_selector_is_not_promoted(tmp_path):
+    probe = PageProbe(str(tmp_path / "selector_cache.json"))
+    probe.parse(raw_title(".topic-title"))
+    assert probe.args()["title"] == TITLE_SELECTORS
+    assert not probe.cache.dirty
+
+
+def test_cached_fallback_from_older_versions_is_ignored(tmp_path):
+    path = tmp_path / "selector_cache.json"
+    path.write_text(json.dumps({"title": "#main-outlet h1"}), encoding="utf-8")
+    probe = PageProbe(str(path))
+    assert probe.args()["title"] == TITLE_SELECTORS
+
+
+def test_save_writes_atomically(tmp_path):
+    path = tmp_path / "data" / "selector_cache.json"
+    cache = SelectorCache(str(path))
+    cache.hit("title", "h1")
+    cache.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"title": "h1"}
+    assert [p.name for p in path.parent.iterdir()] == ["selector_cache.json"]
+    assert not cache.dirty
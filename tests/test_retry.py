@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+import pytest
+
+from retry import (
+    AUTH, FORBIDDEN, HTTP, NAVIGATION, HttpStatusError, RetryEngine, SiteUnhealthy, check_response, classify,
+)
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.url = "https://linux.do/t/topic/1"
+
+
+def test_classify_http_statuses():
+    assert classify(HttpStatusError(401)) == AUTH
+    assert classify(HttpStatusError(403)) == FORBIDDEN
+    assert classify(HttpStatusError(429)) == HTTP
+    assert classify(HttpStatusError(502)) == HTTP
+
+
+def test_check_response_raises_on_error_statuses():
+    assert check_response(FakeResponse(200)).status == 200
+    with pytest.raises(HttpStatusError):
+        check_response(FakeResponse(403))
+
+
+def test_single_403_does_not_open_breaker():
+    retry = RetryEngine(breaker_threshold=6, forbidden_threshold=3)
+    retry.record(FORBIDDEN)
+    assert retry.healthy
+
+
+def test_401_opens_breaker_immediately():
+    retry = RetryEngine()
+    retry.record(AUTH)
+    assert not retry.healthy
+    with pytest.raises(SiteUnhealthy):
+        retry.check()
+
+
+def test_consecutive_403_opens_breaker_after_session_check():
+    checks = []
+    retry = RetryEngine(forbidden_threshold=3, session_check=lambda: checks.append(1) or True)
+    retry.record(FORBIDDEN)
+    retry.record(FORBIDDEN)
+    assert retry.healthy and not checks
+    retry.record(FORBIDDEN)
+    assert checks == [1]
+    assert retry.open_reason == "连续 3 次HTTP 403"
+
+
+def test_consecutive_403_with_expired_session_is_auth():
+    retry = RetryEngine(forbidden_threshold=2, session_check=lambda: False)
+    retry.record(FORBIDDEN)
+    retry.record(FORBIDDEN)
+    assert retry.open_reason == "登录失效"
+
+
+def test_success_resets_403_streak():
+    retry = RetryEngine(forbidden_threshold=2)
+    retry.record(FORBIDDEN)
+    retry.success()
+    retry.record(FORBIDDEN)
+    assert retry.healthy
+
+
+def test_forbidden_is_not_retried():
+    calls = []
+
+    def forbidden():
+        calls.append(1)
+        raise HttpStatusError(403)
+
+    retry = RetryEngine(base_delay=0)
+    assert retry.call("topic", forbidden) is None
+    assert len(calls) == 1
+    assert retry.healthy
+
+
+def test_navigation_errors_open_breaker_at_threshold():
+    retry = RetryEngine(breaker_threshold=2)
+    retry.record(NAVIGATION)
+    assert retry.healthy
+    retry.record(NAVIGATION)
+    assert not retry.healthy
+
+
+def test_wait_uses_sleep_hook_only_on_owner_thread(monkeypatch):
+    slept = []
+    monkeypatch.setattr("retry.time.sleep", lambda seconds: slept.append(("time", seconds)))
+    retry = RetryEngine(base_delay=0.01)
+    retry.sleep = lambda seconds: slept.append(("page", seconds))
+    retry.wait("topic", 1, NAVIGATION)
+    thread = threading.Thread(target=retry.wait, args=("yiyan", 1, NAVIGATION))
+    thread.start()
+    thread.join()
+    assert [kind for kind, _ in slept] == ["page", "time"]
+    assert retry.retries == 2
+
+
+def test_call_async_backs_off_with_asyncio_sleep(monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr("retry.asyncio.sleep", fake_sleep)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise HttpStatusError(503)
+        return "ok"
+
+    retry = RetryEngine(base_delay=1)
+    assert asyncio.run(retry.call_async("topic", flaky)) == "ok"
+    assert len(slept) == 2 and retry.retries == 2
+    assert retry.healthy
+
+
+def test_call_async_stops_at_the_breaker():
+    async def timeout():
+        raise HttpStatusError(502)
+
+    retry = RetryEngine(base_delay=0, breaker_threshold=2)
+    with pytest.raises(SiteUnhealthy):
+        asyncio.run(retry.call_async("topic", timeout))
+    assert retry.open_reason == "连续 2 次HTTP 429/5xx"
@@ -0,0 +1,39 @@
+from routing import MEDIA_URL, ResourceBlocker
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    def on(self, event, handler):
+        pass
+
+
+def test_lean_routes_only_media_urls():
+    context = FakeContext()
+    ResourceBlocker("lean").install(context)
+    assert context.routes == [MEDIA_URL]
+    assert MEDIA_URL.search("https://linux.do/user_avatar/linux.do/a/48/1_2.png")
+    assert MEDIA_URL.search("https://linux.do/fonts/Roboto.woff2?v=1")
+    assert not MEDIA_URL.search("https://linux.do/assets/discourse-abc.js")
+    assert not MEDIA_URL.search("https://linux.do/t/topic/1.json")
+
+
+def test_full_registers_no_route_and_minimal_routes_everything():
+    context = FakeContext()
+    ResourceBlocker("full").install(context)
+    assert context.routes == []
+    ResourceBlocker("minimal").install(context)
+    assert context.routes == ["**/*"]
+
+
+def test_save_merges_average_sizes(tmp_path):
+    path = tmp_path / "resource_stats.json"
+    blocker = ResourceBlocker("lean", stats_path=str(path))
+    blocker.type_bytes = {"script": [3000, 3]}
+    blocker.save()
+    assert ResourceBlocker("lean", stats_path=str(path)).average_size("script") == 1000
+    assert [p.name for p in tmp_path.iterdir()] == ["resource_stats.json"]
@@ -0,0 +1,51 @@
+from scheduler import LOAD_SECONDS, TopicScheduler
+from topic_index import PRIORITY_DONE, PRIORITY_PARTIAL, PRIORITY_UNREAD
+
+
+class FakeApi:
+    concurrency = 2
+
+    def __init__(self, feeds):
+        self.feeds = feeds
+
+    def latest_topics(self, feed, page):
+        return self.feeds.get((feed, page))
+
+
+class FakeIndex:
+    def __init__(self, priorities):
+        self.priorities = priorities
+
+    def priority(self, topic_id, posts_count=None):
+        return self.priorities.get(topic_id, PRIORITY_UNREAD)
+
+
+def topic(topic_id, posts, last_read=0, **extra):
+    return dict(id=topic_id, highest_post_number=posts, posts_count=posts, last_read_post_number=last_read, **extra)
+
+
+def test_rank_prefers_value_per_second_and_skips_closed_and_done():
+    index = FakeIndex({3: PRIORITY_DONE, 4: PRIORITY_PARTIAL})
+    scheduler = TopicScheduler(FakeApi({}), index, dwell_seconds=3)
+    topics = [
+        topic(1, 40, last_read=39),  # 只剩 1 层新楼层
+        topic(2, 6),  # 没进过的短帖子
+        topic(3, 20),  # 已读完
+        topic(4, 6),  # 读过一部分，价值减半
+        topic(5, 30, closed=True),
+    ]
+    ranked = [t["id"] for t, _, _ in scheduler.rank(topics)]
+    assert ranked == [2, 4, 1]
+
+
+def test_plan_dedupes_feeds_and_respects_targets():
+    feeds = {
+        ("latest", 0): [topic(1, 6), topic(2, 6)],
+        ("new", 0): [topic(2, 6), topic(3, 6)],
+        ("unread", 0): None,  # 获取失败的列表跳过
+    }
+    scheduler = TopicScheduler(FakeApi(feeds), dwell_seconds=3)
+    assert len(scheduler.plan(["latest", "new", "unread"])) == 3
+    assert len(scheduler.plan(["latest", "new"], target_topics=2)) == 2
+    # 每个帖子 3 次滚动：3 + 3 * 3 = 12 秒，预算 20 秒只够一个
+    assert len(scheduler.plan(["latest", "new"], target_seconds=LOAD_SECONDS + 17)) == 1
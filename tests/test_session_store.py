@@ -0,0 +1,18 @@
+import os
+
+from session_store import SessionStore
+
+
+def test_save_state_replaces_through_private_temp_file(tmp_path):
+    store = SessionStore(str(tmp_path), "user@example.com")
+    state = {"cookies": [{"name": "_t", "value": "token"}], "origins": []}
+    store.save_state(state)
+    assert store.load() == state
+    assert os.listdir(tmp_path) == ["user_example.com.json"]
+    assert os.stat(store.path).st_mode & 0o077 == 0  # 会话 cookie 只有本用户可读
+
+
+def test_state_without_cookies_is_ignored(tmp_path):
+    store = SessionStore(str(tmp_path), "user")
+    store.save_state({"cookies": [], "origins": []})
+    assert store.load() is None
@@ -0,0 +1,82 @@
+import json
+import zipfile
+
+from tail_sampler import TailSampler, scrub_trace
+
+
+class FakeTracing:
+    def __init__(self):
+        self.chunks = []
+
+    def start(self, **kwargs):
+        self.options = kwargs
+
+    def start_chunk(self, title=None):
+        self.chunks.append(title)
+
+    def stop_chunk(self, path=None):
+        if path:
+            write_trace(path)
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+
+
+def write_trace(path):
+    event = {
+        "type": "resource-snapshot",
+        "snapshot": {
+            "request": {
+                "url": "https://linux.do/session",
+                "headers": [{"name": "Cookie", "value": "_t=secret"}, {"name": "Accept", "value": "*/*"}],
+                "cookies": [{"name": "_t", "value": "secret"}],
+                "postData": {"_sha1": "body.dat", "size": 20, "mimeType": "application/json"},
+            },
+            "response": {
+                "status": 200,
+                "headers": [{"name": "Set-Cookie", "value": "_t=rotated"}],
+                "cookies": [],
+                "content": {"_sha1": "response.dat", "size": 10, "mimeType": "application/json"},
+            },
+        },
+    }
+    with zipfile.ZipFile(path, "w") as f:
+        f.writestr("trace.network", json.dumps(event))
+        f.writestr("trace.trace", "{}")
+        f.writestr("resources/body.dat", "password=hunter2")
+        f.writestr("resources/response.dat", "{}")
+        f.writestr("resources/frame.jpeg", "jpeg")
+
+
+def test_scrub_trace_removes_bodies_and_cookies(tmp_path):
+    path = str(tmp_path / "trace.zip")
+    write_trace(path)
+    scrub_trace(path)
+    with zipfile.ZipFile(path) as f:
+        names = set(f.namelist())
+        network = f.read("trace.network").decode("utf-8")
+    assert names == {"trace.network", "trace.trace", "resources/frame.jpeg"}
+    assert "secret" not in network and "rotated" not in network
+    snapshot = json.loads(network)["snapshot"]
+    assert snapshot["request"]["headers"] == [{"name": "Accept", "value": "*/*"}]
+    assert snapshot["request"]["postData"] == {"size": 20, "mimeType": "application/json"}
+
+
+def test_login_window_is_not_traced(tmp_path):
+    context = FakeContext()
+    tail = TailSampler(str(tmp_path), {"login": 0.0, "topic": 0.0})
+    tail.install(context)
+    assert context.tracing.options["snapshots"] is False
+
+    with tail.window("login", "https://linux.do/"):
+        tail.fail("登录失败")
+    with tail.window("topic", "https://linux.do/t/topic/1"):
+        tail.fail("超时")
+
+    assert context.tracing.chunks == ["topic"]
+    windows, artifacts = tail.summary()
+    assert windows == 2
+    assert artifacts[0]["trace"] is None
+    assert artifacts[1]["trace"].endswith(".zip")
@@ -0,0 +1,63 @@
+import pytest
+
+from topic_index import COMPACT_INTERVAL, LIKE_EVENT_TTL, PRIORITY_DONE, PRIORITY_PARTIAL, PRIORITY_UNREAD, TopicIndex
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000_000.0]
+    monkeypatch.setattr("topic_index.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def index(tmp_path, clock):
+    index = TopicIndex(str(tmp_path / "topics.db"), ttl_days=30)
+    yield index
+    index.close()
+
+
+def test_priority_follows_reading_progress(index):
+    assert index.priority(1, 10) == PRIORITY_UNREAD
+    index.mark_read(1, read_post_number=4, posts_count=10)
+    assert index.priority(1, 10) == PRIORITY_PARTIAL
+    index.mark_read(1, read_post_number=10, posts_count=10, fully_read=True)
+    assert index.priority(1, 10) == PRIORITY_DONE
+    assert index.priority(1, 12) == PRIORITY_UNREAD  # 有新回复
+
+
+def test_read_post_number_never_decreases(index):
+    index.mark_read(1, read_post_number=8, posts_count=10)
+    index.mark_read(1, read_post_number=3, posts_count=10)
+    row = index.conn.execute("SELECT read_post_number FROM topics WHERE topic_id = 1").fetchone()
+    assert row == (8,)
+
+
+def test_compact_removes_expired_records(index, clock):
+    index.mark_read(1)
+    index.mark_liked(100, 1)
+    index.record_like_event()
+
+    clock[0] += LIKE_EVENT_TTL + 1
+    index.compact()
+    assert index.like_times(0) == []  # 点赞流水只保留两天
+    assert index.priority(1) == PRIORITY_PARTIAL  # 阅读记录还在 30 天内
+
+    clock[0] += 30 * DAY
+    index.compact()
+    assert index.priority(1) == PRIORITY_UNREAD
+    assert not index.is_liked(100)
+
+
+def test_compact_runs_at_most_once_a_day(index, clock):
+    clock[0] -= LIKE_EVENT_TTL + 1
+    index.record_like_event()  # 一条已经过期的流水
+    clock[0] += LIKE_EVENT_TTL + 1
+
+    index.compact()  # 创建索引时刚清理过
+    assert len(index.like_times(0)) == 1
+    clock[0] += COMPACT_INTERVAL
+    index.compact()
+    assert index.like_times(0) == []
@@ -0,0 +1,140 @@
+"""
+跨运行的帖子索引（SQLite）：记录每个帖子什么时候读过、读到第几楼、是否读完，以及已点赞的回复
+
+- click_topic 用它跳过已经读完且没有新回复的帖子，读了一半的帖子排到后面
+- click_like 用它跳过已知点过赞的帖子，不再检查页面
+- 点赞调度用 like_events（本账号实际点出的赞）预测 24 小时点赞额度何时恢复
+- 超过保存期限的记录定期清理，保证文件长期运行也不会变大
+"""
+import os
+import time
+import sqlite3
+
+from loguru import logger
+
+# 帖子优先级，数值越小越先读
+PRIORITY_UNREAD = 0  # 没读过，或读完后有新回复
+PRIORITY_PARTIAL = 1  # 读过一部分
+PRIORITY_DONE = 2  # 已读完且没有新回复
+
+COMPACT_INTERVAL = 24 * 3600  # 两次清理之间的最小间隔
+LIKE_EVENT_TTL = 2 * 24 * 3600  # 点赞流水只需要覆盖最近 24 小时，多留一天
+
+
+class TopicIndex:
+    def __init__(self, path, ttl_days=30) -> None:
+        """
+        :param path: SQLite 文件路径
+        :param ttl_days: 记录保存天数，超过后清理
+        """
+        self.ttl = ttl_days * 24 * 3600
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS topics (
+                topic_id INTEGER PRIMARY KEY,
+                read_at REAL NOT NULL,
+                read_post_number INTEGER NOT NULL DEFAULT 0,
+                posts_count INTEGER NOT NULL DEFAULT 0,
+                fully_read INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS likes (
+                post_id INTEGER PRIMARY KEY,
+                topic_id INTEGER,
+                liked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS like_events (
+                liked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE INDEX IF NOT EXISTS topics_read_at ON topics(read_at);
+            CREATE INDEX IF NOT EXISTS likes_liked_at ON likes(liked_at);
+            CREATE INDEX IF NOT EXISTS like_events_liked_at ON like_events(liked_at);
+        """)
+        self.compact()
+
+    def priority(self, topic_id, posts_count=None):
+        """
+        :param posts_count: 帖子当前的楼层数，有新回复时重新视为未读
+        :return: PRIORITY_UNREAD / PRIORITY_PARTIAL / PRIORITY_DONE
+        """
+        row = self.conn.execute(
+            "SELECT read_post_number, posts_count, fully_read FROM topics WHERE topic_id = ?", (topic_id,)
+        ).fetchone()
+        if not row:
+            return PRIORITY_UNREAD
+        read_post_number, known_posts_count, fully_read = row
+        if posts_count and posts_count > max(known_posts_count, read_post_number):
+            return PRIORITY_UNREAD
+        return PRIORITY_DONE if fully_read else PRIORITY_PARTIAL
+
+    def mark_read(self, topic_id, read_post_number=0, posts_count=0, fully_read=False):
+        """记录一次阅读，读到的楼层只增不减"""
+        self.conn.execute("""
+            INSERT INTO topics (topic_id, read_at, read_post_number, posts_count, fully_read)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(topic_id) DO UPDATE SET
+                read_at = excluded.read_at,
+                read_post_number = MAX(topics.read_post_number, excluded.read_post_number),
+                posts_count = MAX(topics.posts_count, excluded.posts_count),
+                fully_read = MAX(topics.fully_read, excluded.fully_read)
+        """, (topic_id, time.time(), read_post_number or 0, posts_count or 0, int(fully_read)))
+        self.conn.commit()
+
+    def is_liked(self, post_id):
+        if not post_id:
+            return False
+        return self.conn.execute("SELECT 1 FROM likes WHERE post_id = ?", (post_id,)).fetchone() is not None
+
+    def mark_liked(self, post_id, topic_id=None):
+        if not post_id:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO likes (post_id, topic_id, liked_at) VALUES (?, ?, ?)",
+            (post_id, topic_id, time.time())
+        )
+        self.conn.commit()
+
+    def record_like_event(self):
+        """记录一次成功点赞的时间"""
+        self.conn.execute("INSERT INTO like_events (liked_at) VALUES (?)", (time.time(),))
+        self.conn.commit()
+
+    def like_times(self, since):
+        """:return: since 之后成功点赞的时间戳，从早到晚"""
+        rows = self.conn.execute(
+            "SELECT liked_at FROM like_events WHERE liked_at >= ? ORDER BY liked_at", (since,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+        self.conn.commit()
+
+    def compact(self, force=False):
+        """清理过期记录，每天最多执行一次"""
+        now = time.time()
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_compact'").fetchone()
+        if not force and row and now - float(row[0]) < COMPACT_INTERVAL:
+            return
+        cutoff = now - self.ttl
+        removed = self.conn.execute("DELETE FROM topics WHERE read_at < ?", (cutoff,)).rowcount
+        removed += self.conn.execute("DELETE FROM likes WHERE liked_at < ?", (cutoff,)).rowcount
+        removed += self.conn.execute(
+            "DELETE FROM like_events WHERE liked_at < ?", (now - LIKE_EVENT_TTL,)
+        ).rowcount
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_compact', ?)", (str(now),))
+        self.conn.commit()
+        if removed:
+            self.conn.execute("VACUUM")
+            logger.info(f"帖子索引已清理 {removed} 条过期记录")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,71 @@
+"""
+条件等待：用页面上真实发生的事件（元素出现、接口响应）代替固定的 time.sleep，
+每次等待都有超时，并记录实际等了多久
+"""
+import time
+
+from loguru import logger
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+class Waiter:
+    def __init__(self) -> None:
+        # name -> {"count": 次数, "total": 累计秒数, "timeouts": 超时次数}
+        self.stats = {}
+
+    def _record(self, name, started, ok):
+        waited = time.time() - started
+        item = self.stats.setdefault(name, {"count": 0, "total": 0.0, "timeouts": 0})
+        item["count"] += 1
+        item["total"] += waited
+        if not ok:
+            item["timeouts"] += 1
+        logger.debug(f"等待 {name} {'完成' if ok else '超时'}，用时 {waited:.2f} 秒")
+        return waited
+
+    def selector(self, page, selector, name, timeout=5000, state="visible"):
+        """
+        等待元素达到指定状态
+        :param selector: 可以是逗号分隔的多个选择器，任意一个满足即可
+        :return: bool 是否在超时前满足
+        """
+        started = time.time()
+        try:
+            page.locator(selector).first.wait_for(state=state, timeout=timeout)
+            ok = True
+        except Exception:
+            ok = False
+        self._record(name, started, ok)
+        return ok
+
+    def any_selector(self, page, selectors, name, timeout=5000, state="visible"):
+        """等待 selectors 中任意一个元素达到指定状态"""
+        return self.selector(page, ", ".join(selectors), name, timeout=timeout, state=state)
+
+    def response(self, page, url_part, action, name, timeout=10000, method=None):
+        """
+        执行 action 并等待 URL 包含 url_part 的响应
+        :param action: 触发请求的操作，例如点击按钮
+        :return: Response，超时返回 None（action 本身的异常会继续抛出）
+        """
+        def predicate(response):
+            if url_part not in response.url:
+                return False
+            return method is None or response.request.method == method
+
+        started = time.time()
+        try:
+            with page.expect_response(predicate, timeout=timeout) as response_info:
+                action()
+            response = response_info.value
+        except PlaywrightTimeoutError:
+            response = None
+        self._record(name, started, response is not None)
+        return response
+
+    def summary(self):
+        """汇总所有等待：(次数, 累计秒数, 超时次数)"""
+        count = sum(item["count"] for item in self.stats.values())
+        total = sum(item["total"] for item in self.stats.values())
+        timeouts = sum(item["timeouts"] for item in self.stats.values())
+        return count, total, timeouts